@@ -0,0 +1,189 @@
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+# Benchmarks de los estimadores sobre una rejilla de n, B, distribución y
+# trabajadores. Cada caso guarda el mejor tiempo de `repeticiones` corridas,
+# réplicas por segundo y el pico de memoria (tracemalloc, en una corrida
+# aparte para no inflar los tiempos).
+#
+#   python benchmarks/bench_bootstrap.py --rapido -o resultados.json
+#   python benchmarks/bench_bootstrap.py --rapido --comparar base.json --umbral 1.3
+#
+# Con --comparar el proceso termina con código 1 si algún caso es más lento
+# que la base multiplicada por el umbral.
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bootstrap_met as bm  # noqa: E402
+
+REJILLA = {
+    'n': [100, 10000, 200000],
+    'n_bootstrap': [1000, 10000],
+    'distribucion': ['simetrica', 'asimetrica', 'binaria'],
+    'n_trabajadores': sorted({1, os.cpu_count() or 1})
+}
+
+REJILLA_RAPIDA = {
+    'n': [100, 10000],
+    'n_bootstrap': [1000],
+    'distribucion': ['simetrica', 'asimetrica', 'binaria'],
+    'n_trabajadores': [1]
+}
+
+GRUPOS_BENCHMARK = 200
+
+
+def generar_datos(distribucion, n, semilla=0):
+    generador = np.random.default_rng(semilla)
+    if distribucion == 'simetrica':
+        # Como las alturas del ejemplo
+        return generador.normal(170, 8, n)
+    if distribucion == 'asimetrica':
+        # Como los salarios del ejemplo
+        return np.round(generador.lognormal(10.7, 0.6, n))
+    if distribucion == 'binaria':
+        # Como el control de calidad del ejemplo
+        return (generador.random(n) < 0.1).astype(np.uint8)
+    raise ValueError(f"Distribución desconocida: {distribucion!r}")
+
+
+def motor_streaming(datos, n_bootstrap, n_trabajadores, semilla):
+    return bm.bootstrap_streaming(iter([datos]), ('media', 'mediana'), n_bootstrap, semilla=semilla)
+
+
+def motor_grupos(datos, n_bootstrap, n_trabajadores, semilla):
+    grupos = np.arange(len(datos)) % GRUPOS_BENCHMARK
+    return bm.bootstrap_por_grupos(datos, grupos, ('media', 'mediana'), n_bootstrap, semilla=semilla,
+                                   n_trabajadores=n_trabajadores)
+
+
+def motor_dos_muestras(datos, n_bootstrap, n_trabajadores, semilla):
+    # Mitades de los datos como dos muestras; tantas permutaciones como réplicas
+    mitad = len(datos) // 2
+    return bm.bootstrap_dos_muestras((datos[:mitad], datos[mitad:]), 'mediana', n_bootstrap=n_bootstrap,
+                                     n_permutaciones=n_bootstrap, semilla=semilla, n_trabajadores=n_trabajadores)
+
+
+def estimador(funcion, **parametros):
+    def ejecutar(datos, n_bootstrap, n_trabajadores, semilla):
+        return funcion(datos, n_bootstrap=n_bootstrap, semilla=semilla, n_trabajadores=n_trabajadores,
+                       **parametros)
+
+    return ejecutar
+
+
+# Los estimadores que eligen estrategia van siempre por Monte Carlo: con
+# 'auto' los casos chicos o binarios se resuelven con la distribución exacta
+# o la aproximación normal y dejarían de medir el motor
+ESTIMADORES = {
+    'media': estimador(bm.bootstrap_media_alturas, estrategia='monte_carlo'),
+    'mediana': estimador(bm.bootstrap_mediana_salarios, estrategia='monte_carlo'),
+    'desviacion': estimador(bm.bootstrap_desviacion_estandar),
+    'proporcion': estimador(bm.bootstrap_proporcion_calidad, estrategia='monte_carlo'),
+    'percentil_90': estimador(bm.bootstrap_percentil_90, estrategia='monte_carlo'),
+    'streaming': motor_streaming,
+    'grupos': motor_grupos,
+    'dos_muestras': motor_dos_muestras
+}
+
+
+def medir(ejecutar, datos, n_bootstrap, n_trabajadores, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        ejecutar(datos, n_bootstrap, n_trabajadores, 0)
+        tiempos.append(time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    ejecutar(datos, n_bootstrap, n_trabajadores, 0)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(tiempos), pico
+
+
+def clave_caso(caso):
+    return '|'.join(f"{campo}={caso[campo]}" for campo in
+                    ('estimador', 'n', 'n_bootstrap', 'distribucion', 'n_trabajadores'))
+
+
+def ejecutar_rejilla(rejilla, estimadores, repeticiones, salida=sys.stderr):
+    casos = []
+    for n, n_bootstrap, distribucion, n_trabajadores in itertools.product(
+            rejilla['n'], rejilla['n_bootstrap'], rejilla['distribucion'], rejilla['n_trabajadores']):
+        datos = generar_datos(distribucion, n)
+        for nombre in estimadores:
+            segundos, pico = medir(ESTIMADORES[nombre], datos, n_bootstrap, n_trabajadores, repeticiones)
+            caso = {'estimador': nombre, 'n': n, 'n_bootstrap': n_bootstrap,
+                    'distribucion': distribucion, 'n_trabajadores': n_trabajadores,
+                    'segundos': segundos, 'replicas_por_segundo': n_bootstrap / segundos,
+                    'pico_memoria_bytes': pico}
+            casos.append(caso)
+            print(f"{clave_caso(caso)}: {segundos * 1000:.1f} ms, {caso['replicas_por_segundo']:,.0f} réplicas/s, "
+                  f"{pico / (1024 * 1024):.1f} MB", file=salida)
+    return casos
+
+
+def informacion_maquina():
+    return {'python': platform.python_version(), 'numpy': np.__version__, 'sistema': platform.platform(),
+            'procesador': platform.processor() or platform.machine(), 'nucleos': os.cpu_count()}
+
+
+def comparar(casos, base, umbral, margen_segundos=0.005):
+    # Devuelve los casos más lentos que la base por encima del umbral; el
+    # margen absoluto evita falsas alarmas por ruido en casos de milisegundos
+    tiempos_base = {clave_caso(caso): caso['segundos'] for caso in base['casos']}
+    regresiones = []
+    for caso in casos:
+        clave = clave_caso(caso)
+        if clave not in tiempos_base:
+            continue
+        tiempo_base = tiempos_base[clave]
+        if caso['segundos'] > umbral * tiempo_base and caso['segundos'] - tiempo_base > margen_segundos:
+            regresiones.append((clave, tiempos_base[clave], caso['segundos']))
+    return regresiones
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de los estimadores bootstrap")
+    parser.add_argument('--rapido', action='store_true', help="Rejilla reducida (para CI)")
+    parser.add_argument('-e', '--estimador', action='append', dest='estimadores', choices=list(ESTIMADORES),
+                        help="Estimador a medir; se puede repetir. Por defecto: todos")
+    parser.add_argument('-r', '--repeticiones', type=int, default=3)
+    parser.add_argument('-o', '--salida', help="Archivo JSON con los resultados")
+    parser.add_argument('--comparar', help="JSON de una corrida anterior usado como base")
+    parser.add_argument('--umbral', type=float, default=1.25,
+                        help="Factor de tiempo sobre la base que cuenta como regresión (por defecto 1.25)")
+    parser.add_argument('--margen-ms', type=float, default=5.0,
+                        help="Diferencia mínima en ms para contar una regresión (por defecto 5)")
+    opciones = parser.parse_args(argumentos)
+
+    rejilla = REJILLA_RAPIDA if opciones.rapido else REJILLA
+    casos = ejecutar_rejilla(rejilla, opciones.estimadores or list(ESTIMADORES), opciones.repeticiones)
+    resultados = {'maquina': informacion_maquina(), 'rejilla': rejilla, 'casos': casos}
+    if opciones.salida:
+        with open(opciones.salida, 'w', encoding='utf-8') as archivo:
+            json.dump(resultados, archivo, indent=2)
+
+    if opciones.comparar:
+        with open(opciones.comparar, encoding='utf-8') as archivo:
+            base = json.load(archivo)
+        regresiones = comparar(casos, base, opciones.umbral, opciones.margen_ms / 1000)
+        for clave, tiempo_base, tiempo in regresiones:
+            print(f"REGRESIÓN {clave}: {tiempo_base * 1000:.1f} ms -> {tiempo * 1000:.1f} ms "
+                  f"(x{tiempo / tiempo_base:.2f})", file=sys.stderr)
+        if regresiones:
+            return 1
+        print(f"Sin regresiones (umbral x{opciones.umbral})", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,23 +1,32 @@
+import functools
+import io
+import os
+
 import streamlit as st
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy import stats
 import plotly.graph_objects as go
-import plotly.express as px
 from plotly.subplots import make_subplots
 
-# Configuración de la página
-st.set_page_config(
-    page_title="Bootstrap Estadístico",
-    page_icon="📊",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+from bootstrap_met import (
+    MEMORIA_MAXIMA_CACHE, RUTA_ALMACEN, AlmacenDisco, CacheResultados, GestorTrabajos, agregar_registros,
+    bootstrap_con_cache, bootstrap_desviacion_estandar, bootstrap_dos_muestras, bootstrap_media_alturas, bootstrap_mediana_salarios, bootstrap_percentil_90,
+    bootstrap_proporcion_calidad, clave_cache, extraer_columna, fase, leer_tabla, medicion, normalizar_datos,
+    parsear_valores, tamano_resultado)
+
+
+def configurar_pagina():
+    # Configuración de la página; solo al ejecutar la app, importar este
+    # módulo no toca la página
+    st.set_page_config(
+        page_title="Bootstrap Estadístico",
+        page_icon="📊",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
 
-# CSS personalizado con Tailwind-like styling
-st.markdown("""
+    # CSS personalizado con Tailwind-like styling
+    st.markdown("""
 <style>
     .main-header {
         font-size: 2.5rem;
@@ -66,196 +75,255 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Funciones Bootstrap (adaptadas del código original)
-
-
-def bootstrap_media_alturas(datos, n_bootstrap=1000):
-    datos = np.array(datos)
-    n = len(datos)
-
-    medias_bootstrap = []
-    for i in range(n_bootstrap):
-        muestra_bootstrap = np.random.choice(datos, size=n, replace=True)
-        media_bootstrap = np.mean(muestra_bootstrap)
-        medias_bootstrap.append(media_bootstrap)
-
-    medias_bootstrap = np.array(medias_bootstrap)
-
-    media_original = np.mean(datos)
-    media_bootstrap_promedio = np.mean(medias_bootstrap)
-    error_estandar = np.std(medias_bootstrap)
-
-    ic_95 = np.percentile(medias_bootstrap, [2.5, 97.5])
-    ic_90 = np.percentile(medias_bootstrap, [5, 95])
-
-    return {
-        'datos_originales': datos,
-        'media_original': media_original,
-        'medias_bootstrap': medias_bootstrap,
-        'media_bootstrap_promedio': media_bootstrap_promedio,
-        'error_estandar': error_estandar,
-        'ic_95': ic_95,
-        'ic_90': ic_90,
-        'n_bootstrap': n_bootstrap
-    }
-
-
-def bootstrap_mediana_salarios(datos, n_bootstrap=1000):
-    datos = np.array(datos)
-    n = len(datos)
-
-    medianas_bootstrap = []
-    medias_bootstrap = []
-
-    for i in range(n_bootstrap):
-        muestra_bootstrap = np.random.choice(datos, size=n, replace=True)
-        mediana_bootstrap = np.median(muestra_bootstrap)
-        media_bootstrap = np.mean(muestra_bootstrap)
-        medianas_bootstrap.append(mediana_bootstrap)
-        medias_bootstrap.append(media_bootstrap)
-
-    medianas_bootstrap = np.array(medianas_bootstrap)
-    medias_bootstrap = np.array(medias_bootstrap)
-
-    mediana_original = np.median(datos)
-    media_original = np.mean(datos)
-
-    mediana_bootstrap_promedio = np.mean(medianas_bootstrap)
-    error_estandar_mediana = np.std(medianas_bootstrap)
-
-    ic_95_mediana = np.percentile(medianas_bootstrap, [2.5, 97.5])
-
-    return {
-        'datos_originales': datos,
-        'mediana_original': mediana_original,
-        'media_original': media_original,
-        'medianas_bootstrap': medianas_bootstrap,
-        'medias_bootstrap': medias_bootstrap,
-        'mediana_bootstrap_promedio': mediana_bootstrap_promedio,
-        'error_estandar_mediana': error_estandar_mediana,
-        'ic_95_mediana': ic_95_mediana
-    }
-
-
-def bootstrap_desviacion_estandar(datos, n_bootstrap=1000):
-    datos = np.array(datos)
-    n = len(datos)
-
-    desviaciones_bootstrap = []
-
-    for i in range(n_bootstrap):
-        muestra_bootstrap = np.random.choice(datos, size=n, replace=True)
-        desviacion_bootstrap = np.std(muestra_bootstrap, ddof=1)
-        desviaciones_bootstrap.append(desviacion_bootstrap)
-
-    desviaciones_bootstrap = np.array(desviaciones_bootstrap)
-
-    desviacion_original = np.std(datos, ddof=1)
-    desviacion_bootstrap_promedio = np.mean(desviaciones_bootstrap)
-    error_estandar_desviacion = np.std(desviaciones_bootstrap)
-
-    ic_95_desviacion = np.percentile(desviaciones_bootstrap, [2.5, 97.5])
-
-    return {
-        'datos_originales': datos,
-        'desviacion_original': desviacion_original,
-        'desviaciones_bootstrap': desviaciones_bootstrap,
-        'desviacion_bootstrap_promedio': desviacion_bootstrap_promedio,
-        'error_estandar_desviacion': error_estandar_desviacion,
-        'ic_95_desviacion': ic_95_desviacion
-    }
-
 
-def bootstrap_proporcion_calidad(datos, n_bootstrap=1000):
-    datos = np.array(datos)
-    n = len(datos)
+@st.cache_resource
+def obtener_cache_resultados():
+    # El script se re-ejecuta en cada interacción: la caché vive en un recurso
+    # de Streamlit para sobrevivir a los reruns. Con BOOTSTRAP_MET_ALMACEN
+    # los resultados también van a disco y sobreviven a reinicios
+    almacen = AlmacenDisco(RUTA_ALMACEN) if RUTA_ALMACEN else None
+    return CacheResultados(almacen=almacen)
+
+
+@st.cache_resource
+def obtener_gestor_trabajos():
+    # Compartido por todas las sesiones: los trabajos largos corren en sus
+    # hilos y no en el del script, que sigue atendiendo la interfaz
+    return GestorTrabajos()
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def parsear_valores_cacheado(texto, permitir_float32=False):
+    return parsear_valores(texto, permitir_float32)
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def leer_tabla_cacheada(contenido, nombre):
+    return leer_tabla(io.BytesIO(contenido), nombre)
+
+
+def mostrar_diagnostico(resultado):
+    if resultado.get('estrategia') in ESTRATEGIAS_NOMBRES:
+        st.caption(ESTRATEGIAS_NOMBRES[resultado['estrategia']])
+    if 'longitud_bloque' in resultado:
+        st.caption(
+            f"Remuestreo por {ESQUEMAS_REMUESTREO_NOMBRES[resultado['esquema']]}, "
+            f"longitud {'media ' if resultado['esquema'] == 'estacionario' else ''}"
+            f"{resultado['longitud_bloque']}; el IC BCa solo corrige el sesgo")
+    elif 'esquema' in resultado:
+        st.caption(f"Remuestreo: {ESQUEMAS_REMUESTREO_NOMBRES[resultado['esquema']]}")
+    if 'convergio' not in resultado:
+        return
+    estado = "convergió" if resultado['convergio'] else "alcanzó el máximo"
+    errores = max(resultado['error_mc_error_estandar'].values())
+    st.caption(
+        f"Réplicas usadas: {resultado['n_bootstrap']:,} ({estado}); "
+        f"error Monte Carlo del error estándar ≤ {errores:.4g}")
+
+
+def describir_invalidos(invalidos, maximo=10):
+    posiciones = ", ".join(str(posicion + 1) for posicion in invalidos[:maximo])
+    if len(invalidos) > maximo:
+        posiciones += ", …"
+    return f"⚠️ {len(invalidos)} valores inválidos ignorados (posiciones: {posiciones})"
+
+
+def cargar_datos_personalizados(etiqueta, valor_defecto, clave, permitir_float32=False):
+    # Texto pegado o archivo subido; los valores inválidos se informan por
+    # posición en lugar de descartar todo el conjunto
+    archivo = st.file_uploader(
+        "...o sube un archivo (CSV, Parquet, NPY):", type=['csv', 'txt', 'parquet', 'npy'],
+        key=f"{clave}_archivo")
+
+    try:
+        if archivo is not None:
+            with fase('lectura', archivo=archivo.name):
+                tabla = leer_tabla_cacheada(archivo.getvalue(), archivo.name)
+            columna = st.selectbox(
+                "Columna:", list(tabla.columns), key=f"{clave}_columna")
+            valores, invalidos = extraer_columna(
+                tabla, columna, permitir_float32)
+        else:
+            texto = st.text_area(etiqueta, value=valor_defecto, key=clave)
+            with fase('parseo', caracteres=len(texto)):
+                valores, invalidos = parsear_valores_cacheado(
+                    texto, permitir_float32)
+    except (ValueError, pd.errors.ParserError) as error:
+        st.error(f"❌ No se pudieron leer los datos: {error}")
+        return np.array([], dtype=np.float64)
+
+    if len(invalidos) > 0:
+        st.warning(describir_invalidos(invalidos))
+    if len(valores) > 0:
+        st.success(f"✅ {len(valores)} valores cargados ({valores.dtype})")
+    else:
+        st.error("❌ Formato inválido. Usa números separados por comas.")
+    return valores
+
+# Esquemas de remuestreo; los de bloques solo donde los datos son una serie
+ESQUEMAS_REMUESTREO = {"Clásico (remuestreo con reemplazo)": 'iid',
+                       "Bayesiano (pesos de Dirichlet)": 'bayesiano'}
+ESQUEMAS_SERIE = {"Bloques móviles": 'bloques_moviles',
+                  "Bloques circulares": 'bloques_circulares',
+                  "Estacionario (bloques de longitud aleatoria)": 'estacionario'}
+ESQUEMAS_REMUESTREO_NOMBRES = {'bayesiano': "bootstrap bayesiano (pesos de Dirichlet)",
+                               'bloques_moviles': "bloques móviles",
+                               'bloques_circulares': "bloques circulares",
+                               'estacionario': "bloques de longitud aleatoria (estacionario)"}
+
+ESTRATEGIAS_NOMBRES = {'exacta': "Distribución bootstrap exacta (todas las remuestras, sin Monte Carlo)",
+                       'analitica': "Aproximación normal analítica (error estándar sd/√n, sin Monte Carlo)"}
+
+
+def seleccionar_esquema(clave, serie=False):
+    # Parámetros extra del estimador; vacío con el clásico para que la clave
+    # de caché sea la misma que sin elegir esquema
+    esquemas = {**ESQUEMAS_REMUESTREO, **ESQUEMAS_SERIE} if serie else ESQUEMAS_REMUESTREO
+    ayuda = ("El bayesiano pondera los datos originales en vez de repetirlos: la distribución bootstrap "
+             "sale suave aun con muestras pequeñas.")
+    if serie:
+        ayuda += (" Los de bloques toman los datos como una serie en orden: con autocorrelación, "
+                  "remuestrear valores sueltos da intervalos demasiado estrechos.")
+    esquema = esquemas[st.selectbox(
+        "Esquema de remuestreo:", list(esquemas), key=f"{clave}_esquema", help=ayuda)]
+    if esquema == 'iid':
+        return {}
+    if esquema == 'bayesiano':
+        return {'esquema': esquema}
+    if st.checkbox("Longitud de bloque automática", value=True, key=f"{clave}_longitud_auto",
+                   help="Politis y White (2004)"):
+        return {'esquema': esquema}
+    longitud = st.number_input("Longitud de bloque:", min_value=1, value=10, step=1,
+                               key=f"{clave}_longitud")
+    return {'esquema': esquema, 'longitud_bloque': int(longitud)}
+
+
+def opciones_estrategia():
+    # Vacío con la estrategia automática, igual que los ejemplos precalculados
+    if st.session_state.get('estrategia_auto', True):
+        return {}
+    return {'estrategia': 'monte_carlo'}
 
-    proporciones_bootstrap = []
+# Función para crear gráficos con Plotly
 
-    for i in range(n_bootstrap):
-        muestra_bootstrap = np.random.choice(datos, size=n, replace=True)
-        proporcion_bootstrap = np.mean(muestra_bootstrap)
-        proporciones_bootstrap.append(proporcion_bootstrap)
+# Barras máximas por histograma cuando se agrupa en el servidor: el tamaño
+# del gráfico enviado al navegador no depende de B ni de n
+BINS_GRAFICO = 60
 
-    proporciones_bootstrap = np.array(proporciones_bootstrap)
 
-    proporcion_original = np.mean(datos)
-    proporcion_bootstrap_promedio = np.mean(proporciones_bootstrap)
-    error_estandar_proporcion = np.std(proporciones_bootstrap)
+def agrupar_histograma(valores, max_bins=BINS_GRAFICO):
+    valores = np.asarray(valores)
+    valores = valores[np.isfinite(valores)]
+    # Regla 'auto' de NumPy, acotada a max_bins
+    bins = min(len(np.histogram_bin_edges(valores, bins='auto')) - 1, max_bins)
+    return np.histogram(valores, bins=max(bins, 1))
 
-    ic_95 = np.percentile(proporciones_bootstrap, [2.5, 97.5])
 
-    return {
-        'datos_originales': datos,
-        'proporcion_original': proporcion_original,
-        'proporciones_bootstrap': proporciones_bootstrap,
-        'proporcion_bootstrap_promedio': proporcion_bootstrap_promedio,
-        'error_estandar_proporcion': error_estandar_proporcion,
-        'ic_95_percentil': ic_95,
-        'n_total': n,
-        'n_exitos': int(np.sum(datos))
-    }
+def traza_histograma(histograma, nombre, color):
+    conteos, bordes = histograma
+    return go.Bar(x=(bordes[:-1] + bordes[1:]) / 2, y=conteos, width=np.diff(bordes),
+                  name=nombre, marker_color=color, opacity=0.7)
 
 
-def bootstrap_percentil_90(datos, percentil=90, n_bootstrap=1000):
-    datos = np.array(datos)
-    n = len(datos)
+def crear_grafico_bootstrap(datos_originales, datos_bootstrap, titulo, valor_original, ic_95, xlabel="Valor", color="#3b82f6",
+                            histograma=None, promedio_bootstrap=None, agrupar_en_servidor=True, max_bins=BINS_GRAFICO,
+                            eje_bootstrap="Frecuencia"):
+    # Con agrupar_en_servidor=True se envían max_bins barras por panel en vez
+    # de todos los valores; `histograma` y `promedio_bootstrap` reutilizan lo
+    # que ya calculó el estimador. `eje_bootstrap` titula el eje vertical del
+    # panel bootstrap (probabilidades en las distribuciones exactas)
+    fig = make_subplots(
+        rows=1, cols=2,
+        subplot_titles=("Datos Originales", "Distribución Bootstrap"),
+        horizontal_spacing=0.1
+    )
 
-    percentiles_bootstrap = []
+    # Gráfico de datos originales
+    if agrupar_en_servidor:
+        fig.add_trace(
+            traza_histograma(agrupar_histograma(datos_originales, max_bins),
+                             "Datos Originales", "skyblue"),
+            row=1, col=1
+        )
+    else:
+        fig.add_trace(
+            go.Histogram(x=datos_originales, name="Datos Originales",
+                         marker_color="skyblue", opacity=0.7),
+            row=1, col=1
+        )
 
-    for i in range(n_bootstrap):
-        muestra_bootstrap = np.random.choice(datos, size=n, replace=True)
-        percentil_bootstrap = np.percentile(muestra_bootstrap, percentil)
-        percentiles_bootstrap.append(percentil_bootstrap)
+    fig.add_vline(x=valor_original, line_dash="dash", line_color="red",
+                  annotation_text=f"Original: {valor_original:.2f}", row=1, col=1)
 
-    percentiles_bootstrap = np.array(percentiles_bootstrap)
+    # Gráfico de bootstrap (si solo se guardó el histograma, se dibuja como barras)
+    if datos_bootstrap is None or (agrupar_en_servidor and histograma is not None):
+        fig.add_trace(traza_histograma(histograma, "Bootstrap", color),
+                      row=1, col=2)
+    elif agrupar_en_servidor:
+        fig.add_trace(traza_histograma(agrupar_histograma(datos_bootstrap, max_bins), "Bootstrap", color),
+                      row=1, col=2)
+    else:
+        fig.add_trace(
+            go.Histogram(x=datos_bootstrap, name="Bootstrap",
+                         marker_color=color, opacity=0.7),
+            row=1, col=2
+        )
+
+    if promedio_bootstrap is None:
+        if datos_bootstrap is None:
+            conteos, bordes = histograma
+            promedio_bootstrap = np.average(
+                (bordes[:-1] + bordes[1:]) / 2, weights=conteos)
+        else:
+            promedio_bootstrap = np.mean(datos_bootstrap)
+
+    fig.add_vline(x=promedio_bootstrap, line_dash="dash", line_color="red",
+                  annotation_text=f"Bootstrap: {promedio_bootstrap:.2f}", row=1, col=2)
 
-    percentil_original = np.percentile(datos, percentil)
-    percentil_bootstrap_promedio = np.mean(percentiles_bootstrap)
-    error_estandar_percentil = np.std(percentiles_bootstrap)
+    fig.add_vline(x=ic_95[0], line_dash="dot", line_color="orange",
+                  annotation_text=f"IC 95%: [{ic_95[0]:.2f}, {ic_95[1]:.2f}]", row=1, col=2)
+    fig.add_vline(x=ic_95[1], line_dash="dot",
+                  line_color="orange", row=1, col=2)
 
-    ic_95 = np.percentile(percentiles_bootstrap, [2.5, 97.5])
+    fig.update_layout(
+        title_text=titulo,
+        title_x=0.5,
+        showlegend=False,
+        height=400,
+        template="plotly_white"
+    )
 
-    return {
-        'datos_originales': datos,
-        'percentil_objetivo': percentil,
-        'percentil_original': percentil_original,
-        'percentiles_bootstrap': percentiles_bootstrap,
-        'percentil_bootstrap_promedio': percentil_bootstrap_promedio,
-        'error_estandar_percentil': error_estandar_percentil,
-        'ic_95': ic_95
-    }
+    fig.update_xaxes(title_text=xlabel)
+    fig.update_yaxes(title_text="Frecuencia", row=1, col=1)
+    fig.update_yaxes(title_text=eje_bootstrap, row=1, col=2)
 
-# Función para crear gráficos con Plotly
+    return fig
 
 
-def crear_grafico_bootstrap(datos_originales, datos_bootstrap, titulo, valor_original, ic_95, xlabel="Valor", color="#3b82f6"):
+def crear_grafico_dos_muestras(muestras, datos_bootstrap, titulo, valor_original, ic_95, valor_nulo,
+                               xlabel="Valor", color="#ef4444", histograma=None, promedio_bootstrap=None,
+                               etiquetas=("Muestra A", "Muestra B"), max_bins=BINS_GRAFICO):
+    # Las dos muestras superpuestas con las mismas barras y la distribución
+    # bootstrap de la comparación; `valor_nulo` (0 o 1) marca "sin diferencia"
     fig = make_subplots(
         rows=1, cols=2,
         subplot_titles=("Datos Originales", "Distribución Bootstrap"),
         horizontal_spacing=0.1
     )
+    _, bordes = agrupar_histograma(np.concatenate(muestras), max_bins)
+    for muestra, etiqueta, color_muestra in zip(muestras, etiquetas, ("skyblue", "salmon")):
+        fig.add_trace(traza_histograma(np.histogram(muestra, bins=bordes), etiqueta, color_muestra),
+                      row=1, col=1)
 
-    # Gráfico de datos originales
-    fig.add_trace(
-        go.Histogram(x=datos_originales, name="Datos Originales",
-                     marker_color="skyblue", opacity=0.7),
-        row=1, col=1
-    )
+    if datos_bootstrap is None or histograma is not None:
+        fig.add_trace(traza_histograma(histograma, "Bootstrap", color), row=1, col=2)
+    else:
+        fig.add_trace(traza_histograma(agrupar_histograma(datos_bootstrap, max_bins), "Bootstrap", color),
+                      row=1, col=2)
 
     fig.add_vline(x=valor_original, line_dash="dash", line_color="red",
-                  annotation_text=f"Original: {valor_original:.2f}", row=1, col=1)
-
-    # Gráfico de bootstrap
-    fig.add_trace(
-        go.Histogram(x=datos_bootstrap, name="Bootstrap",
-                     marker_color=color, opacity=0.7),
-        row=1, col=2
-    )
-
-    fig.add_vline(x=np.mean(datos_bootstrap), line_dash="dash", line_color="red",
-                  annotation_text=f"Bootstrap: {np.mean(datos_bootstrap):.2f}", row=1, col=2)
-
+                  annotation_text=f"Original: {valor_original:.2f}", row=1, col=2)
+    fig.add_vline(x=valor_nulo, line_dash="dash", line_color="gray", row=1, col=2)
     fig.add_vline(x=ic_95[0], line_dash="dot", line_color="orange",
                   annotation_text=f"IC 95%: [{ic_95[0]:.2f}, {ic_95[1]:.2f}]", row=1, col=2)
     fig.add_vline(x=ic_95[1], line_dash="dot",
@@ -264,7 +332,8 @@ def crear_grafico_bootstrap(datos_originales, datos_bootstrap, titulo, valor_ori
     fig.update_layout(
         title_text=titulo,
         title_x=0.5,
-        showlegend=False,
+        barmode='overlay',
+        legend=dict(orientation="h", y=-0.2),
         height=400,
         template="plotly_white"
     )
@@ -276,8 +345,668 @@ def crear_grafico_bootstrap(datos_originales, datos_bootstrap, titulo, valor_ori
 
 # Interfaz principal
 
+def figura_resultado(clave, resultado, *args, crear=crear_grafico_bootstrap, **kwargs):
+    # Cada pestaña guarda su última figura junto al resultado que la generó;
+    # mientras el resultado sea el mismo objeto no se vuelve a construir
+    guardada = st.session_state.get(f'figura_{clave}')
+    if guardada is not None and guardada[0] is resultado:
+        return guardada[1]
+    if resultado.get('estrategia') in ESTRATEGIAS_NOMBRES:
+        # Sin réplicas: el histograma de una distribución exacta o analítica
+        # lleva probabilidades, no conteos
+        kwargs['eje_bootstrap'] = "Probabilidad"
+    with fase('grafico'):
+        fig = crear(
+            resultado['datos_originales'], *args, **kwargs)
+    st.session_state[f'figura_{clave}'] = (resultado, fig)
+    return fig
+
+
+def mostrar_grafico(fig):
+    # st.plotly_chart serializa la figura a JSON para el navegador
+    with fase('serializacion'):
+        st.plotly_chart(fig, width='stretch')
+
+
+def bytes_en_sesion():
+    return sum(tamano_resultado(valor) for clave, valor in st.session_state.items()
+               if str(clave).startswith('resultado_'))
+
+
+def mostrar_fases(registros):
+    filas = [{'fase': registro['fase'], 'ms': round(registro['segundos'] * 1000, 2),
+              'réplicas/s': round(registro['n_bootstrap'] / registro['segundos'])
+              if 'n_bootstrap' in registro and registro['segundos'] > 0 else None}
+             for registro in registros]
+    with st.expander("⏱️ Diagnóstico de la última ejecución"):
+        st.dataframe(pd.DataFrame(filas), hide_index=True, width='stretch')
+
+
+def con_diagnostico(clave):
+    # Mide las fases de la pestaña (solo si el panel de diagnóstico está
+    # activo) y las muestra al final; sin él, fase() no mide nada
+    def decorador(pestana):
+        @functools.wraps(pestana)
+        def envoltura(*args, **kwargs):
+            activa = st.session_state.get('diagnostico_activo', False)
+            with medicion(activa) as registros:
+                with fase('pestana', pestana=clave):
+                    pestana(*args, **kwargs)
+            if registros:
+                st.session_state[f'fases_{clave}'] = registros
+                mostrar_fases(registros)
+
+        return envoltura
+
+    return decorador
+
+
+# Ejecución en segundo plano
+
+# Segundos entre consultas al trabajo en curso
+INTERVALO_SONDEO = 0.5
+
+
+def ejecutar_bootstrap(clave, funcion, datos, cache, **parametros):
+    # Botón de la pestaña. En primer plano devuelve el resultado al pulsarlo;
+    # en segundo plano envía un trabajo y devuelve su resultado en la
+    # ejecución en la que se lo encuentra terminado (una sola vez)
+    aviso = st.session_state.pop(f'aviso_{clave}', None)
+    if aviso is not None:
+        st.warning(aviso)
+    trabajo = st.session_state.get(f'trabajo_{clave}')
+    en_curso = trabajo is not None and not trabajo.terminado
+    if st.button("🚀 Ejecutar Bootstrap", key=f"btn_{clave}", disabled=en_curso):
+        # Con dos muestras (tupla) ambas deben tener datos
+        if min(map(len, datos)) == 0 if isinstance(datos, tuple) else len(datos) == 0:
+            return None
+        if not st.session_state.get('segundo_plano', True):
+            return bootstrap_con_cache(funcion, datos, cache, **parametros)
+        st.session_state[f'trabajo_{clave}'] = obtener_gestor_trabajos().enviar(
+            funcion, datos, cache, **parametros)
+        return None
+
+    if trabajo is None or en_curso:
+        return None
+    del st.session_state[f'trabajo_{clave}']
+    agregar_registros(trabajo.fases)
+    if trabajo.estado == 'cancelado':
+        st.warning("⏹️ Ejecución cancelada")
+    elif trabajo.estado == 'error':
+        st.error(f"❌ La ejecución falló: {trabajo.error}")
+    return trabajo.resultado
+
+
+def grafico_parcial(replicas, ic_95, titulo, xlabel, color):
+    fig = go.Figure(traza_histograma(agrupar_histograma(replicas), "Bootstrap", color))
+    fig.add_vline(x=ic_95[0], line_dash="dot", line_color="orange",
+                  annotation_text=f"IC 95% parcial: [{ic_95[0]:.2f}, {ic_95[1]:.2f}]")
+    fig.add_vline(x=ic_95[1], line_dash="dot", line_color="orange")
+    fig.update_layout(title_text=f"{titulo} (en curso)", title_x=0.5, showlegend=False,
+                      height=400, template="plotly_white")
+    fig.update_xaxes(title_text=xlabel)
+    fig.update_yaxes(title_text="Frecuencia")
+    return fig
+
+
+@st.fragment(run_every=INTERVALO_SONDEO)
+def panel_trabajo(clave, titulo, xlabel, color):
+    # Progreso, histograma e IC con las réplicas terminadas hasta ahora y
+    # botón para cancelar; solo este fragmento se repite mientras corre
+    trabajo = st.session_state.get(f'trabajo_{clave}')
+    if trabajo is None:
+        return
+    if trabajo.terminado:
+        # La pestaña recoge el resultado en una ejecución completa
+        st.rerun()
+
+    terminadas = trabajo.replicas_terminadas()
+    texto = "En cola…" if trabajo.estado == 'pendiente' else f"{terminadas:,} de {trabajo.total:,} réplicas"
+    st.progress(trabajo.progreso(), text=texto)
+    if st.button("⏹️ Cancelar", key=f"cancelar_{clave}"):
+        # El trabajo puede estar compartido con otras sesiones: esta deja de
+        # seguirlo y el cálculo se detiene solo si nadie más lo espera
+        trabajo.cancelar()
+        del st.session_state[f'trabajo_{clave}']
+        st.session_state[f'aviso_{clave}'] = "⏹️ Ejecución cancelada"
+        st.rerun()
+
+    parciales = trabajo.replicas_parciales()
+    if len(parciales) > 1:
+        ic_95 = np.percentile(parciales, [2.5, 97.5])
+        mostrar_grafico(grafico_parcial(parciales, ic_95, titulo, xlabel, color))
+
+
+# Datos de ejemplo de cada pestaña. Son iguales para todos los visitantes:
+# sus resultados con la configuración por defecto se calculan al arrancar
+
+DATOS_EJEMPLO = {
+    'media': [165, 170, 168, 172, 175, 169, 171, 167, 174, 173,
+              166, 168, 170, 172, 169, 171, 174, 176, 168, 170],
+    'mediana': [25000, 28000, 30000, 32000, 35000, 38000, 40000, 45000,
+                50000, 55000, 60000, 70000, 85000, 120000, 150000],
+    'desvest': [12.5, 13.2, 11.8, 14.1, 12.9, 13.5, 12.1, 13.8, 12.7, 13.3,
+                11.9, 14.2, 12.4, 13.1, 12.8, 13.6, 12.3, 13.9, 12.6, 13.4],
+    'proporcion': [0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0,
+                   0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0],
+    'percentil': [65, 70, 72, 75, 78, 80, 82, 84, 85, 87, 88, 89, 90, 91, 92,
+                  93, 94, 95, 96, 97, 98, 85, 88, 91, 93, 76, 79, 81, 83, 86]
+}
+
+ESTIMADORES_EJEMPLO = {
+    'media': bootstrap_media_alturas,
+    'mediana': bootstrap_mediana_salarios,
+    'desvest': bootstrap_desviacion_estandar,
+    'proporcion': bootstrap_proporcion_calidad,
+    'percentil': bootstrap_percentil_90
+}
+
+SEMILLA_DEFECTO = 42
+PERCENTIL_DEFECTO = 90
+N_BOOTSTRAP_PRECALCULADOS = (1000, 2000, 5000, 10000)
+
+
+@st.cache_resource
+def precalcular_ejemplos():
+    # Una vez por proceso. Los parámetros son los que envían las pestañas con
+    # la barra lateral por defecto (el número de trabajadores y el ejecutor
+    # no cuentan para la clave), así que esos pedidos encuentran el resultado
+    # en la caché o se suman al trabajo todavía en curso. Los ejemplos con
+    # resultado exacto o analítico tienen la misma clave para cualquier
+    # n_bootstrap y se envían una sola vez
+    gestor = obtener_gestor_trabajos()
+    cache = obtener_cache_resultados()
+    trabajos = {}
+    for n_bootstrap in N_BOOTSTRAP_PRECALCULADOS:
+        for clave, datos in DATOS_EJEMPLO.items():
+            parametros = {'n_bootstrap': n_bootstrap, 'semilla': SEMILLA_DEFECTO, 'almacenamiento': 'completo',
+                          **({'percentil': PERCENTIL_DEFECTO} if clave == 'percentil' else {})}
+            funcion = ESTIMADORES_EJEMPLO[clave]
+            clave_resultado = clave_cache(funcion, normalizar_datos(datos), parametros)
+            if clave_resultado not in trabajos:
+                trabajos[clave_resultado] = gestor.enviar(funcion, datos, cache, **parametros)
+    return list(trabajos.values())
+
+
+# Cada pestaña es un fragmento: sus widgets solo vuelven a ejecutar la
+# pestaña en la que están, no el script completo
+
+@st.fragment
+@con_diagnostico('media')
+def pestana_media(n_bootstrap, opciones_motor, permitir_float32, cache):
+    st.markdown('<div class="method-card">', unsafe_allow_html=True)
+    st.subheader("🎯 Bootstrap para la Media - Alturas de Estudiantes")
+
+    col1, col2 = st.columns([1, 2])
+
+    with col1:
+        st.markdown("**Configuración del ejemplo:**")
+
+        # Opción para usar datos predeterminados o personalizados
+        usar_datos_default = st.checkbox(
+            "Usar datos de ejemplo", value=True, key="media_default")
+
+        if usar_datos_default:
+            alturas = DATOS_EJEMPLO['media']
+            st.info(f"Usando {len(alturas)} alturas de ejemplo")
+        else:
+            alturas = cargar_datos_personalizados(
+                "Ingresa las alturas (separadas por comas):",
+                "165, 170, 168, 172, 175, 169, 171, 167, 174, 173",
+                "alturas_input", permitir_float32)
+        opciones_esquema = seleccionar_esquema('media')
+
+        resultado = ejecutar_bootstrap(
+            'media', bootstrap_media_alturas, alturas, cache, n_bootstrap=n_bootstrap,
+            **opciones_motor, **opciones_esquema, **opciones_estrategia())
+        if resultado is not None:
+            # Métricas
+            st.markdown("**Resultados:**")
+            st.markdown(
+                f'<div class="metric-card"><strong>Media Original:</strong> {resultado["media_original"]:.2f} cm</div>', unsafe_allow_html=True)
+            st.markdown(
+                f'<div class="metric-card"><strong>Media Bootstrap:</strong> {resultado["media_bootstrap_promedio"]:.2f} cm</div>', unsafe_allow_html=True)
+            st.markdown(
+                f'<div class="metric-card"><strong>Error Estándar:</strong> {resultado["error_estandar"]:.2f} cm</div>', unsafe_allow_html=True)
+            st.markdown(
+                f'<div class="metric-card"><strong>IC 95%:</strong> [{resultado["ic_95"][0]:.2f}, {resultado["ic_95"][1]:.2f}] cm</div>', unsafe_allow_html=True)
+            st.markdown(
+                f'<div class="metric-card"><strong>IC 95% BCa:</strong> [{resultado["ic_95_bca"][0]:.2f}, {resultado["ic_95_bca"][1]:.2f}] cm</div>', unsafe_allow_html=True)
+            mostrar_diagnostico(resultado)
+
+            # Guardar en session state
+            st.session_state['resultado_media'] = resultado
+
+    with col2:
+        if 'trabajo_media' in st.session_state:
+            panel_trabajo('media', "Bootstrap para la Media - Alturas", "Altura (cm)", "#3b82f6")
+        elif 'resultado_media' in st.session_state:
+            resultado = st.session_state['resultado_media']
+            fig = figura_resultado(
+                'media', resultado,
+                resultado['medias_bootstrap'],
+                "Bootstrap para la Media - Alturas",
+                resultado['media_original'],
+                resultado['ic_95'],
+                "Altura (cm)",
+                "#3b82f6",
+                histograma=resultado.histograma,
+                promedio_bootstrap=resultado.promedio
+            )
+            mostrar_grafico(fig)
+
+    st.markdown('</div>', unsafe_allow_html=True)
+
+
+@st.fragment
+@con_diagnostico('mediana')
+def pestana_mediana(n_bootstrap, opciones_motor, permitir_float32, cache):
+    st.markdown('<div class="method-card">', unsafe_allow_html=True)
+    st.subheader("💰 Bootstrap para la Mediana - Salarios")
+
+    col1, col2 = st.columns([1, 2])
+
+    with col1:
+        usar_datos_default = st.checkbox(
+            "Usar datos de ejemplo", value=True, key="mediana_default")
+
+        if usar_datos_default:
+            salarios = DATOS_EJEMPLO['mediana']
+            st.info(
+                f"Usando {len(salarios)} salarios de ejemplo (datos asimétricos)")
+        else:
+            salarios = cargar_datos_personalizados(
+                "Ingresa los salarios (separados por comas):",
+                "25000, 28000, 30000, 32000, 35000, 38000, 40000",
+                "salarios_input", permitir_float32)
+        opciones_esquema = seleccionar_esquema('mediana')
+
+        resultado = ejecutar_bootstrap(
+            'mediana', bootstrap_mediana_salarios, salarios, cache, n_bootstrap=n_bootstrap,
+            **opciones_motor, **opciones_esquema, **opciones_estrategia())
+        if resultado is not None:
+            st.markdown("**Resultados:**")
+            st.markdown(
+                f'<div class="metric-card"><strong>Mediana Original:</strong> ${resultado["mediana_original"]:,.0f}</div>', unsafe_allow_html=True)
+            st.markdown(
+                f'<div class="metric-card"><strong>Media Original:</strong> ${resultado["media_original"]:,.0f}</div>', unsafe_allow_html=True)
+            st.markdown(
+                f'<div class="metric-card"><strong>Mediana Bootstrap:</strong> ${resultado["mediana_bootstrap_promedio"]:,.0f}</div>', unsafe_allow_html=True)
+            st.markdown(
+                f'<div class="metric-card"><strong>IC 95%:</strong> [${resultado["ic_95_mediana"][0]:,.0f}, ${resultado["ic_95_mediana"][1]:,.0f}]</div>', unsafe_allow_html=True)
+            st.markdown(
+                f'<div class="metric-card"><strong>IC 95% BCa:</strong> [${resultado["ic_95_bca_mediana"][0]:,.0f}, ${resultado["ic_95_bca_mediana"][1]:,.0f}]</div>', unsafe_allow_html=True)
+            mostrar_diagnostico(resultado)
+
+            st.session_state['resultado_mediana'] = resultado
+
+    with col2:
+        if 'trabajo_mediana' in st.session_state:
+            panel_trabajo('mediana', "Bootstrap para la Mediana - Salarios", "Salario ($)", "#10b981")
+        elif 'resultado_mediana' in st.session_state:
+            resultado = st.session_state['resultado_mediana']
+            fig = figura_resultado(
+                'mediana', resultado,
+                resultado['medianas_bootstrap'],
+                "Bootstrap para la Mediana - Salarios",
+                resultado['mediana_original'],
+                resultado['ic_95_mediana'],
+                "Salario ($)",
+                "#10b981",
+                histograma=resultado.histograma,
+                promedio_bootstrap=resultado.promedio
+            )
+            mostrar_grafico(fig)
+
+    st.markdown('</div>', unsafe_allow_html=True)
+
+
+@st.fragment
+@con_diagnostico('desvest')
+def pestana_desvest(n_bootstrap, opciones_motor, permitir_float32, cache):
+    st.markdown('<div class="method-card">', unsafe_allow_html=True)
+    st.subheader("📊 Bootstrap para Desviación Estándar - Tiempos")
+
+    col1, col2 = st.columns([1, 2])
+
+    with col1:
+        usar_datos_default = st.checkbox(
+            "Usar datos de ejemplo", value=True, key="desvest_default")
+
+        if usar_datos_default:
+            tiempos = DATOS_EJEMPLO['desvest']
+            st.info(f"Usando {len(tiempos)} tiempos de producción")
+        else:
+            tiempos = cargar_datos_personalizados(
+                "Ingresa los tiempos (separados por comas):",
+                "12.5, 13.2, 11.8, 14.1, 12.9, 13.5, 12.1",
+                "tiempos_input", permitir_float32)
+        opciones_esquema = seleccionar_esquema('desvest', serie=True)
+
+        resultado = ejecutar_bootstrap(
+            'desvest', bootstrap_desviacion_estandar, tiempos, cache, n_bootstrap=n_bootstrap,
+            **opciones_motor, **opciones_esquema)
+        if resultado is not None:
+            st.markdown("**Resultados:**")
+            st.markdown(
+                f'<div class="metric-card"><strong>Desv. Est. Original:</strong> {resultado["desviacion_original"]:.3f}</div>', unsafe_allow_html=True)
+            st.markdown(
+                f'<div class="metric-card"><strong>Desv. Est. Bootstrap:</strong> {resultado["desviacion_bootstrap_promedio"]:.3f}</div>', unsafe_allow_html=True)
+            st.markdown(
+                f'<div class="metric-card"><strong>Error Estándar:</strong> {resultado["error_estandar_desviacion"]:.3f}</div>', unsafe_allow_html=True)
+            st.markdown(
+                f'<div class="metric-card"><strong>IC 95%:</strong> [{resultado["ic_95_desviacion"][0]:.3f}, {resultado["ic_95_desviacion"][1]:.3f}]</div>', unsafe_allow_html=True)
+            st.markdown(
+                f'<div class="metric-card"><strong>IC 95% BCa:</strong> [{resultado["ic_95_bca_desviacion"][0]:.3f}, {resultado["ic_95_bca_desviacion"][1]:.3f}]</div>', unsafe_allow_html=True)
+            mostrar_diagnostico(resultado)
+
+            st.session_state['resultado_desvest'] = resultado
+
+    with col2:
+        if 'trabajo_desvest' in st.session_state:
+            panel_trabajo('desvest', "Bootstrap para Desviación Estándar - Tiempos",
+                          "Desviación Estándar", "#f59e0b")
+        elif 'resultado_desvest' in st.session_state:
+            resultado = st.session_state['resultado_desvest']
+            fig = figura_resultado(
+                'desvest', resultado,
+                resultado['desviaciones_bootstrap'],
+                "Bootstrap para Desviación Estándar - Tiempos",
+                resultado['desviacion_original'],
+                resultado['ic_95_desviacion'],
+                "Desviación Estándar",
+                "#f59e0b",
+                histograma=resultado.histograma,
+                promedio_bootstrap=resultado.promedio
+            )
+            mostrar_grafico(fig)
+
+    st.markdown('</div>', unsafe_allow_html=True)
+
+
+@st.fragment
+@con_diagnostico('proporcion')
+def pestana_proporcion(n_bootstrap, opciones_motor, permitir_float32, cache):
+    st.markdown('<div class="method-card">', unsafe_allow_html=True)
+    st.subheader("✅ Bootstrap para Proporción - Control de Calidad")
+
+    col1, col2 = st.columns([1, 2])
+
+    with col1:
+        usar_datos_default = st.checkbox(
+            "Usar datos de ejemplo", value=True, key="proporcion_default")
+
+        if usar_datos_default:
+            control_calidad = DATOS_EJEMPLO['proporcion']
+            st.info(
+                f"Usando {len(control_calidad)} productos (0=bueno, 1=defectuoso)")
+            st.write(
+                f"Productos defectuosos: {sum(control_calidad)}/{len(control_calidad)}")
+        else:
+            archivo_calidad = st.file_uploader(
+                "Sube un archivo con indicadores 0/1 (CSV, Parquet, NPY) o genera los datos:",
+                type=['csv', 'txt', 'parquet', 'npy'], key="calidad_archivo")
+
+            if archivo_calidad is not None:
+                try:
+                    tabla = leer_tabla_cacheada(
+                        archivo_calidad.getvalue(), archivo_calidad.name)
+                    columna = st.selectbox(
+                        "Columna:", list(tabla.columns), key="calidad_columna")
+                    control_calidad, invalidos = extraer_columna(
+                        tabla, columna)
+                except (ValueError, pd.errors.ParserError) as error:
+                    st.error(f"❌ No se pudieron leer los datos: {error}")
+                    control_calidad, invalidos = np.array(
+                        [], dtype=np.uint8), []
+                if len(invalidos) > 0:
+                    st.warning(describir_invalidos(invalidos))
+                st.success(
+                    f"✅ {int(np.sum(control_calidad))}/{len(control_calidad)} defectuosos cargados")
+            else:
+                n_productos = st.number_input(
+                    "Número total de productos:", min_value=10, max_value=1000, value=40)
+                n_defectuosos = st.number_input(
+                    "Productos defectuosos:", min_value=0, max_value=n_productos, value=5)
+
+                # Sin barajar: la proporción no depende del orden y los
+                # mismos datos dan la misma huella (y aciertan en la caché)
+                control_calidad = [1] * n_defectuosos + \
+                    [0] * (n_productos - n_defectuosos)
+                st.success(
+                    f"✅ Datos generados: {n_defectuosos}/{n_productos} defectuosos")
+
+        opciones_esquema = seleccionar_esquema('proporcion')
+
+        resultado = ejecutar_bootstrap(
+            'proporcion', bootstrap_proporcion_calidad, control_calidad, cache,
+            n_bootstrap=n_bootstrap, **opciones_motor, **opciones_esquema,
+            **opciones_estrategia())
+        if resultado is not None:
+            st.markdown("**Resultados:**")
+            st.markdown(
+                f'<div class="metric-card"><strong>Proporción Original:</strong> {resultado["proporcion_original"]:.3f} ({resultado["proporcion_original"]*100:.1f}%)</div>', unsafe_allow_html=True)
+            st.markdown(
+                f'<div class="metric-card"><strong>Proporción Bootstrap:</strong> {resultado["proporcion_bootstrap_promedio"]:.3f}</div>', unsafe_allow_html=True)
+            st.markdown(
+                f'<div class="metric-card"><strong>Error Estándar:</strong> {resultado["error_estandar_proporcion"]:.3f}</div>', unsafe_allow_html=True)
+            st.markdown(
+                f'<div class="metric-card"><strong>IC 95%:</strong> [{resultado["ic_95_percentil"][0]:.3f}, {resultado["ic_95_percentil"][1]:.3f}]</div>', unsafe_allow_html=True)
+            st.markdown(
+                f'<div class="metric-card"><strong>IC 95% BCa:</strong> [{resultado["ic_95_bca"][0]:.3f}, {resultado["ic_95_bca"][1]:.3f}]</div>', unsafe_allow_html=True)
+            mostrar_diagnostico(resultado)
+
+            st.session_state['resultado_proporcion'] = resultado
+
+    with col2:
+        if 'trabajo_proporcion' in st.session_state:
+            panel_trabajo('proporcion', "Bootstrap para Proporción - Control de Calidad",
+                          "Proporción de Defectos", "#ef4444")
+        elif 'resultado_proporcion' in st.session_state:
+            resultado = st.session_state['resultado_proporcion']
+            fig = figura_resultado(
+                'proporcion', resultado,
+                resultado['proporciones_bootstrap'],
+                "Bootstrap para Proporción - Control de Calidad",
+                resultado['proporcion_original'],
+                resultado['ic_95_percentil'],
+                "Proporción de Defectos",
+                "#ef4444",
+                histograma=resultado.histograma,
+                promedio_bootstrap=resultado.promedio
+            )
+            mostrar_grafico(fig)
+
+    st.markdown('</div>', unsafe_allow_html=True)
+
+
+@st.fragment
+@con_diagnostico('percentil')
+def pestana_percentil(n_bootstrap, opciones_motor, permitir_float32, cache):
+    st.markdown('<div class="method-card">', unsafe_allow_html=True)
+    st.subheader("📈 Bootstrap para Percentil 90 - Puntuaciones")
+
+    col1, col2 = st.columns([1, 2])
+
+    with col1:
+        percentil_objetivo = st.slider(
+            "Percentil objetivo:", 10, 99, PERCENTIL_DEFECTO, 5)
+
+        usar_datos_default = st.checkbox(
+            "Usar datos de ejemplo", value=True, key="percentil_default")
+
+        if usar_datos_default:
+            puntuaciones = DATOS_EJEMPLO['percentil']
+            st.info(f"Usando {len(puntuaciones)} puntuaciones de ejemplo")
+        else:
+            puntuaciones = cargar_datos_personalizados(
+                "Ingresa las puntuaciones (separadas por comas):",
+                "65, 70, 72, 75, 78, 80, 82, 84, 85, 87",
+                "puntuaciones_input", permitir_float32)
+        opciones_esquema = seleccionar_esquema('percentil')
+
+        resultado = ejecutar_bootstrap(
+            'percentil', bootstrap_percentil_90, puntuaciones, cache,
+            percentil=percentil_objetivo, n_bootstrap=n_bootstrap, **opciones_motor, **opciones_esquema,
+            **opciones_estrategia())
+        if resultado is not None:
+            st.markdown("**Resultados:**")
+            st.markdown(
+                f'<div class="metric-card"><strong>Percentil {percentil_objetivo} Original:</strong> {resultado["percentil_original"]:.1f}</div>', unsafe_allow_html=True)
+            st.markdown(
+                f'<div class="metric-card"><strong>Percentil {percentil_objetivo} Bootstrap:</strong> {resultado["percentil_bootstrap_promedio"]:.1f}</div>', unsafe_allow_html=True)
+            st.markdown(
+                f'<div class="metric-card"><strong>Error Estándar:</strong> {resultado["error_estandar_percentil"]:.2f}</div>', unsafe_allow_html=True)
+            st.markdown(
+                f'<div class="metric-card"><strong>IC 95%:</strong> [{resultado["ic_95"][0]:.1f}, {resultado["ic_95"][1]:.1f}]</div>', unsafe_allow_html=True)
+            st.markdown(
+                f'<div class="metric-card"><strong>IC 95% BCa:</strong> [{resultado["ic_95_bca"][0]:.1f}, {resultado["ic_95_bca"][1]:.1f}]</div>', unsafe_allow_html=True)
+            mostrar_diagnostico(resultado)
+
+            st.session_state['resultado_percentil'] = resultado
+
+    with col2:
+        if 'trabajo_percentil' in st.session_state:
+            panel_trabajo('percentil', f"Bootstrap para Percentil {percentil_objetivo} - Puntuaciones",
+                          f"Percentil {percentil_objetivo}", "#8b5cf6")
+        elif 'resultado_percentil' in st.session_state:
+            resultado = st.session_state['resultado_percentil']
+            fig = figura_resultado(
+                'percentil', resultado,
+                resultado['percentiles_bootstrap'],
+                f"Bootstrap para Percentil {resultado['percentil_objetivo']} - Puntuaciones",
+                resultado['percentil_original'],
+                resultado['ic_95'],
+                f"Percentil {resultado['percentil_objetivo']}",
+                "#8b5cf6",
+                histograma=resultado.histograma,
+                promedio_bootstrap=resultado.promedio
+            )
+            mostrar_grafico(fig)
+
+    st.markdown('</div>', unsafe_allow_html=True)
+
+
+# Comparación de dos muestras: salarios de dos sedes (la primera es la del
+# ejemplo de la mediana) o defectos de dos líneas de producción
+
+SALARIOS_SEDE_B = [27000, 31000, 33000, 36000, 39000, 42000, 44000, 48000,
+                   52000, 58000, 63000, 68000, 75000, 90000, 98000, 135000]
+DEFECTOS_LINEA_B = [0, 1, 0, 0, 1, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 1,
+                    0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0]
+
+ESTADISTICOS_COMPARACION = {"Media": 'media', "Mediana": 'mediana',
+                            "Desviación estándar": 'desviacion', "Proporción": 'proporcion',
+                            "Percentil": 'percentil'}
+COMPARACIONES_NOMBRES = {"Diferencia (A − B)": 'diferencia', "Razón (A / B)": 'razon'}
+COMPARACION_EJE = {'diferencia': "A − B", 'razon': "A / B"}
+
+
+def formatear_valor(valor):
+    # Salarios con separador de miles, proporciones y razones con cifras
+    return f"{valor:,.2f}" if abs(valor) >= 100 else f"{valor:.4g}"
+
+
+@st.fragment
+@con_diagnostico('dos_muestras')
+def pestana_dos_muestras(n_bootstrap, opciones_motor, permitir_float32, cache):
+    st.markdown('<div class="method-card">', unsafe_allow_html=True)
+    st.subheader("⚖️ Comparación de Dos Muestras - Sedes y Líneas")
+
+    col1, col2 = st.columns([1, 2])
+
+    with col1:
+        nombre_estadistico = st.selectbox(
+            "Estadístico:", list(ESTADISTICOS_COMPARACION), key="dos_muestras_estadistico")
+        estadistico = ESTADISTICOS_COMPARACION[nombre_estadistico]
+        if estadistico == 'percentil':
+            percentil_objetivo = st.slider(
+                "Percentil objetivo:", 10, 99, PERCENTIL_DEFECTO, 5, key="dos_muestras_percentil")
+            estadistico = f'percentil_{percentil_objetivo}'
+            nombre_estadistico = f"Percentil {percentil_objetivo}"
+        comparacion = COMPARACIONES_NOMBRES[st.radio(
+            "Comparación:", list(COMPARACIONES_NOMBRES), horizontal=True, key="dos_muestras_comparacion")]
+        n_permutaciones = st.select_slider(
+            "Permutaciones del contraste", options=[1000, 10000, 100000], value=10000,
+            key="dos_muestras_permutaciones",
+            help="El p-valor compara la diferencia observada con la de repartos al azar de los datos "
+                 "combinados entre las dos muestras.")
+
+        usar_datos_default = st.checkbox(
+            "Usar datos de ejemplo", value=True, key="dos_muestras_default")
+
+        if usar_datos_default:
+            if estadistico == 'proporcion':
+                muestras = (DATOS_EJEMPLO['proporcion'], DEFECTOS_LINEA_B)
+                st.info("Usando defectos (1) de dos líneas de producción de ejemplo")
+            else:
+                muestras = (DATOS_EJEMPLO['mediana'], SALARIOS_SEDE_B)
+                st.info(f"Usando salarios de dos sedes de ejemplo ({len(muestras[0])} y {len(muestras[1])})")
+        else:
+            muestras = (
+                cargar_datos_personalizados(
+                    "Muestra A (separada por comas):", "25000, 28000, 30000, 32000, 35000, 38000, 40000",
+                    "muestra_a_input", permitir_float32),
+                cargar_datos_personalizados(
+                    "Muestra B (separada por comas):", "27000, 31000, 33000, 36000, 39000, 42000, 44000",
+                    "muestra_b_input", permitir_float32))
+        opciones_esquema = seleccionar_esquema('dos_muestras')
+
+        resultado = ejecutar_bootstrap(
+            'dos_muestras', bootstrap_dos_muestras, muestras, cache, estadistico=estadistico,
+            comparacion=comparacion, n_bootstrap=n_bootstrap, n_permutaciones=n_permutaciones,
+            **opciones_motor, **opciones_esquema)
+        if resultado is not None:
+            st.markdown("**Resultados:**")
+            st.markdown(
+                f'<div class="metric-card"><strong>{nombre_estadistico} A:</strong> {formatear_valor(resultado["valor_a"])}</div>', unsafe_allow_html=True)
+            st.markdown(
+                f'<div class="metric-card"><strong>{nombre_estadistico} B:</strong> {formatear_valor(resultado["valor_b"])}</div>', unsafe_allow_html=True)
+            st.markdown(
+                f'<div class="metric-card"><strong>{COMPARACION_EJE[resultado["comparacion"]]}:</strong> {formatear_valor(resultado.valor_original)}</div>', unsafe_allow_html=True)
+            st.markdown(
+                f'<div class="metric-card"><strong>Error Estándar:</strong> {formatear_valor(resultado.error_estandar)}</div>', unsafe_allow_html=True)
+            st.markdown(
+                f'<div class="metric-card"><strong>IC 95%:</strong> [{formatear_valor(resultado["ic_95"][0])}, {formatear_valor(resultado["ic_95"][1])}]</div>', unsafe_allow_html=True)
+            st.markdown(
+                f'<div class="metric-card"><strong>IC 95% BCa:</strong> [{formatear_valor(resultado["ic_95_bca"][0])}, {formatear_valor(resultado["ic_95_bca"][1])}]</div>', unsafe_allow_html=True)
+            st.markdown(
+                f'<div class="metric-card"><strong>p-valor (permutación):</strong> {resultado["p_valor"]:.4f} ({resultado["n_permutaciones"]:,} permutaciones)</div>', unsafe_allow_html=True)
+            if resultado.get('replicas_descartadas'):
+                st.warning(f"⚠️ Se descartaron {resultado['replicas_descartadas']:,} réplicas con el denominador "
+                           f"remuestreado igual a cero (razón no finita)")
+            mostrar_diagnostico(resultado)
+
+            st.session_state['resultado_dos_muestras'] = resultado
+
+    with col2:
+        if 'trabajo_dos_muestras' in st.session_state:
+            panel_trabajo('dos_muestras', f"Bootstrap de {nombre_estadistico}: {COMPARACION_EJE[comparacion]}",
+                          COMPARACION_EJE[comparacion], "#ef4444")
+        elif 'resultado_dos_muestras' in st.session_state:
+            resultado = st.session_state['resultado_dos_muestras']
+            eje = COMPARACION_EJE[resultado['comparacion']]
+            fig = figura_resultado(
+                'dos_muestras', resultado,
+                resultado.replicas,
+                f"Bootstrap de {nombre_estadistico}: {eje}",
+                resultado.valor_original,
+                resultado['ic_95'],
+                0.0 if resultado['comparacion'] == 'diferencia' else 1.0,
+                eje,
+                crear=crear_grafico_dos_muestras,
+                histograma=resultado.histograma,
+                promedio_bootstrap=resultado.promedio
+            )
+            mostrar_grafico(fig)
+
+    st.markdown('</div>', unsafe_allow_html=True)
+
 
 def main():
+    configurar_pagina()
+    precalcular_ejemplos()
+
     st.markdown('<h1 class="main-header">🎯 Métodos Bootstrap Interactivos</h1>',
                 unsafe_allow_html=True)
 
@@ -290,8 +1019,58 @@ def main():
     # Sidebar para configuración
     with st.sidebar:
         st.header("⚙️ Configuración")
-        n_bootstrap = st.slider(
-            "Número de muestras Bootstrap", 100, 5000, 1000, 100)
+        n_bootstrap = st.select_slider(
+            "Número de muestras Bootstrap",
+            options=[100, 500, 1000, 2000, 5000, 10000, 50000,
+                     100000, 500000, 1000000],
+            value=1000)
+        adaptativo = st.checkbox(
+            "Réplicas adaptativas (detener al converger)", value=False,
+            help="Agrega lotes de réplicas hasta que el error Monte Carlo del error estándar y del IC 95% es pequeño; el valor elegido arriba es el máximo.")
+        st.checkbox(
+            "Distribución exacta o analítica cuando se pueda", value=True, key='estrategia_auto',
+            help="Mediana, percentil y proporción con muestras chicas usan la distribución bootstrap exacta; "
+                 "media y proporción con muestras muy grandes, la aproximación normal. Sin error Monte Carlo.")
+
+        fijar_semilla = st.checkbox("Fijar semilla", value=True)
+        semilla = int(st.number_input(
+            "Semilla", min_value=0, value=SEMILLA_DEFECTO, step=1)) if fijar_semilla else None
+        n_nucleos = os.cpu_count() or 1
+        n_trabajadores = int(st.number_input(
+            "Trabajadores en paralelo", min_value=1, max_value=n_nucleos, value=min(4, n_nucleos), step=1))
+        ejecutores = {"Hilos": 'hilos', "Procesos": 'procesos'}
+        ejecutor = ejecutores[st.radio(
+            "Paralelismo", list(ejecutores), horizontal=True,
+            help="Los procesos no comparten el GIL; el motor se importa en cada uno sin la interfaz.")]
+        st.checkbox(
+            "Ejecutar en segundo plano", value=True, key='segundo_plano',
+            help="El botón envía un trabajo: se ve el avance con resultados parciales y se puede cancelar.")
+        permitir_float32 = st.checkbox(
+            "Datos en float32 (menos memoria)", value=False)
+        modos_almacenamiento = {"Réplicas completas (float64)": 'completo',
+                                "Réplicas en float32": 'float32',
+                                "Solo histograma y cuantiles": 'resumen'}
+        almacenamiento = modos_almacenamiento[st.selectbox(
+            "Almacenamiento de réplicas", list(modos_almacenamiento))]
+        opciones_motor = {'semilla': semilla,
+                          'n_trabajadores': n_trabajadores,
+                          'ejecutor': ejecutor,
+                          'almacenamiento': almacenamiento}
+        if adaptativo:
+            opciones_motor['n_maximo'] = n_bootstrap
+            n_bootstrap = 'auto'
+
+        cache = obtener_cache_resultados()
+        memoria_cache_mb = st.number_input(
+            "Memoria máxima de la caché (MB)", min_value=16, max_value=8192,
+            value=MEMORIA_MAXIMA_CACHE // (1024 * 1024), step=16)
+        cache.ajustar_memoria_maxima(memoria_cache_mb * 1024 * 1024)
+        # Se completa al final, cuando las pestañas ya consultaron la caché
+        panel_cache = st.empty()
+        diagnostico_activo = st.checkbox(
+            "Diagnóstico de rendimiento", key='diagnostico_activo',
+            help="Mide parseo, remuestreo, intervalos, gráfico y serialización en cada pestaña.")
+        panel_diagnostico = st.empty()
         st.divider()
 
         st.header("📋 Métodos Disponibles")
@@ -301,328 +1080,54 @@ def main():
         3. **Desviación Estándar** - Tiempos
         4. **Proporción** - Control de calidad
         5. **Percentil 90** - Puntuaciones
+        6. **Dos muestras** - Diferencias y razones con contraste de permutación
         """)
 
     # Tabs para diferentes métodos
-    tab1, tab2, tab3, tab4, tab5 = st.tabs([
+    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
         "📏 Media", "💰 Mediana", "📊 Desv. Estándar",
-        "✅ Proporción", "📈 Percentil"
+        "✅ Proporción", "📈 Percentil", "⚖️ Dos muestras"
     ])
 
     with tab1:
-        st.markdown('<div class="method-card">', unsafe_allow_html=True)
-        st.subheader("🎯 Bootstrap para la Media - Alturas de Estudiantes")
-
-        col1, col2 = st.columns([1, 2])
-
-        with col1:
-            st.markdown("**Configuración del ejemplo:**")
-
-            # Opción para usar datos predeterminados o personalizados
-            usar_datos_default = st.checkbox(
-                "Usar datos de ejemplo", value=True, key="media_default")
-
-            if usar_datos_default:
-                alturas = [165, 170, 168, 172, 175, 169, 171, 167, 174, 173,
-                           166, 168, 170, 172, 169, 171, 174, 176, 168, 170]
-                st.info(f"Usando {len(alturas)} alturas de ejemplo")
-            else:
-                alturas_input = st.text_area(
-                    "Ingresa las alturas (separadas por comas):",
-                    value="165, 170, 168, 172, 175, 169, 171, 167, 174, 173",
-                    key="alturas_input"
-                )
-                try:
-                    alturas = [float(x.strip())
-                               for x in alturas_input.split(',')]
-                    st.success(f"✅ {len(alturas)} valores cargados")
-                except:
-                    st.error(
-                        "❌ Formato inválido. Usa números separados por comas.")
-                    alturas = []
-
-            if st.button("🚀 Ejecutar Bootstrap", key="btn_media"):
-                if len(alturas) > 0:
-                    resultado = bootstrap_media_alturas(alturas, n_bootstrap)
-
-                    # Métricas
-                    st.markdown("**Resultados:**")
-                    st.markdown(
-                        f'<div class="metric-card"><strong>Media Original:</strong> {resultado["media_original"]:.2f} cm</div>', unsafe_allow_html=True)
-                    st.markdown(
-                        f'<div class="metric-card"><strong>Media Bootstrap:</strong> {resultado["media_bootstrap_promedio"]:.2f} cm</div>', unsafe_allow_html=True)
-                    st.markdown(
-                        f'<div class="metric-card"><strong>Error Estándar:</strong> {resultado["error_estandar"]:.2f} cm</div>', unsafe_allow_html=True)
-                    st.markdown(
-                        f'<div class="metric-card"><strong>IC 95%:</strong> [{resultado["ic_95"][0]:.2f}, {resultado["ic_95"][1]:.2f}] cm</div>', unsafe_allow_html=True)
-
-                    # Guardar en session state
-                    st.session_state['resultado_media'] = resultado
-
-        with col2:
-            if 'resultado_media' in st.session_state:
-                resultado = st.session_state['resultado_media']
-                fig = crear_grafico_bootstrap(
-                    resultado['datos_originales'],
-                    resultado['medias_bootstrap'],
-                    "Bootstrap para la Media - Alturas",
-                    resultado['media_original'],
-                    resultado['ic_95'],
-                    "Altura (cm)",
-                    "#3b82f6"
-                )
-                st.plotly_chart(fig, use_container_width=True)
-
-        st.markdown('</div>', unsafe_allow_html=True)
+        pestana_media(n_bootstrap, opciones_motor, permitir_float32, cache)
 
     with tab2:
-        st.markdown('<div class="method-card">', unsafe_allow_html=True)
-        st.subheader("💰 Bootstrap para la Mediana - Salarios")
-
-        col1, col2 = st.columns([1, 2])
-
-        with col1:
-            usar_datos_default = st.checkbox(
-                "Usar datos de ejemplo", value=True, key="mediana_default")
-
-            if usar_datos_default:
-                salarios = [25000, 28000, 30000, 32000, 35000, 38000, 40000, 45000,
-                            50000, 55000, 60000, 70000, 85000, 120000, 150000]
-                st.info(
-                    f"Usando {len(salarios)} salarios de ejemplo (datos asimétricos)")
-            else:
-                salarios_input = st.text_area(
-                    "Ingresa los salarios (separados por comas):",
-                    value="25000, 28000, 30000, 32000, 35000, 38000, 40000",
-                    key="salarios_input"
-                )
-                try:
-                    salarios = [float(x.strip())
-                                for x in salarios_input.split(',')]
-                    st.success(f"✅ {len(salarios)} valores cargados")
-                except:
-                    st.error("❌ Formato inválido")
-                    salarios = []
-
-            if st.button("🚀 Ejecutar Bootstrap", key="btn_mediana"):
-                if len(salarios) > 0:
-                    resultado = bootstrap_mediana_salarios(
-                        salarios, n_bootstrap)
-
-                    st.markdown("**Resultados:**")
-                    st.markdown(
-                        f'<div class="metric-card"><strong>Mediana Original:</strong> ${resultado["mediana_original"]:,.0f}</div>', unsafe_allow_html=True)
-                    st.markdown(
-                        f'<div class="metric-card"><strong>Media Original:</strong> ${resultado["media_original"]:,.0f}</div>', unsafe_allow_html=True)
-                    st.markdown(
-                        f'<div class="metric-card"><strong>Mediana Bootstrap:</strong> ${resultado["mediana_bootstrap_promedio"]:,.0f}</div>', unsafe_allow_html=True)
-                    st.markdown(
-                        f'<div class="metric-card"><strong>IC 95%:</strong> [${resultado["ic_95_mediana"][0]:,.0f}, ${resultado["ic_95_mediana"][1]:,.0f}]</div>', unsafe_allow_html=True)
-
-                    st.session_state['resultado_mediana'] = resultado
-
-        with col2:
-            if 'resultado_mediana' in st.session_state:
-                resultado = st.session_state['resultado_mediana']
-                fig = crear_grafico_bootstrap(
-                    resultado['datos_originales'],
-                    resultado['medianas_bootstrap'],
-                    "Bootstrap para la Mediana - Salarios",
-                    resultado['mediana_original'],
-                    resultado['ic_95_mediana'],
-                    "Salario ($)",
-                    "#10b981"
-                )
-                st.plotly_chart(fig, use_container_width=True)
-
-        st.markdown('</div>', unsafe_allow_html=True)
+        pestana_mediana(n_bootstrap, opciones_motor, permitir_float32, cache)
 
     with tab3:
-        st.markdown('<div class="method-card">', unsafe_allow_html=True)
-        st.subheader("📊 Bootstrap para Desviación Estándar - Tiempos")
-
-        col1, col2 = st.columns([1, 2])
-
-        with col1:
-            usar_datos_default = st.checkbox(
-                "Usar datos de ejemplo", value=True, key="desvest_default")
-
-            if usar_datos_default:
-                tiempos = [12.5, 13.2, 11.8, 14.1, 12.9, 13.5, 12.1, 13.8, 12.7, 13.3,
-                           11.9, 14.2, 12.4, 13.1, 12.8, 13.6, 12.3, 13.9, 12.6, 13.4]
-                st.info(f"Usando {len(tiempos)} tiempos de producción")
-            else:
-                tiempos_input = st.text_area(
-                    "Ingresa los tiempos (separados por comas):",
-                    value="12.5, 13.2, 11.8, 14.1, 12.9, 13.5, 12.1",
-                    key="tiempos_input"
-                )
-                try:
-                    tiempos = [float(x.strip())
-                               for x in tiempos_input.split(',')]
-                    st.success(f"✅ {len(tiempos)} valores cargados")
-                except:
-                    st.error("❌ Formato inválido")
-                    tiempos = []
-
-            if st.button("🚀 Ejecutar Bootstrap", key="btn_desvest"):
-                if len(tiempos) > 0:
-                    resultado = bootstrap_desviacion_estandar(
-                        tiempos, n_bootstrap)
-
-                    st.markdown("**Resultados:**")
-                    st.markdown(
-                        f'<div class="metric-card"><strong>Desv. Est. Original:</strong> {resultado["desviacion_original"]:.3f}</div>', unsafe_allow_html=True)
-                    st.markdown(
-                        f'<div class="metric-card"><strong>Desv. Est. Bootstrap:</strong> {resultado["desviacion_bootstrap_promedio"]:.3f}</div>', unsafe_allow_html=True)
-                    st.markdown(
-                        f'<div class="metric-card"><strong>Error Estándar:</strong> {resultado["error_estandar_desviacion"]:.3f}</div>', unsafe_allow_html=True)
-                    st.markdown(
-                        f'<div class="metric-card"><strong>IC 95%:</strong> [{resultado["ic_95_desviacion"][0]:.3f}, {resultado["ic_95_desviacion"][1]:.3f}]</div>', unsafe_allow_html=True)
-
-                    st.session_state['resultado_desvest'] = resultado
-
-        with col2:
-            if 'resultado_desvest' in st.session_state:
-                resultado = st.session_state['resultado_desvest']
-                fig = crear_grafico_bootstrap(
-                    resultado['datos_originales'],
-                    resultado['desviaciones_bootstrap'],
-                    "Bootstrap para Desviación Estándar - Tiempos",
-                    resultado['desviacion_original'],
-                    resultado['ic_95_desviacion'],
-                    "Desviación Estándar",
-                    "#f59e0b"
-                )
-                st.plotly_chart(fig, use_container_width=True)
-
-        st.markdown('</div>', unsafe_allow_html=True)
+        pestana_desvest(n_bootstrap, opciones_motor, permitir_float32, cache)
 
     with tab4:
-        st.markdown('<div class="method-card">', unsafe_allow_html=True)
-        st.subheader("✅ Bootstrap para Proporción - Control de Calidad")
-
-        col1, col2 = st.columns([1, 2])
-
-        with col1:
-            usar_datos_default = st.checkbox(
-                "Usar datos de ejemplo", value=True, key="proporcion_default")
-
-            if usar_datos_default:
-                control_calidad = [0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0,
-                                   0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0]
-                st.info(
-                    f"Usando {len(control_calidad)} productos (0=bueno, 1=defectuoso)")
-                st.write(
-                    f"Productos defectuosos: {sum(control_calidad)}/{len(control_calidad)}")
-            else:
-                n_productos = st.number_input(
-                    "Número total de productos:", min_value=10, max_value=1000, value=40)
-                n_defectuosos = st.number_input(
-                    "Productos defectuosos:", min_value=0, max_value=n_productos, value=5)
-
-                control_calidad = [1] * n_defectuosos + \
-                    [0] * (n_productos - n_defectuosos)
-                np.random.shuffle(control_calidad)
-                st.success(
-                    f"✅ Datos generados: {n_defectuosos}/{n_productos} defectuosos")
-
-            if st.button("🚀 Ejecutar Bootstrap", key="btn_proporcion"):
-                if len(control_calidad) > 0:
-                    resultado = bootstrap_proporcion_calidad(
-                        control_calidad, n_bootstrap)
-
-                    st.markdown("**Resultados:**")
-                    st.markdown(
-                        f'<div class="metric-card"><strong>Proporción Original:</strong> {resultado["proporcion_original"]:.3f} ({resultado["proporcion_original"]*100:.1f}%)</div>', unsafe_allow_html=True)
-                    st.markdown(
-                        f'<div class="metric-card"><strong>Proporción Bootstrap:</strong> {resultado["proporcion_bootstrap_promedio"]:.3f}</div>', unsafe_allow_html=True)
-                    st.markdown(
-                        f'<div class="metric-card"><strong>Error Estándar:</strong> {resultado["error_estandar_proporcion"]:.3f}</div>', unsafe_allow_html=True)
-                    st.markdown(
-                        f'<div class="metric-card"><strong>IC 95%:</strong> [{resultado["ic_95_percentil"][0]:.3f}, {resultado["ic_95_percentil"][1]:.3f}]</div>', unsafe_allow_html=True)
-
-                    st.session_state['resultado_proporcion'] = resultado
-
-        with col2:
-            if 'resultado_proporcion' in st.session_state:
-                resultado = st.session_state['resultado_proporcion']
-                fig = crear_grafico_bootstrap(
-                    resultado['datos_originales'],
-                    resultado['proporciones_bootstrap'],
-                    "Bootstrap para Proporción - Control de Calidad",
-                    resultado['proporcion_original'],
-                    resultado['ic_95_percentil'],
-                    "Proporción de Defectos",
-                    "#ef4444"
-                )
-                st.plotly_chart(fig, use_container_width=True)
-
-        st.markdown('</div>', unsafe_allow_html=True)
+        pestana_proporcion(n_bootstrap, opciones_motor, permitir_float32, cache)
 
     with tab5:
-        st.markdown('<div class="method-card">', unsafe_allow_html=True)
-        st.subheader("📈 Bootstrap para Percentil 90 - Puntuaciones")
-
-        col1, col2 = st.columns([1, 2])
-
-        with col1:
-            percentil_objetivo = st.slider(
-                "Percentil objetivo:", 10, 99, 90, 5)
-
-            usar_datos_default = st.checkbox(
-                "Usar datos de ejemplo", value=True, key="percentil_default")
-
-            if usar_datos_default:
-                puntuaciones = [65, 70, 72, 75, 78, 80, 82, 84, 85, 87, 88, 89, 90, 91, 92,
-                                93, 94, 95, 96, 97, 98, 85, 88, 91, 93, 76, 79, 81, 83, 86]
-                st.info(f"Usando {len(puntuaciones)} puntuaciones de ejemplo")
-            else:
-                puntuaciones_input = st.text_area(
-                    "Ingresa las puntuaciones (separadas por comas):",
-                    value="65, 70, 72, 75, 78, 80, 82, 84, 85, 87",
-                    key="puntuaciones_input"
-                )
-                try:
-                    puntuaciones = [float(x.strip())
-                                    for x in puntuaciones_input.split(',')]
-                    st.success(f"✅ {len(puntuaciones)} valores cargados")
-                except:
-                    st.error("❌ Formato inválido")
-                    puntuaciones = []
-
-            if st.button("🚀 Ejecutar Bootstrap", key="btn_percentil"):
-                if len(puntuaciones) > 0:
-                    resultado = bootstrap_percentil_90(
-                        puntuaciones, percentil_objetivo, n_bootstrap)
-
-                    st.markdown("**Resultados:**")
-                    st.markdown(
-                        f'<div class="metric-card"><strong>Percentil {percentil_objetivo} Original:</strong> {resultado["percentil_original"]:.1f}</div>', unsafe_allow_html=True)
-                    st.markdown(
-                        f'<div class="metric-card"><strong>Percentil {percentil_objetivo} Bootstrap:</strong> {resultado["percentil_bootstrap_promedio"]:.1f}</div>', unsafe_allow_html=True)
-                    st.markdown(
-                        f'<div class="metric-card"><strong>Error Estándar:</strong> {resultado["error_estandar_percentil"]:.2f}</div>', unsafe_allow_html=True)
-                    st.markdown(
-                        f'<div class="metric-card"><strong>IC 95%:</strong> [{resultado["ic_95"][0]:.1f}, {resultado["ic_95"][1]:.1f}]</div>', unsafe_allow_html=True)
-
-                    st.session_state['resultado_percentil'] = resultado
-
-        with col2:
-            if 'resultado_percentil' in st.session_state:
-                resultado = st.session_state['resultado_percentil']
-                fig = crear_grafico_bootstrap(
-                    resultado['datos_originales'],
-                    resultado['percentiles_bootstrap'],
-                    f"Bootstrap para Percentil {resultado['percentil_objetivo']} - Puntuaciones",
-                    resultado['percentil_original'],
-                    resultado['ic_95'],
-                    f"Percentil {resultado['percentil_objetivo']}",
-                    "#8b5cf6"
-                )
-                st.plotly_chart(fig, use_container_width=True)
-
-        st.markdown('</div>', unsafe_allow_html=True)
+        pestana_percentil(n_bootstrap, opciones_motor, permitir_float32, cache)
+
+    with tab6:
+        pestana_dos_muestras(n_bootstrap, opciones_motor, permitir_float32, cache)
+
+    estadisticas_cache = cache.estadisticas()
+    texto_cache = (
+        f"Caché: {estadisticas_cache['aciertos']} aciertos, {estadisticas_cache['fallos']} fallos, "
+        f"{estadisticas_cache['compartidos']} compartidos, "
+        f"{estadisticas_cache['entradas']} resultados ({estadisticas_cache['bytes'] / (1024 * 1024):.1f} MB)")
+    if cache.almacen is not None:
+        estadisticas_disco = cache.almacen.estadisticas()
+        texto_cache += (f"; disco: {estadisticas_cache['aciertos_disco']} aciertos, "
+                        f"{estadisticas_disco['entradas']} resultados "
+                        f"({estadisticas_disco['bytes'] / (1024 * 1024):.1f} MB)")
+    panel_cache.caption(texto_cache)
+    if diagnostico_activo:
+        with panel_diagnostico.container():
+            st.caption(f"Resultados en la sesión: {bytes_en_sesion() / (1024 * 1024):.2f} MB")
+            totales = {clave: sum(registro['segundos'] for registro in st.session_state[f'fases_{clave}']
+                                  if registro['fase'] == 'pestana') * 1000
+                       for clave in ('media', 'mediana', 'desvest', 'proporcion', 'percentil', 'dos_muestras')
+                       if f'fases_{clave}' in st.session_state}
+            if totales:
+                st.caption("Última ejecución por pestaña: " +
+                           ", ".join(f"{clave} {ms:.0f} ms" for clave, ms in totales.items()))
 
     # Footer
     st.markdown("---")
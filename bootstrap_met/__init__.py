@@ -0,0 +1,56 @@
+# Núcleo del bootstrap sin dependencias de interfaz: solo numpy al importar.
+# Los nombres públicos se cargan al primer uso, así que
+# `import bootstrap_met` no importa ni numpy hasta que se necesita algo.
+
+import importlib
+
+EXPORTACIONES = {
+    'motor': ('ESQUEMAS', 'COMPARACIONES', 'MEMORIA_MAXIMA_BLOQUE', 'MAXIMO_VALORES_UNICOS',
+              'REPLICAS_MAXIMAS_BLOQUE', 'PRECISION_ERROR_ESTANDAR', 'PRECISION_IC',
+              'calcular_tamano_bloque', 'comprimir_datos', 'preparar_datos', 'preparar_comparacion',
+              'preparar_remuestreo', 'remuestrear_estadisticos', 'remuestrear_preparados',
+              'evaluar_estadistico', 'error_monte_carlo', 'remuestrear_adaptativo', 'ejecutar_remuestreo',
+              'obtener_ejecutor', 'cerrar_ejecutores'),
+    'estadisticos': ('ESTADISTICOS', 'registrar_estadistico', 'obtener_estadistico', 'resolver_estadisticos',
+                     'estadistico_percentil', 'percentil_orden', 'mediana_orden', 'cuantil_ponderado'),
+    'bloques': ('ESQUEMAS_BLOQUES', 'indices_bloques', 'longitud_bloque_automatica'),
+    'bca': ('valores_jackknife', 'aceleracion_jackknife', 'intervalo_bca', 'ajustar_niveles', 'calcular_bca',
+            'calcular_bca_dos_muestras'),
+    'exacto': ('ESTRATEGIAS', 'MAXIMO_EXACTO', 'MINIMO_ANALITICO', 'MAXIMO_RETICULA',
+               'PARAMETROS_MONTE_CARLO', 'elegir_estrategia', 'distribucion_orden', 'distribucion_media',
+               'distribucion_bootstrap', 'cuantiles_exactos', 'percentiles_distribucion', 'bca_distribucion',
+               'resultado_distribucion'),
+    'resultados': ('ALMACENAMIENTO_REPLICAS', 'BINS_RESUMEN', 'CUANTILES_RESUMEN', 'CLAVES_RESULTADO',
+                   'ResultadoBootstrap'),
+    'estimadores': ('bootstrap_media_alturas', 'bootstrap_mediana_salarios', 'bootstrap_desviacion_estandar',
+                    'bootstrap_proporcion_calidad', 'bootstrap_percentil_90', 'bootstrap_estadisticos',
+                    'nombre_intervalo', 'bootstrap_dos_muestras', 'p_valor_permutacion',
+                    'ESTADISTICOS_ESTRATEGIA', 'estrategia_estimador'),
+    'streaming': ('PRECISION_SKETCH', 'MAXIMO_CUBETAS_SKETCH', 'SketchCuantiles', 'leer_fragmentos',
+                  'bootstrap_streaming'),
+    'ingesta': ('tipo_compacto', 'parsear_valores', 'importar_parquet', 'leer_tabla', 'extraer_columna'),
+    'grupos': ('FILAS_POR_PAQUETE', 'MEMORIA_BLOQUE_GRUPOS', 'bootstrap_por_grupos'),
+    'cache': ('MEMORIA_MAXIMA_CACHE', 'CacheResultados', 'CACHE_RESULTADOS', 'normalizar_datos',
+              'huella_datos', 'clave_cache', 'tamano_resultado', 'bootstrap_con_cache'),
+    'almacen': ('RUTA_ALMACEN', 'TAMANO_MAXIMO_ALMACEN', 'BYTES_EN_LINEA', 'AlmacenDisco', 'clave_archivo'),
+    'instrumentacion': ('fase', 'medicion', 'agregar_registros', 'activar_registro'),
+    'trabajos': ('TRABAJOS_SIMULTANEOS', 'TrabajoCancelado', 'Trabajo', 'GestorTrabajos'),
+}
+
+MODULO_DE = {nombre: modulo for modulo, nombres in EXPORTACIONES.items()
+             for nombre in nombres}
+
+__all__ = list(MODULO_DE)
+
+
+def __getattr__(nombre):
+    if nombre not in MODULO_DE:
+        raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+    valor = getattr(importlib.import_module(
+        f'.{MODULO_DE[nombre]}', __name__), nombre)
+    globals()[nombre] = valor
+    return valor
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
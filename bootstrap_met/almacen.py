@@ -0,0 +1,311 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from .instrumentacion import fase, logger
+from .resultados import ResultadoBootstrap
+
+try:
+    import fcntl
+except ImportError:
+    # Sin fcntl (Windows) el candado solo coordina los hilos de un proceso
+    fcntl = None
+
+# Almacén de resultados en disco
+#
+#   almacen = AlmacenDisco('/var/cache/bootstrap_met')
+#   cache = CacheResultados(almacen=almacen)
+#
+# Cada resultado se guarda como un índice JSON (<clave>.json) con la
+# estructura y los valores chicos, más un .npy por arreglo grande (réplicas,
+# datos, soporte...). Al leer, los .npy se mapean con np.load(mmap_mode='r'):
+# no se copian a memoria y los comparten todos los procesos del servidor
+# (mapas de solo lectura).
+#
+# Escrituras concurrentes, también desde otros procesos: los .npy llevan un
+# sufijo único por escritura y el índice se escribe aparte y se publica con
+# os.replace, así que un lector ve el resultado completo anterior o el nuevo,
+# nunca uno a medias. Publicar y desalojar se hace con un candado de archivo
+# (fcntl.flock).
+#
+# Un solo índice del almacén (.indice.json) lleva los bytes totales y las
+# entradas en orden de uso, y se actualiza con el candado tomado al guardar
+# y al leer. Guardar no recorre el directorio: al superar `tamano_maximo` se
+# borran las primeras entradas del índice (las usadas hace más tiempo). El
+# directorio solo se recorre para reconstruir el índice (si falta o está
+# dañado) y, a lo sumo una vez cada SEGUNDOS_HUERFANOS, para borrar huérfanos.
+#
+# La ruta por defecto sale de BOOTSTRAP_MET_ALMACEN; sin ella la app no usa disco.
+
+RUTA_ALMACEN = os.environ.get('BOOTSTRAP_MET_ALMACEN') or None
+
+TAMANO_MAXIMO_ALMACEN = 4 * 1024 * 1024 * 1024
+
+# Arreglos más chicos que esto van dentro del índice (un intervalo no
+# justifica un archivo ni un mapa de memoria)
+BYTES_EN_LINEA = 4096
+
+# Versión del formato del índice; otra versión cuenta como fallo
+FORMATO_ALMACEN = 1
+
+# Archivos sin índice que los referencie (escrituras interrumpidas) se
+# borran al desalojar si tienen más de esta antigüedad
+SEGUNDOS_HUERFANOS = 3600
+
+# Índice del almacén: {'formato', 'bytes', 'revision', 'entradas'}, con
+# entradas {nombre: {'bytes', 'archivos'}} de la usada hace más tiempo a la
+# más reciente. 'revision' es la fecha del último recorrido del directorio.
+ARCHIVO_INDICE = '.indice.json'
+
+
+def clave_archivo(clave):
+    # Nombre de archivo estable para una clave de caché
+    return hashlib.blake2b(repr(clave).encode(), digest_size=16).hexdigest()
+
+
+class AlmacenDisco:
+    # Segunda capa de CacheResultados: sobrevive a reinicios y se comparte
+    # entre procesos
+
+    def __init__(self, ruta, tamano_maximo=TAMANO_MAXIMO_ALMACEN):
+        self.ruta = os.fspath(ruta)
+        self.tamano_maximo = tamano_maximo
+        os.makedirs(self.ruta, exist_ok=True)
+        self._candado = threading.Lock()
+
+    @contextmanager
+    def _bloqueo(self):
+        with self._candado, open(os.path.join(self.ruta, '.candado'), 'a') as archivo:
+            if fcntl is not None:
+                fcntl.flock(archivo, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(archivo, fcntl.LOCK_UN)
+
+    def _ruta_indice(self, nombre):
+        return os.path.join(self.ruta, f'{nombre}.json')
+
+    def cargar(self, clave):
+        # El resultado con sus arreglos mapeados, o None si no está (o se
+        # desalojó mientras se leía)
+        nombre = clave_archivo(clave)
+        ruta_indice = self._ruta_indice(nombre)
+        try:
+            with fase('disco', operacion='cargar'):
+                with open(ruta_indice, encoding='utf-8') as archivo:
+                    indice = json.load(archivo)
+                if indice.get('formato') != FORMATO_ALMACEN or indice.get('clave') != repr(clave):
+                    return None
+                resultado = self._decodificar(indice['contenido'])
+        except (OSError, ValueError, KeyError):
+            return None
+        try:
+            with self._bloqueo():
+                indice_almacen = self._leer_indice()
+                if nombre in indice_almacen['entradas']:
+                    # Pasa al final: la usada más recientemente
+                    indice_almacen['entradas'][nombre] = indice_almacen['entradas'].pop(nombre)
+                    self._escribir_indice(indice_almacen)
+        except OSError as error:
+            logger.warning("No se pudo actualizar el índice del almacén: %s", error)
+        return resultado
+
+    def guardar(self, clave, resultado):
+        # Verdadero si quedó guardado. Un resultado que no se puede
+        # serializar o un error de disco solo dejan de guardarlo en disco.
+        nombre = clave_archivo(clave)
+        sufijo = os.urandom(6).hex()
+        temporal = os.path.join(self.ruta, f'{nombre}.{sufijo}.tmp')
+        archivos = []
+        publicado = False
+        try:
+            with fase('disco', operacion='guardar') as registro:
+                contenido = self._codificar(resultado, f'{nombre}-{sufijo}', archivos)
+                indice = {'formato': FORMATO_ALMACEN, 'clave': repr(clave), 'contenido': contenido,
+                          'archivos': archivos}
+                with open(temporal, 'w', encoding='utf-8') as archivo:
+                    json.dump(indice, archivo)
+                bytes_entrada = os.path.getsize(temporal) + sum(
+                    os.path.getsize(os.path.join(self.ruta, archivo)) for archivo in archivos)
+                registro['bytes'] = bytes_entrada
+                if bytes_entrada > self.tamano_maximo:
+                    self._borrar([temporal, *archivos])
+                    return False
+                with self._bloqueo():
+                    indice_almacen = self._leer_indice()
+                    # Los .npy de una versión anterior de la misma entrada
+                    anterior = indice_almacen['entradas'].pop(nombre, None)
+                    os.replace(temporal, self._ruta_indice(nombre))
+                    publicado = True
+                    if anterior is not None:
+                        indice_almacen['bytes'] -= anterior['bytes']
+                        self._borrar(anterior['archivos'])
+                    indice_almacen['entradas'][nombre] = {'bytes': bytes_entrada, 'archivos': archivos}
+                    indice_almacen['bytes'] += bytes_entrada
+                    self._desalojar(indice_almacen)
+                    self._escribir_indice(indice_almacen)
+        except (TypeError, OSError) as error:
+            logger.warning("No se pudo guardar en disco %s: %s", nombre, error)
+            if not publicado:
+                self._borrar([temporal, *archivos])
+            return publicado
+        return True
+
+    def _archivos_entrada(self, nombre):
+        # .npy de una entrada publicada, según su propio índice (vacío si no hay)
+        try:
+            with open(self._ruta_indice(nombre), encoding='utf-8') as archivo:
+                return json.load(archivo).get('archivos', [])
+        except (OSError, ValueError):
+            return []
+
+    def _borrar(self, archivos):
+        # Los mapas abiertos siguen siendo válidos tras borrar el archivo
+        for archivo in archivos:
+            try:
+                os.remove(os.path.join(self.ruta, archivo))
+            except FileNotFoundError:
+                pass
+
+    def _leer_indice(self):
+        # Con el candado tomado. Sin índice (directorio nuevo o de una
+        # versión anterior) o con uno dañado se reconstruye desde el directorio
+        try:
+            with open(os.path.join(self.ruta, ARCHIVO_INDICE), encoding='utf-8') as archivo:
+                indice = json.load(archivo)
+            if indice.get('formato') == FORMATO_ALMACEN:
+                return indice
+        except (OSError, ValueError):
+            pass
+        return self._revisar_directorio({'entradas': {}})
+
+    def _escribir_indice(self, indice):
+        # Con el candado tomado, así que el temporal puede tener nombre fijo
+        temporal = os.path.join(self.ruta, f'{ARCHIVO_INDICE}.tmp')
+        with open(temporal, 'w', encoding='utf-8') as archivo:
+            json.dump(indice, archivo)
+        os.replace(temporal, os.path.join(self.ruta, ARCHIVO_INDICE))
+
+    def _revisar_directorio(self, indice):
+        # Con el candado tomado. Recorre el directorio: las entradas que
+        # faltan en el índice se agregan como las usadas hace más tiempo
+        # (por fecha), las que ya no existen se quitan, los bytes se
+        # recalculan y se borran los huérfanos viejos
+        todos = {}
+        with os.scandir(self.ruta) as iterador:
+            for entrada in iterador:
+                if entrada.is_file() and not entrada.name.startswith('.'):
+                    estado = entrada.stat()
+                    todos[entrada.name] = (estado.st_mtime, estado.st_size)
+
+        nuevas = []
+        conocidas = {}
+        for archivo, (fecha, _) in todos.items():
+            if not archivo.endswith('.json'):
+                continue
+            nombre = archivo[:-len('.json')]
+            if nombre in indice['entradas']:
+                conocidas[nombre] = indice['entradas'][nombre]['archivos']
+            else:
+                nuevas.append((fecha, nombre, self._archivos_entrada(nombre)))
+        entradas = {nombre: archivos for _, nombre, archivos in sorted(nuevas)}
+        entradas.update((nombre, conocidas[nombre]) for nombre in indice['entradas'] if nombre in conocidas)
+
+        referenciados = {archivo for archivos in entradas.values() for archivo in archivos}
+        limite = time.time() - SEGUNDOS_HUERFANOS
+        self._borrar([archivo for archivo, (fecha, _) in todos.items()
+                      if not archivo.endswith('.json') and archivo not in referenciados and fecha < limite])
+
+        indice = {'formato': FORMATO_ALMACEN, 'bytes': 0, 'revision': time.time(), 'entradas': {}}
+        for nombre, archivos in entradas.items():
+            bytes_entrada = todos[f'{nombre}.json'][1] + sum(
+                todos.get(archivo, (0, 0))[1] for archivo in archivos)
+            indice['entradas'][nombre] = {'bytes': bytes_entrada, 'archivos': archivos}
+            indice['bytes'] += bytes_entrada
+        return indice
+
+    def _desalojar(self, indice):
+        # Con el candado tomado; modifica `indice` y el que llama lo escribe
+        if time.time() - indice['revision'] > SEGUNDOS_HUERFANOS:
+            indice.update(self._revisar_directorio(indice))
+        entradas = indice['entradas']
+        while indice['bytes'] > self.tamano_maximo and entradas:
+            # La primera es la usada hace más tiempo. Primero el índice de la
+            # entrada: deja de existir antes de perder sus arreglos
+            nombre = next(iter(entradas))
+            entrada = entradas.pop(nombre)
+            self._borrar([f'{nombre}.json', *entrada['archivos']])
+            indice['bytes'] -= entrada['bytes']
+
+    def ajustar_tamano_maximo(self, tamano_maximo):
+        with self._bloqueo():
+            self.tamano_maximo = tamano_maximo
+            indice = self._leer_indice()
+            self._desalojar(indice)
+            self._escribir_indice(indice)
+
+    def limpiar(self):
+        with self._bloqueo():
+            with os.scandir(self.ruta) as iterador:
+                archivos = [entrada.name for entrada in iterador
+                            if entrada.is_file() and entrada.name != '.candado']
+            self._borrar(archivos)
+
+    def estadisticas(self):
+        with self._bloqueo():
+            indice = self._leer_indice()
+        return {'entradas': len(indice['entradas']), 'bytes': indice['bytes'],
+                'tamano_maximo': self.tamano_maximo}
+
+    # Serialización: JSON con marcas para lo que JSON no distingue
+
+    def _codificar(self, valor, prefijo, archivos):
+        if valor is None or isinstance(valor, (bool, int, float, str)):
+            return valor
+        if isinstance(valor, np.generic):
+            return self._codificar(valor.item(), prefijo, archivos)
+        if isinstance(valor, np.ndarray):
+            if valor.dtype.hasobject:
+                raise TypeError("Arreglo de objetos")
+            if valor.nbytes < BYTES_EN_LINEA:
+                return {'__arreglo__': valor.tolist(), 'dtype': valor.dtype.str, 'forma': list(valor.shape)}
+            archivo = f'{prefijo}-{len(archivos)}.npy'
+            np.save(os.path.join(self.ruta, archivo), valor, allow_pickle=False)
+            archivos.append(archivo)
+            return {'__archivo__': archivo}
+        if isinstance(valor, (tuple, list)):
+            elementos = [self._codificar(elemento, prefijo, archivos) for elemento in valor]
+            return {'__tupla__': elementos} if isinstance(valor, tuple) else elementos
+        if isinstance(valor, dict):
+            return {'__dict__': [[self._codificar(clave, prefijo, archivos),
+                                  self._codificar(elemento, prefijo, archivos)]
+                                 for clave, elemento in valor.items()]}
+        if isinstance(valor, ResultadoBootstrap):
+            return {'__resultado__': {atributo: self._codificar(getattr(valor, atributo), prefijo, archivos)
+                                      for atributo in ResultadoBootstrap.__slots__}}
+        raise TypeError(f"Tipo no serializable: {type(valor).__name__}")
+
+    def _decodificar(self, valor):
+        if isinstance(valor, list):
+            return [self._decodificar(elemento) for elemento in valor]
+        if not isinstance(valor, dict):
+            return valor
+        if '__arreglo__' in valor:
+            return np.array(valor['__arreglo__'], dtype=np.dtype(valor['dtype'])).reshape(valor['forma'])
+        if '__archivo__' in valor:
+            return np.load(os.path.join(self.ruta, valor['__archivo__']), mmap_mode='r', allow_pickle=False)
+        if '__tupla__' in valor:
+            return tuple(self._decodificar(elemento) for elemento in valor['__tupla__'])
+        if '__dict__' in valor:
+            return {self._decodificar(clave): self._decodificar(elemento)
+                    for clave, elemento in valor['__dict__']}
+        atributos = valor['__resultado__']
+        return ResultadoBootstrap(**{atributo: self._decodificar(atributos[atributo])
+                                     for atributo in ResultadoBootstrap.__slots__})
@@ -0,0 +1,150 @@
+from statistics import NormalDist
+
+import numpy as np
+
+from .bloques import ESQUEMAS_BLOQUES
+from .estadisticos import obtener_estadistico
+from .instrumentacion import fase
+from .motor import COMPARACIONES, MEMORIA_MAXIMA_BLOQUE, calcular_tamano_bloque
+
+# Intervalos BCa (bias-corrected and accelerated)
+
+
+def jackknife_generico(datos, funcion, memoria_maxima=MEMORIA_MAXIMA_BLOQUE):
+    # Sin fórmula cerrada: matriz de muestras "dejando uno fuera" por bloques
+    n = len(datos)
+    posiciones = np.arange(n - 1)
+    valores = np.empty(n)
+    tamano_bloque = calcular_tamano_bloque(
+        n - 1, n, memoria_maxima, datos.itemsize)
+    for inicio in range(0, n, tamano_bloque):
+        fin = min(inicio + tamano_bloque, n)
+        excluidos = np.arange(inicio, fin)[:, np.newaxis]
+        indices = posiciones + (posiciones >= excluidos)
+        valores[inicio:fin] = funcion(datos[indices], axis=1)
+    return valores
+
+
+def jackknife_orden(orden):
+    # Quitar una copia del valor con rango r desplaza en uno las posiciones
+    # >= r de la muestra ordenada: basta ordenar una vez
+    def jackknife(valores, conteos):
+        n = int(conteos.sum())
+        permutacion = np.argsort(valores, kind='stable')
+        ordenados = valores[permutacion]
+        acumulados = np.cumsum(conteos[permutacion])
+        rangos = acumulados - conteos[permutacion]
+
+        posiciones, combinar = orden(n - 1)
+        valores_posicion = [
+            ordenados[np.searchsorted(
+                acumulados, posicion + (posicion >= rangos), side='right')]
+            for posicion in posiciones
+        ]
+        resultado = np.empty(len(valores))
+        resultado[permutacion] = combinar(*valores_posicion)
+        return resultado
+
+    return jackknife
+
+
+def valores_jackknife(datos, especificacion):
+    # Valores "dejando uno fuera" por valor (único si los datos vienen
+    # comprimidos) y cuántas filas representa cada uno
+    if isinstance(datos, tuple):
+        valores, conteos = np.asarray(datos[0]), np.asarray(datos[1])
+    else:
+        valores = np.asarray(datos)
+        conteos = np.ones(len(valores), dtype=np.int64)
+
+    if 'jackknife' in especificacion:
+        return especificacion['jackknife'](valores, conteos), conteos
+    if 'orden' in especificacion:
+        return jackknife_orden(especificacion['orden'])(valores, conteos), conteos
+    if isinstance(datos, tuple):
+        valores = np.repeat(valores, conteos)
+        conteos = np.ones(len(valores), dtype=np.int64)
+    return jackknife_generico(valores, especificacion['funcion']), conteos
+
+
+def aceleracion_jackknife(valores_jackknife, pesos):
+    desvios = np.average(valores_jackknife, weights=pesos) - valores_jackknife
+    denominador = 6 * np.sum(pesos * desvios ** 2) ** 1.5
+    if denominador == 0:
+        return 0.0
+    return np.sum(pesos * desvios ** 3) / denominador
+
+
+def intervalo_bca(replicas, valor_original, aceleracion, niveles=(0.025, 0.975)):
+    # Sesgo z0 con la mitad de los empates (estadísticos discretos) y
+    # acotado para que un valor original extremo no dé z0 infinito
+    n_replicas = len(replicas)
+    proporcion = (np.count_nonzero(replicas < valor_original) +
+                  0.5 * np.count_nonzero(replicas == valor_original)) / n_replicas
+    proporcion = np.clip(proporcion, 1 / (n_replicas + 1),
+                         n_replicas / (n_replicas + 1))
+    return np.percentile(replicas, 100 * np.array(ajustar_niveles(proporcion, aceleracion, niveles)))
+
+
+def ajustar_niveles(proporcion, aceleracion, niveles):
+    # Niveles BCa a partir de P(réplica < original) y la aceleración. La
+    # normal de la biblioteca estándar basta para dos niveles y evita
+    # importar scipy.stats (más de un segundo) en cada proceso
+    normal = NormalDist()
+    z0 = normal.inv_cdf(proporcion)
+    return [normal.cdf(z0 + (z0 + z) / (1 - aceleracion * (z0 + z)))
+            for z in map(normal.inv_cdf, niveles)]
+
+
+def calcular_bca(datos, replicas, valor_original, estadistico, niveles=(0.025, 0.975), esquema='iid'):
+    # `estadistico` es un nombre del registro o una especificación ya resuelta.
+    # Con un esquema por bloques el jackknife de a una fila no refleja la
+    # dependencia de la serie: se corrige solo el sesgo (intervalo BC)
+    if esquema in ESQUEMAS_BLOQUES:
+        return intervalo_bca(replicas, valor_original, 0.0, niveles)
+    especificacion = estadistico if isinstance(
+        estadistico, dict) else obtener_estadistico(estadistico)
+    # Con menos de tres filas no hay aceleración estimable (y los
+    # jackknife de orden no están definidos): intervalo percentil
+    n = int(np.sum(datos[1])) if isinstance(datos, tuple) else len(datos)
+    if n < 3:
+        return np.percentile(replicas, 100 * np.asarray(niveles))
+    with fase('bca', n=n):
+        valores, pesos = valores_jackknife(datos, especificacion)
+        return intervalo_bca(replicas, valor_original, aceleracion_jackknife(valores, pesos), niveles)
+
+
+def aceleracion_dos_muestras(muestras, especificacion, comparacion, valores_originales):
+    # Jackknife de cada muestra con la otra fija; los desvíos se centran por
+    # muestra y se suman las dos (Efron y Tibshirani, 14.3)
+    comparar = COMPARACIONES[comparacion]
+    suma_cubos = suma_cuadrados = 0.0
+    for indice, muestra in enumerate(muestras):
+        valores, pesos = valores_jackknife(muestra, especificacion)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if indice == 0:
+                valores = comparar(valores, valores_originales[1])
+            else:
+                valores = comparar(valores_originales[0], valores)
+        desvios = np.average(valores, weights=pesos) - valores
+        suma_cubos += np.sum(pesos * desvios ** 3)
+        suma_cuadrados += np.sum(pesos * desvios ** 2)
+    denominador = 6 * suma_cuadrados ** 1.5
+    if denominador == 0 or not np.isfinite(denominador):
+        return 0.0
+    return suma_cubos / denominador
+
+
+def calcular_bca_dos_muestras(muestras, replicas, valor_original, estadistico, comparacion,
+                              valores_originales, niveles=(0.025, 0.975), esquema='iid'):
+    # Como calcular_bca para la diferencia o razón entre dos muestras;
+    # `valores_originales` es el estadístico de cada una
+    if esquema in ESQUEMAS_BLOQUES:
+        return intervalo_bca(replicas, valor_original, 0.0, niveles)
+    especificacion = estadistico if isinstance(
+        estadistico, dict) else obtener_estadistico(estadistico)
+    if min(len(muestra) for muestra in muestras) < 3:
+        return np.percentile(replicas, 100 * np.asarray(niveles))
+    with fase('bca', n=sum(len(muestra) for muestra in muestras)):
+        aceleracion = aceleracion_dos_muestras(muestras, especificacion, comparacion, valores_originales)
+        return intervalo_bca(replicas, valor_original, aceleracion, niveles)
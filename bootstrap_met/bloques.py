@@ -0,0 +1,120 @@
+import numpy as np
+
+# Bootstrap por bloques para series con autocorrelación
+#
+#   'bloques_moviles'    bloques de longitud fija que empiezan en cualquier
+#                        posición donde caben enteros (Künsch)
+#   'bloques_circulares' igual, pero la serie se cierra en círculo: todas las
+#                        posiciones tienen la misma probabilidad (Politis-Romano)
+#   'estacionario'       bloques de longitud geométrica con media `longitud`
+#                        sobre la serie circular (Politis-Romano)
+#
+# Los índices de todas las réplicas de un bloque de trabajo se generan como
+# un solo arreglo (réplicas x n); no hay bucles de Python por bloque.
+
+ESQUEMAS_BLOQUES = ('bloques_moviles', 'bloques_circulares', 'estacionario')
+
+
+def tipo_indices(n):
+    # El esquema estacionario suma desplazamientos antes del módulo: hasta 2n
+    return np.int32 if 2 * n <= np.iinfo(np.int32).max else np.int64
+
+
+def indices_bloques_fijos(generador, n, tamano, longitud, circular):
+    tipo = tipo_indices(n)
+    n_bloques = -(-n // longitud)
+    maximo = n if circular else n - longitud + 1
+    inicios = generador.integers(0, maximo, size=(tamano, n_bloques, 1), dtype=tipo)
+    indices = (inicios + np.arange(longitud, dtype=tipo)).reshape(tamano, n_bloques * longitud)
+    if circular:
+        indices %= n
+    return indices[:, :n]
+
+
+def indices_estacionario(generador, n, tamano, longitud):
+    # Cada posición abre un bloque nuevo con probabilidad 1/longitud (la
+    # primera siempre); si no, sigue al índice anterior. Para cada posición
+    # se busca el último comienzo con un máximo acumulado y se suma la
+    # distancia a él.
+    tipo = tipo_indices(n)
+    posiciones = np.arange(n, dtype=tipo)
+    nuevos = generador.random((tamano, n)) < 1 / longitud
+    nuevos[:, 0] = True
+    inicios = np.zeros((tamano, n), dtype=tipo)
+    inicios[nuevos] = generador.integers(0, n, size=np.count_nonzero(nuevos), dtype=tipo)
+
+    ultimo = np.where(nuevos, posiciones, 0).astype(tipo, copy=False)
+    np.maximum.accumulate(ultimo, axis=1, out=ultimo)
+    indices = np.take_along_axis(inicios, ultimo, axis=1)
+    indices += posiciones - ultimo
+    indices %= n
+    return indices
+
+
+def indices_bloques(generador, n, tamano, esquema, longitud):
+    longitud = int(min(max(longitud, 1), n))
+    if esquema == 'estacionario':
+        return indices_estacionario(generador, n, tamano, longitud)
+    return indices_bloques_fijos(generador, n, tamano, longitud, esquema == 'bloques_circulares')
+
+
+# Longitud de bloque automática (Politis y White 2004, con la corrección de
+# Patton, Politis y White 2009)
+
+
+def autocovarianzas(serie, max_rezago):
+    # Por FFT con relleno de ceros: O(n log n) también para series de 10^6
+    desvios = serie - np.mean(serie)
+    n = len(desvios)
+    tamano_fft = 1 << int(np.ceil(np.log2(2 * n)))
+    espectro = np.fft.rfft(desvios, tamano_fft)
+    return np.fft.irfft(espectro * np.conj(espectro), tamano_fft)[:max_rezago + 1] / n
+
+
+def ventana_plana(t):
+    # Ventana trapezoidal "flat-top"
+    t = np.abs(t)
+    return np.where(t <= 0.5, 1.0, np.where(t <= 1, 2 * (1 - t), 0.0))
+
+
+def longitud_bloque_automatica(serie, esquema='estacionario'):
+    # Longitud que minimiza el error cuadrático medio asintótico de la
+    # varianza de la media; los bloques fijos usan la fórmula circular
+    serie = np.asarray(serie, dtype=np.float64)
+    n = len(serie)
+    if n < 4:
+        return 1
+    k_n = max(5, int(np.ceil(np.sqrt(np.log10(n)))))
+    m_max = int(np.ceil(np.sqrt(n))) + k_n
+    b_max = int(np.ceil(min(3 * np.sqrt(n), n / 3)))
+
+    gammas = autocovarianzas(serie, min(m_max + k_n, n - 1))
+    if gammas[0] <= 0:
+        return 1
+    correlaciones = gammas[1:] / gammas[0]
+
+    # m_hat: menor rezago m tal que las correlaciones de m+1 a m+k_n son
+    # todas insignificantes; la ventana usa M = 2 m_hat
+    insignificantes = np.abs(correlaciones) < 2 * np.sqrt(np.log10(n) / n)
+    seguidas = np.convolve(insignificantes, np.ones(k_n, dtype=int), 'valid') == k_n
+    m_hat = int(np.argmax(seguidas)) if seguidas.any() else m_max
+    m = min(2 * max(m_hat, 1), m_max, len(gammas) - 1)
+
+    rezagos = np.arange(-m, m + 1)
+    pesos = ventana_plana(rezagos / m) * gammas[np.abs(rezagos)]
+    g = np.sum(np.abs(rezagos) * pesos)
+    densidad = np.sum(pesos)
+    d = (2 if esquema == 'estacionario' else 4 / 3) * densidad ** 2
+    if d <= 0:
+        return 1
+    longitud = (2 * g ** 2 / d) ** (1 / 3) * n ** (1 / 3)
+    return int(min(max(np.ceil(longitud), 1), b_max))
+
+
+def resolver_longitud(serie, esquema, longitud_bloque=None):
+    if longitud_bloque is None or longitud_bloque == 'auto':
+        return longitud_bloque_automatica(serie, esquema)
+    longitud_bloque = int(longitud_bloque)
+    if longitud_bloque < 1:
+        raise ValueError(f"La longitud de bloque debe ser positiva: {longitud_bloque!r}")
+    return longitud_bloque
@@ -0,0 +1,177 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .estimadores import estrategia_estimador
+from .exacto import PARAMETROS_MONTE_CARLO
+from .resultados import ResultadoBootstrap
+
+# Caché de resultados
+
+# Memoria máxima (en bytes) que ocupan los resultados guardados
+MEMORIA_MAXIMA_CACHE = 512 * 1024 * 1024
+
+
+def normalizar_datos(datos):
+    # Una tupla (p. ej. las dos muestras de una comparación) se conserva
+    # como tupla de arreglos
+    if isinstance(datos, tuple):
+        return tuple(np.asarray(parte) for parte in datos)
+    return np.asarray(datos)
+
+
+def huella_datos(datos):
+    # Hash del contenido: mismo arreglo -> misma huella, sin importar su origen
+    huella = hashlib.blake2b(digest_size=16)
+    for parte in (datos if isinstance(datos, tuple) else (datos,)):
+        parte = np.ascontiguousarray(parte)
+        huella.update(str(parte.dtype).encode())
+        huella.update(str(parte.shape).encode())
+        huella.update(parte.tobytes())
+    return huella.hexdigest()
+
+
+def tamano_resultado(resultado):
+    if isinstance(resultado, ResultadoBootstrap):
+        return resultado.nbytes() + 512
+    if isinstance(resultado, np.ndarray):
+        return resultado.nbytes
+    if isinstance(resultado, dict):
+        return sum(tamano_resultado(valor) for valor in resultado.values()) + 64 * len(resultado)
+    return 64
+
+
+class CacheResultados:
+    # LRU acotada por memoria; segura entre hilos (varias sesiones de Streamlit).
+    # Con un `almacen` (AlmacenDisco) los fallos se buscan en disco antes de
+    # calcular y cada resultado calculado se guarda también ahí.
+
+    def __init__(self, memoria_maxima=MEMORIA_MAXIMA_CACHE, almacen=None):
+        self.memoria_maxima = memoria_maxima
+        self.almacen = almacen
+        self.aciertos = 0
+        self.fallos = 0
+        self.compartidos = 0
+        self.aciertos_disco = 0
+        self._entradas = OrderedDict()
+        self._bytes = 0
+        # clave -> {'listo': Event, 'resultado': ...} de los cálculos en curso
+        self._en_curso = {}
+        self._candado = threading.Lock()
+
+    def obtener(self, clave):
+        with self._candado:
+            if clave in self._entradas:
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                return self._entradas[clave][0]
+            self.fallos += 1
+            return None
+
+    def obtener_o_calcular(self, clave, calcular):
+        # Un solo cálculo por clave a la vez: quien pide una clave que otro
+        # hilo está calculando espera ese resultado en lugar de repetirlo
+        while True:
+            with self._candado:
+                if clave in self._entradas:
+                    self._entradas.move_to_end(clave)
+                    self.aciertos += 1
+                    return self._entradas[clave][0]
+                en_curso = self._en_curso.get(clave)
+                if en_curso is None:
+                    self.fallos += 1
+                    en_curso = self._en_curso[clave] = {'listo': threading.Event(), 'resultado': None}
+                    break
+                self.compartidos += 1
+            en_curso['listo'].wait()
+            if en_curso['resultado'] is not None:
+                return en_curso['resultado']
+            # El cálculo compartido falló o se canceló: se intenta de nuevo
+
+        try:
+            resultado = self.almacen.cargar(clave) if self.almacen is not None else None
+            if resultado is not None:
+                with self._candado:
+                    self.aciertos_disco += 1
+            else:
+                resultado = calcular()
+                if self.almacen is not None:
+                    self.almacen.guardar(clave, resultado)
+            en_curso['resultado'] = resultado
+            self.guardar(clave, resultado)
+        finally:
+            with self._candado:
+                del self._en_curso[clave]
+            en_curso['listo'].set()
+        return resultado
+
+    def guardar(self, clave, resultado):
+        tamano = tamano_resultado(resultado)
+        with self._candado:
+            if clave in self._entradas:
+                self._bytes -= self._entradas.pop(clave)[1]
+            if tamano > self.memoria_maxima:
+                return
+            self._entradas[clave] = (resultado, tamano)
+            self._bytes += tamano
+            self._desalojar()
+
+    def ajustar_memoria_maxima(self, memoria_maxima):
+        with self._candado:
+            self.memoria_maxima = memoria_maxima
+            self._desalojar()
+
+    def _desalojar(self):
+        while self._bytes > self.memoria_maxima and self._entradas:
+            _, (_, tamano) = self._entradas.popitem(last=False)
+            self._bytes -= tamano
+
+    def limpiar(self):
+        with self._candado:
+            self._entradas.clear()
+            self._bytes = 0
+
+    def estadisticas(self):
+        with self._candado:
+            consultas = self.aciertos + self.fallos
+            return {
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'compartidos': self.compartidos,
+                'aciertos_disco': self.aciertos_disco,
+                'tasa_aciertos': self.aciertos / consultas if consultas else 0.0,
+                'entradas': len(self._entradas),
+                'bytes': self._bytes,
+                'memoria_maxima': self.memoria_maxima
+            }
+
+
+CACHE_RESULTADOS = CacheResultados()
+
+
+# Opciones que no cambian el resultado (la semilla fija las réplicas sin
+# importar cuántos trabajadores las calculen ni quién siga el progreso)
+PARAMETROS_SIN_EFECTO = ('n_trabajadores', 'ejecutor', 'progreso')
+
+
+def clave_cache(funcion, datos, parametros):
+    # Sin Monte Carlo (distribución exacta o analítica) las réplicas pedidas
+    # y la semilla no cambian el resultado: no forman parte de la clave
+    sin_efecto = PARAMETROS_SIN_EFECTO
+    if estrategia_estimador(funcion, datos, parametros) in ('exacta', 'analitica'):
+        sin_efecto += PARAMETROS_MONTE_CARLO
+    parametros = tuple(sorted((nombre, valor) for nombre, valor in parametros.items()
+                              if nombre not in sin_efecto))
+    return (funcion.__name__, huella_datos(datos), parametros)
+
+
+def bootstrap_con_cache(funcion, datos, cache=None, **parametros):
+    # Los parámetros (n_bootstrap, percentil, semilla...) forman parte de la
+    # clave, así que una misma configuración devuelve el mismo resultado; si
+    # otro hilo ya la está calculando, se espera ese cálculo
+    cache = CACHE_RESULTADOS if cache is None else cache
+    datos = normalizar_datos(datos)
+    clave = clave_cache(funcion, datos, parametros)
+    return cache.obtener_o_calcular(clave, lambda: funcion(datos, **parametros))
@@ -0,0 +1,273 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from .estimadores import bootstrap_estadisticos, nombre_intervalo
+from .ingesta import extraer_columna, importar_parquet, leer_tabla
+from .motor import usar_ejecutor
+
+# Ejecución por lotes desde la línea de comandos:
+#
+#   python -m bootstrap_met datos.csv -e mediana -c salario -g departamento \
+#       -B 2000 --confianza 0.95 --semilla 42 --trabajadores 8 -o salida.jsonl
+#
+# Cada (columna, grupo) es un trabajo que evalúa todos los estadísticos en una
+# sola pasada de remuestreo. Los registros se escriben a medida que terminan:
+# en JSON Lines cada línea se vacía al disco y --reanudar salta los trabajos
+# que ya están en el archivo; en Parquet se escribe un row group por lote.
+
+FILAS_POR_LOTE_PARQUET = 256
+
+COLUMNAS_PARQUET = [
+    ('grupo', 'string'), ('columna', 'string'), ('estadistico', 'string'), ('n', 'int64'),
+    ('n_invalidos', 'int64'), ('estimacion', 'float64'), ('error_estandar', 'float64'),
+    ('confianza', 'float64'), ('ic_inferior', 'float64'), ('ic_superior', 'float64'),
+    ('ic_bca_inferior', 'float64'), ('ic_bca_superior', 'float64'), ('n_bootstrap', 'int64'),
+    ('segundos', 'float64'), ('error', 'string')
+]
+
+
+def parsear_n_bootstrap(valor):
+    if valor == 'auto':
+        return valor
+    n_bootstrap = int(valor)
+    if n_bootstrap < 1:
+        raise argparse.ArgumentTypeError("B debe ser positivo o 'auto'")
+    return n_bootstrap
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m bootstrap_met',
+        description="Intervalos bootstrap por columna y grupo a partir de un archivo CSV, Parquet o NPY.")
+    parser.add_argument('archivo', help="Ruta del archivo de datos")
+    parser.add_argument('-e', '--estadistico', action='append', dest='estadisticos',
+                        help="Estadístico del registro (media, mediana, desviacion, proporcion, "
+                             "percentil_<p>); se puede repetir. Por defecto: media")
+    parser.add_argument('-c', '--columna', action='append', dest='columnas',
+                        help="Columna a analizar; se puede repetir. Por defecto: todas las numéricas")
+    parser.add_argument('-g', '--agrupar-por', dest='agrupar_por',
+                        help="Columna con la que separar los datos en grupos")
+    parser.add_argument('-B', '--n-bootstrap', type=parsear_n_bootstrap, default=1000,
+                        help="Número de réplicas o 'auto' (adaptativo)")
+    parser.add_argument('--confianza', type=float, default=0.95,
+                        help="Nivel de confianza de los intervalos (por defecto 0.95)")
+    parser.add_argument('--semilla', type=int, default=None,
+                        help="Semilla; con la misma semilla cada trabajo da el mismo resultado")
+    parser.add_argument('-t', '--trabajadores', type=int, default=os.cpu_count() or 1,
+                        help="Trabajos en paralelo")
+    parser.add_argument('--ejecutor', choices=['procesos', 'hilos'], default='procesos')
+    parser.add_argument('-o', '--salida',
+                        help="Archivo .jsonl o .parquet; sin él se escribe JSON Lines en la salida estándar")
+    parser.add_argument('--reanudar', action='store_true',
+                        help="Con salida .jsonl, saltar los trabajos ya escritos")
+    return parser
+
+
+def crear_trabajos(tabla, columnas, agrupar_por):
+    # Un trabajo por (columna, grupo); los valores no numéricos se descartan
+    if agrupar_por is None:
+        grupos = [(None, tabla)]
+    else:
+        grupos = tabla.groupby(agrupar_por, sort=True, dropna=False)
+
+    trabajos = []
+    for grupo, subtabla in grupos:
+        if isinstance(grupo, tuple) and len(grupo) == 1:
+            grupo = grupo[0]
+        for columna in columnas:
+            valores, invalidos = extraer_columna(subtabla, columna)
+            trabajos.append({'columna': columna, 'grupo': grupo, 'datos': valores,
+                             'n_invalidos': len(invalidos)})
+    return trabajos
+
+
+def valor_json(valor):
+    if isinstance(valor, np.generic):
+        return valor.item()
+    if isinstance(valor, float) and not np.isfinite(valor):
+        return None
+    return valor
+
+
+def ejecutar_trabajo(trabajo, estadisticos, n_bootstrap, confianza, semilla):
+    # Unidad de trabajo del pool: devuelve un registro por estadístico
+    base = {'columna': trabajo['columna'], 'n': len(trabajo['datos']),
+            'n_invalidos': trabajo['n_invalidos']}
+    if trabajo['grupo'] is not None:
+        base = {'grupo': valor_json(trabajo['grupo']), **base}
+    if len(trabajo['datos']) < 2:
+        return [{**base, 'estadistico': nombre, 'error': 'menos de dos valores'} for nombre in estadisticos]
+
+    inicio = time.perf_counter()
+    try:
+        resultados = bootstrap_estadisticos(
+            trabajo['datos'], estadisticos, n_bootstrap, confianza=confianza, semilla=semilla)
+    except ValueError as error:
+        return [{**base, 'estadistico': nombre, 'error': str(error)} for nombre in estadisticos]
+    segundos = time.perf_counter() - inicio
+
+    intervalo = nombre_intervalo(confianza)
+    registros = []
+    for nombre, resultado in resultados.items():
+        ic = resultado[intervalo]
+        ic_bca = resultado[f'{intervalo}_bca']
+        registros.append({
+            **base,
+            'estadistico': nombre,
+            'estimacion': valor_json(resultado.valor_original),
+            'error_estandar': valor_json(resultado.error_estandar),
+            'confianza': confianza,
+            'ic_inferior': valor_json(ic[0]),
+            'ic_superior': valor_json(ic[1]),
+            'ic_bca_inferior': valor_json(ic_bca[0]),
+            'ic_bca_superior': valor_json(ic_bca[1]),
+            'n_bootstrap': resultado.extras['n_bootstrap'],
+            'segundos': segundos
+        })
+    return registros
+
+
+def clave_registro(registro):
+    return (registro.get('columna'), registro.get('grupo'), registro.get('estadistico'))
+
+
+class EscritorJsonl:
+
+    def __init__(self, ruta=None):
+        self.archivo = open(ruta, 'a', encoding='utf-8') if ruta else sys.stdout
+
+    def escribir(self, registros):
+        for registro in registros:
+            self.archivo.write(json.dumps(registro, ensure_ascii=False, default=str) + '\n')
+        # Cada trabajo terminado queda en disco aunque se corte la ejecución
+        self.archivo.flush()
+
+    def cerrar(self):
+        if self.archivo is not sys.stdout:
+            self.archivo.close()
+
+
+class EscritorParquet:
+    # Un row group por lote con esquema fijo: lo escrito hasta el cierre se
+    # puede leer después
+
+    def __init__(self, ruta):
+        pq = importar_parquet()
+        import pyarrow as pa
+
+        self.esquema = pa.schema([(nombre, getattr(pa, tipo)()) for nombre, tipo in COLUMNAS_PARQUET])
+        self.escritor = pq.ParquetWriter(ruta, self.esquema)
+        self.pendientes = []
+
+    def escribir(self, registros):
+        self.pendientes.extend(registros)
+        if len(self.pendientes) >= FILAS_POR_LOTE_PARQUET:
+            self.vaciar()
+
+    def vaciar(self):
+        import pyarrow as pa
+
+        if not self.pendientes:
+            return
+        # Los grupos pueden mezclar tipos: se guardan como texto
+        filas = [{**registro, 'grupo': None if registro.get('grupo') is None else str(registro['grupo']),
+                  'columna': str(registro['columna'])} for registro in self.pendientes]
+        self.escritor.write_table(pa.Table.from_pylist(filas, schema=self.esquema))
+        self.pendientes = []
+
+    def cerrar(self):
+        self.vaciar()
+        self.escritor.close()
+
+
+def crear_escritor(salida):
+    if salida is not None and os.path.splitext(salida)[1].lower() == '.parquet':
+        return EscritorParquet(salida)
+    return EscritorJsonl(salida)
+
+
+def trabajos_terminados(salida):
+    if salida is None or not os.path.exists(salida):
+        return set()
+    terminados = set()
+    with open(salida, encoding='utf-8') as archivo:
+        for linea in archivo:
+            try:
+                terminados.add(clave_registro(json.loads(linea)))
+            except json.JSONDecodeError:
+                # Última línea a medio escribir de una ejecución interrumpida
+                continue
+    return terminados
+
+
+def main(argumentos=None):
+    parser = crear_parser()
+    opciones = parser.parse_args(argumentos)
+    if not 0 < opciones.confianza < 1:
+        parser.error("--confianza debe estar entre 0 y 1")
+    if opciones.reanudar and (opciones.salida is None or opciones.salida.lower().endswith('.parquet')):
+        parser.error("--reanudar necesita una salida .jsonl")
+
+    try:
+        tabla = leer_tabla(opciones.archivo)
+    except (OSError, ValueError) as error:
+        parser.error(f"no se pudo leer {opciones.archivo}: {error}")
+
+    estadisticos = opciones.estadisticos or ['media']
+    columnas = opciones.columnas
+    if columnas is None:
+        import pandas as pd
+
+        columnas = [columna for columna in tabla.columns
+                    if columna != opciones.agrupar_por and pd.api.types.is_numeric_dtype(tabla[columna])]
+    faltantes = [columna for columna in [*columnas, opciones.agrupar_por]
+                 if columna is not None and columna not in tabla.columns]
+    if faltantes:
+        parser.error(f"columnas inexistentes: {', '.join(map(str, faltantes))}")
+
+    trabajos = crear_trabajos(tabla, columnas, opciones.agrupar_por)
+    # Semillas hijas en el orden de los trabajos: el resultado de cada uno no
+    # depende de cuántos trabajadores haya ni del orden en que terminen
+    semillas = np.random.SeedSequence(opciones.semilla).spawn(len(trabajos))
+    if opciones.reanudar:
+        terminados = trabajos_terminados(opciones.salida)
+        pendientes = [(trabajo, semilla) for trabajo, semilla in zip(trabajos, semillas)
+                      if any((trabajo['columna'], valor_json(trabajo['grupo']), nombre) not in terminados
+                             for nombre in estadisticos)]
+    else:
+        pendientes = list(zip(trabajos, semillas))
+
+    try:
+        escritor = crear_escritor(opciones.salida)
+    except (OSError, ValueError) as error:
+        parser.error(f"no se pudo crear {opciones.salida}: {error}")
+    parametros = (estadisticos, opciones.n_bootstrap, opciones.confianza)
+    try:
+        n_trabajadores = max(1, min(opciones.trabajadores, len(pendientes)))
+        if n_trabajadores == 1:
+            for trabajo, semilla in pendientes:
+                escritor.escribir(ejecutar_trabajo(trabajo, *parametros, semilla))
+        else:
+            from concurrent.futures import as_completed
+
+            with usar_ejecutor(opciones.ejecutor, n_trabajadores) as ejecutor:
+                futuros = [ejecutor.submit(ejecutar_trabajo, trabajo, *parametros, semilla)
+                           for trabajo, semilla in pendientes]
+                try:
+                    for futuro in as_completed(futuros):
+                        escritor.escribir(futuro.result())
+                except KeyboardInterrupt:
+                    for futuro in futuros:
+                        futuro.cancel()
+                    raise
+    except KeyboardInterrupt:
+        print("Interrumpido: los resultados terminados ya están escritos", file=sys.stderr)
+        return 130
+    finally:
+        escritor.cerrar()
+    return 0
@@ -0,0 +1,188 @@
+import numpy as np
+
+# Registro de estadísticos
+
+ESTADISTICOS = {}
+
+
+def registrar_estadistico(nombre, funcion, conteos=None, orden=None, jackknife=None, ponderado=None):
+    # `funcion(muestras, axis)` debe reducir el eje indicado, igual que np.mean.
+    # `conteos(valores, conteos, n)` es opcional y calcula el estadístico a
+    # partir de una matriz de frecuencias (réplicas x valores únicos).
+    # `orden(n)` es opcional para estadísticos de orden: devuelve las
+    # posiciones (base 0) que necesita y una función que las combina.
+    # `jackknife(valores, conteos)` es opcional: valores "dejando uno fuera"
+    # en forma cerrada para el intervalo BCa.
+    # `ponderado(valores, pesos, n)` es opcional y habilita el bootstrap
+    # bayesiano: `pesos` es una matriz réplicas x valores con filas que suman
+    # 1, `valores` llega ordenado si también hay `orden` y `n` es el tamaño
+    # de la muestra original.
+    especificacion = {'funcion': funcion}
+    if conteos is not None:
+        especificacion['conteos'] = conteos
+    if orden is not None:
+        especificacion['orden'] = orden
+    if jackknife is not None:
+        especificacion['jackknife'] = jackknife
+    if ponderado is not None:
+        especificacion['ponderado'] = ponderado
+    ESTADISTICOS[nombre] = especificacion
+    return funcion
+
+
+def interpolar_lineal(bajo, alto, gamma):
+    # Misma aritmética que la interpolación 'linear' de np.percentile, en
+    # float64: con enteros de 32 bits la diferencia puede desbordar
+    bajo = np.asarray(bajo, dtype=np.float64)
+    alto = np.asarray(alto, dtype=np.float64)
+    diferencia = alto - bajo
+    return np.where(gamma >= 0.5, alto - diferencia * (1 - gamma), bajo + diferencia * gamma)
+
+
+def estadistico_orden_conteos(valores, acumulados, posicion):
+    # Valor en la posición `posicion` (base 0) de cada réplica ordenada
+    return valores[np.count_nonzero(acumulados <= posicion, axis=1)]
+
+
+def estadistico_percentil(percentil):
+    def funcion(muestras, axis=None):
+        return np.percentile(muestras, percentil, axis=axis)
+
+    return funcion
+
+
+def posiciones_percentil(n, percentil):
+    # Índice virtual del método 'linear' de NumPy: (n - 1) * q
+    indice_virtual = (n - 1) * np.true_divide(percentil, 100)
+    anterior = int(np.floor(indice_virtual))
+    siguiente = min(anterior + 1, n - 1)
+    return anterior, siguiente, indice_virtual - anterior
+
+
+def percentil_orden(percentil):
+    def orden(n):
+        anterior, siguiente, gamma = posiciones_percentil(n, percentil)
+
+        def combinar(bajo, alto):
+            return interpolar_lineal(bajo, alto, gamma)
+
+        return [anterior, siguiente], combinar
+
+    return orden
+
+
+def cuantil_ponderado(cuantil):
+    # Generaliza el método 'linear' de np.percentile a pesos: el valor
+    # ordenado k está en la posición C(k-1) / (1 - w(k)), con C los pesos
+    # acumulados. Coincide con NumPy solo con pesos iguales (k / (n - 1));
+    # con pesos proporcionales a conteos no da el cuantil de los datos
+    # repetidos. No hace falta: con estadísticos de orden el bootstrap
+    # bayesiano no comprime los datos y cada fila lleva su propio peso.
+    def ponderado(valores, pesos, n):
+        if len(valores) == 1:
+            return np.full(len(pesos), valores[0], dtype=np.float64)
+        posiciones = np.cumsum(pesos, axis=1)
+        posiciones -= pesos
+        posiciones /= 1 - pesos
+        anterior = np.count_nonzero(posiciones <= cuantil, axis=1) - 1
+        np.clip(anterior, 0, len(valores) - 2, out=anterior)
+        filas = np.arange(len(pesos))
+        bajo, alto = posiciones[filas, anterior], posiciones[filas, anterior + 1]
+        gamma = np.clip((cuantil - bajo) / np.maximum(alto - bajo, np.finfo(np.float64).tiny), 0, 1)
+        return interpolar_lineal(valores[anterior], valores[anterior + 1], gamma)
+
+    return ponderado
+
+
+def mediana_orden(n):
+    def combinar(bajo, alto):
+        # En float64, como np.median: dos int32 grandes desbordan al sumarse
+        return (np.asarray(bajo, dtype=np.float64) + alto) / 2
+
+    return [(n - 1) // 2, n // 2], combinar
+
+
+def obtener_estadistico(nombre):
+    if nombre in ESTADISTICOS:
+        return ESTADISTICOS[nombre]
+
+    # Cualquier percentil se resuelve al vuelo: 'percentil_75', 'percentil_97.5'
+    if nombre.startswith('percentil_'):
+        try:
+            percentil = float(nombre[len('percentil_'):])
+        except ValueError:
+            percentil = None
+        if percentil is not None and 0 <= percentil <= 100:
+            return {'funcion': estadistico_percentil(percentil),
+                    'orden': percentil_orden(percentil),
+                    'ponderado': cuantil_ponderado(percentil / 100)}
+
+    raise ValueError(f"Estadístico no registrado: {nombre!r}")
+
+
+def resolver_estadisticos(estadisticos):
+    if isinstance(estadisticos, str):
+        estadisticos = [estadisticos]
+    if isinstance(estadisticos, dict):
+        return {
+            nombre: valor if isinstance(valor, dict) else {'funcion': valor}
+            for nombre, valor in estadisticos.items()
+        }
+    return {nombre: obtener_estadistico(nombre) for nombre in estadisticos}
+
+
+def desviacion_muestral(muestras, axis=None):
+    return np.std(muestras, axis=axis, ddof=1)
+
+
+def media_conteos(valores, conteos, n):
+    return conteos @ valores / n
+
+
+def desviacion_conteos(valores, conteos, n):
+    # Dos pasadas O(réplicas x valores únicos): sin cancelación numérica
+    medias = conteos @ valores / n
+    desvios = valores[np.newaxis, :] - medias[:, np.newaxis]
+    varianza = np.einsum('ij,ij->i', conteos, desvios ** 2) / (n - 1)
+    return np.sqrt(varianza)
+
+
+def media_ponderada(valores, pesos, n):
+    # Producto matriz-vector: BLAS
+    return pesos @ valores
+
+
+def desviacion_ponderada(valores, pesos, n):
+    # Varianza de la distribución ponderada con los valores centrados en su
+    # media global (menos cancelación), con el mismo factor n/(n-1) que ddof=1
+    centrados = (valores - np.mean(valores)).astype(np.float64)
+    medias = pesos @ centrados
+    varianza = pesos @ (centrados * centrados) - medias * medias
+    return np.sqrt(np.maximum(varianza, 0) * n / max(n - 1, 1))
+
+
+def jackknife_media(valores, conteos):
+    n = conteos.sum()
+    return (conteos @ valores - valores) / (n - 1)
+
+
+def jackknife_desviacion(valores, conteos):
+    # Quitar x_i de la suma de cuadrados centrada SC: SC - c_i² - c_i²/(n-1)
+    n = conteos.sum()
+    centrados = valores - np.average(valores, weights=conteos)
+    suma_cuadrados = conteos @ centrados ** 2
+    suma_sin_uno = suma_cuadrados - centrados ** 2 * n / (n - 1)
+    return np.sqrt(np.maximum(suma_sin_uno, 0) / (n - 2))
+
+
+registrar_estadistico('media', np.mean, media_conteos,
+                      jackknife=jackknife_media, ponderado=media_ponderada)
+registrar_estadistico('mediana', np.median, orden=mediana_orden,
+                      ponderado=cuantil_ponderado(0.5))
+registrar_estadistico('desviacion', desviacion_muestral, desviacion_conteos,
+                      jackknife=jackknife_desviacion, ponderado=desviacion_ponderada)
+registrar_estadistico('proporcion', np.mean, media_conteos,
+                      jackknife=jackknife_media, ponderado=media_ponderada)
+registrar_estadistico(
+    'percentil_90', estadistico_percentil(90), orden=percentil_orden(90),
+    ponderado=cuantil_ponderado(0.9))
@@ -0,0 +1,286 @@
+import numpy as np
+
+from .bca import calcular_bca, calcular_bca_dos_muestras
+from .estadisticos import obtener_estadistico, resolver_estadisticos
+from .exacto import (bca_distribucion, distribucion_bootstrap, elegir_estrategia, percentiles_distribucion,
+                     resultado_distribucion)
+from .instrumentacion import fase
+from .motor import (COMPARACIONES, ejecutar_remuestreo, evaluar_estadistico, remuestrear_estadisticos,
+                    validar_comparacion)
+from .resultados import ResultadoBootstrap
+
+# Funciones Bootstrap (adaptadas del código original)
+
+
+def bootstrap_media_alturas(datos, n_bootstrap=1000, almacenamiento=None, estrategia='auto', **opciones):
+    datos = np.asarray(datos)
+
+    distribucion, diagnostico = distribucion_bootstrap(
+        datos, 'media', n_bootstrap, estrategia, **opciones)
+    esquema = diagnostico.get('esquema', 'iid')
+
+    media_original = np.mean(datos)
+
+    with fase('intervalos'):
+        intervalos = {
+            'ic_95': percentiles_distribucion(distribucion, [2.5, 97.5]),
+            'ic_90': percentiles_distribucion(distribucion, [5, 95]),
+            'ic_95_bca': bca_distribucion(datos, distribucion, media_original, 'media', esquema=esquema),
+            'ic_90_bca': bca_distribucion(
+                datos, distribucion, media_original, 'media', (0.05, 0.95), esquema=esquema)
+        }
+
+    return resultado_distribucion(
+        'media', datos, media_original, distribucion, intervalos, diagnostico, almacenamiento)
+
+
+def bootstrap_mediana_salarios(datos, n_bootstrap=1000, almacenamiento=None, incluir_medias=False,
+                               estrategia='auto', **opciones):
+    datos = np.asarray(datos)
+
+    # Las medias bootstrap solo se calculan si se piden explícitamente (y
+    # entonces hacen falta réplicas: Monte Carlo)
+    adicionales = ('media',) if incluir_medias else ()
+    distribucion, diagnostico = distribucion_bootstrap(
+        datos, 'mediana', n_bootstrap, estrategia, adicionales, **opciones)
+    esquema = diagnostico.get('esquema', 'iid')
+
+    mediana_original = np.median(datos)
+    media_original = np.mean(datos)
+
+    with fase('intervalos'):
+        intervalos = {
+            'ic_95_mediana': percentiles_distribucion(distribucion, [2.5, 97.5]),
+            'ic_95_bca_mediana': bca_distribucion(
+                datos, distribucion, mediana_original, 'mediana', esquema=esquema)
+        }
+    extras = {'media_original': media_original, **diagnostico}
+    if incluir_medias:
+        extras['medias_bootstrap'] = distribucion['adicionales']['media']
+
+    return resultado_distribucion(
+        'mediana', datos, mediana_original, distribucion, intervalos, extras, almacenamiento)
+
+
+def bootstrap_desviacion_estandar(datos, n_bootstrap=1000, almacenamiento=None, **opciones):
+    datos = np.asarray(datos)
+
+    replicas, diagnostico = ejecutar_remuestreo(
+        datos, ['desviacion'], n_bootstrap, **opciones)
+    esquema = diagnostico.get('esquema', 'iid')
+    desviaciones_bootstrap = replicas['desviacion']
+
+    desviacion_original = np.std(datos, ddof=1)
+
+    with fase('intervalos'):
+        intervalos = {
+            'ic_95_desviacion': np.percentile(desviaciones_bootstrap, [2.5, 97.5]),
+            'ic_95_bca_desviacion': calcular_bca(
+                datos, desviaciones_bootstrap, desviacion_original, 'desviacion', esquema=esquema)
+        }
+
+    return ResultadoBootstrap.desde_replicas(
+        'desviacion', datos, desviacion_original, desviaciones_bootstrap, intervalos,
+        {'n_bootstrap': len(desviaciones_bootstrap), **diagnostico}, almacenamiento)
+
+
+def bootstrap_proporcion_calidad(datos, n_bootstrap=1000, almacenamiento=None, estrategia='auto', **opciones):
+    datos = np.asarray(datos)
+    n = len(datos)
+
+    distribucion, diagnostico = distribucion_bootstrap(
+        datos, 'proporcion', n_bootstrap, estrategia, **opciones)
+    esquema = diagnostico.get('esquema', 'iid')
+
+    proporcion_original = np.mean(datos)
+
+    with fase('intervalos'):
+        intervalos = {
+            'ic_95_percentil': percentiles_distribucion(distribucion, [2.5, 97.5]),
+            'ic_95_bca': bca_distribucion(
+                datos, distribucion, proporcion_original, 'proporcion', esquema=esquema)
+        }
+    extras = {'n_total': n, 'n_exitos': int(np.sum(datos)), **diagnostico}
+
+    return resultado_distribucion(
+        'proporcion', datos, proporcion_original, distribucion, intervalos, extras, almacenamiento)
+
+
+def bootstrap_percentil_90(datos, percentil=90, n_bootstrap=1000, almacenamiento=None, estrategia='auto',
+                           **opciones):
+    datos = np.asarray(datos)
+
+    nombre = f'percentil_{percentil}'
+    distribucion, diagnostico = distribucion_bootstrap(
+        datos, nombre, n_bootstrap, estrategia, **opciones)
+    esquema = diagnostico.get('esquema', 'iid')
+
+    percentil_original = np.percentile(datos, percentil)
+
+    with fase('intervalos'):
+        intervalos = {
+            'ic_95': percentiles_distribucion(distribucion, [2.5, 97.5]),
+            'ic_95_bca': bca_distribucion(
+                datos, distribucion, percentil_original, nombre, esquema=esquema)
+        }
+    extras = {'percentil_objetivo': percentil, **diagnostico}
+
+    return resultado_distribucion(
+        'percentil', datos, percentil_original, distribucion, intervalos, extras, almacenamiento)
+
+
+# Estadístico de los estimadores que eligen estrategia (por nombre, como la
+# clave de caché)
+ESTADISTICOS_ESTRATEGIA = {'bootstrap_media_alturas': 'media', 'bootstrap_mediana_salarios': 'mediana',
+                           'bootstrap_proporcion_calidad': 'proporcion', 'bootstrap_percentil_90': 'percentil'}
+
+
+def estrategia_estimador(funcion, datos, parametros):
+    # Estrategia que usará `funcion` con estos datos y parámetros, sin
+    # calcular nada; None si el estimador no elige estrategia
+    nombre = ESTADISTICOS_ESTRATEGIA.get(funcion.__name__)
+    if nombre is None or isinstance(datos, tuple):
+        return None
+    if nombre == 'percentil':
+        nombre = f"percentil_{parametros.get('percentil', 90)}"
+    adicionales = ('media',) if parametros.get('incluir_medias') else ()
+    try:
+        return elegir_estrategia(nombre, np.asarray(datos), parametros.get('estrategia', 'auto'),
+                                 parametros.get('esquema', 'iid'), adicionales)
+    except ValueError:
+        # El estimador dará el error al ejecutarse
+        return None
+
+
+def nombre_intervalo(confianza):
+    # 0.95 -> 'ic_95', 0.975 -> 'ic_97.5'
+    return f"ic_{100 * confianza:g}"
+
+
+def bootstrap_estadisticos(datos, estadisticos, n_bootstrap=1000, almacenamiento=None, confianza=0.95,
+                           **opciones):
+    # Varios estadísticos en una sola pasada de remuestreo: un resultado
+    # por estadístico con las mismas métricas que los bootstrap_* individuales.
+    # Los intervalos se llaman nombre_intervalo(confianza) y su versión '_bca'.
+    if not 0 < confianza < 1:
+        raise ValueError(f"La confianza debe estar entre 0 y 1: {confianza!r}")
+    niveles = ((1 - confianza) / 2, (1 + confianza) / 2)
+    intervalo = nombre_intervalo(confianza)
+    if not isinstance(datos, tuple):
+        datos = np.asarray(datos)
+    especificaciones = resolver_estadisticos(estadisticos)
+    replicas, diagnostico = ejecutar_remuestreo(
+        datos, estadisticos, n_bootstrap, **opciones)
+    esquema = diagnostico.get('esquema', 'iid')
+
+    resultados = {}
+    for nombre, especificacion in especificaciones.items():
+        replicas_estadistico = replicas[nombre]
+        valor_original = evaluar_estadistico(datos, especificacion)
+        with fase('intervalos'):
+            intervalos = {
+                intervalo: np.percentile(replicas_estadistico, [100 * nivel for nivel in niveles]),
+                f'{intervalo}_bca': calcular_bca(
+                    datos, replicas_estadistico, valor_original, especificacion, niveles, esquema=esquema)
+            }
+        extras = {'n_bootstrap': len(replicas_estadistico)}
+        for clave in ('esquema', 'longitud_bloque'):
+            if clave in diagnostico:
+                extras[clave] = diagnostico[clave]
+        if 'convergio' in diagnostico:
+            extras['convergio'] = diagnostico['convergio']
+            extras['error_mc_error_estandar'] = diagnostico['error_mc_error_estandar'][nombre]
+            extras['error_mc_ic_95'] = diagnostico['error_mc_ic_95'][nombre]
+        resultados[nombre] = ResultadoBootstrap.desde_replicas(
+            None, datos, valor_original, replicas_estadistico, intervalos, extras, almacenamiento)
+
+    return resultados
+
+
+# Tolerancia relativa al comparar permutaciones con el valor observado: los
+# empates exactos (frecuentes con datos discretos) no deben perderse por
+# redondeo
+TOLERANCIA_PERMUTACION = 1e-9
+
+# Opciones del motor que también usa el contraste de permutación
+OPCIONES_PERMUTACION = ('memoria_maxima', 'compresion', 'n_trabajadores', 'ejecutor')
+
+
+def p_valor_permutacion(permutadas, observado, comparacion):
+    # Bilateral: |a - b| (o |log(a / b)|) al menos tan extremo como el
+    # observado. La partición observada cuenta como una más (Phipson y
+    # Smyth), así que el p-valor nunca es 0.
+    if comparacion == 'razon':
+        with np.errstate(divide='ignore', invalid='ignore'):
+            permutadas, observado = np.log(permutadas), np.log(observado)
+    extremas = np.count_nonzero(np.abs(permutadas) >= abs(observado) * (1 - TOLERANCIA_PERMUTACION))
+    return (extremas + 1) / (len(permutadas) + 1)
+
+
+def bootstrap_dos_muestras(muestras, estadistico='media', comparacion='diferencia', n_bootstrap=1000,
+                           n_permutaciones=10000, almacenamiento=None, progreso=None, **opciones):
+    # Compara un estadístico del registro entre dos muestras independientes
+    # (a, b): réplicas de a - b ('diferencia') o a / b ('razon') con ambas
+    # remuestreadas en la misma pasada, IC percentil y BCa, y el p-valor de
+    # un contraste de permutación (n_permutaciones=0 lo omite).
+    validar_comparacion(comparacion)
+    muestras = tuple(np.asarray(muestra) for muestra in muestras)
+    especificacion = obtener_estadistico(estadistico)
+    semilla = opciones.pop('semilla', None)
+    if not isinstance(semilla, np.random.SeedSequence):
+        semilla = np.random.SeedSequence(semilla)
+    semilla_bootstrap, semilla_permutaciones = semilla.spawn(2)
+
+    replicas, diagnostico = ejecutar_remuestreo(
+        muestras, [estadistico], n_bootstrap, comparacion=comparacion, semilla=semilla_bootstrap,
+        progreso=progreso, **opciones)
+    esquema = diagnostico.get('esquema', 'iid')
+    comparaciones_bootstrap = replicas[estadistico]
+
+    valores_originales = [evaluar_estadistico(muestra, especificacion) for muestra in muestras]
+    if comparacion == 'razon' and valores_originales[1] == 0:
+        raise ValueError(f"La razón necesita un {estadistico} distinto de cero en la segunda muestra")
+    valor_original = COMPARACIONES[comparacion](*valores_originales)
+
+    # Una razón cuyo denominador remuestreado vale cero da inf (o nan si el
+    # numerador también): esas réplicas no estiman nada, se descartan y se
+    # informa cuántas fueron
+    finitas = np.isfinite(comparaciones_bootstrap)
+    replicas_descartadas = len(finitas) - int(np.count_nonzero(finitas))
+    if replicas_descartadas and replicas_descartadas == len(finitas):
+        raise ValueError(f"Todas las réplicas de la {comparacion} dieron un valor no finito "
+                         f"(¿{estadistico} cero en la segunda muestra?)")
+    if replicas_descartadas:
+        comparaciones_bootstrap = comparaciones_bootstrap[finitas]
+
+    with fase('intervalos'):
+        intervalos = {
+            'ic_95': np.percentile(comparaciones_bootstrap, [2.5, 97.5]),
+            'ic_95_bca': calcular_bca_dos_muestras(
+                muestras, comparaciones_bootstrap, valor_original, especificacion, comparacion,
+                valores_originales, esquema=esquema)
+        }
+    extras = {'estadistico': estadistico, 'comparacion': comparacion,
+              'valor_a': valores_originales[0], 'valor_b': valores_originales[1],
+              'n_a': len(muestras[0]), 'n_b': len(muestras[1]),
+              **diagnostico, 'n_bootstrap': len(comparaciones_bootstrap),
+              'replicas_descartadas': replicas_descartadas}
+
+    if n_permutaciones:
+        # Los bloques de permutaciones se informan aparte: no son réplicas
+        # bootstrap y no deben mezclarse con los resultados parciales
+        informar = None
+        if progreso is not None:
+            def informar(bloque):
+                progreso({'permutaciones': bloque[estadistico]})
+        with fase('permutaciones', n=extras['n_a'] + extras['n_b']) as registro:
+            registro['n_bootstrap'] = n_permutaciones
+            permutadas = remuestrear_estadisticos(
+                muestras, [estadistico], n_permutaciones, semilla=semilla_permutaciones, progreso=informar,
+                esquema='permutacion', comparacion=comparacion,
+                **{clave: opciones[clave] for clave in OPCIONES_PERMUTACION if clave in opciones})
+            extras['p_valor'] = p_valor_permutacion(permutadas[estadistico], valor_original, comparacion)
+        extras['n_permutaciones'] = n_permutaciones
+
+    return ResultadoBootstrap.desde_replicas(
+        None, muestras, valor_original, comparaciones_bootstrap, intervalos, extras, almacenamiento)
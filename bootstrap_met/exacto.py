@@ -0,0 +1,294 @@
+from statistics import NormalDist
+
+import numpy as np
+
+from .bca import aceleracion_jackknife, ajustar_niveles, calcular_bca, valores_jackknife
+from .estadisticos import obtener_estadistico
+from .instrumentacion import fase
+from .motor import comprimir_datos, ejecutar_remuestreo
+from .resultados import BINS_RESUMEN, CUANTILES_RESUMEN, ResultadoBootstrap
+
+# Distribución bootstrap sin Monte Carlo
+#
+#   'monte_carlo'  réplicas del motor
+#   'exacta'       la distribución de todas las remuestras posibles: los
+#                  estadísticos de orden con probabilidades binomiales sobre
+#                  los datos ordenados; media y proporción convolucionando la
+#                  distribución de una extracción cuando los datos caen en una
+#                  retícula (enteros, 0/1, montos redondeados...)
+#   'analitica'    media y proporción con n grande: el error estándar
+#                  bootstrap es exactamente sd/sqrt(n) (ddof=0) y la forma
+#                  es normal por el teorema central del límite
+#   'auto'         exacta hasta MAXIMO_EXACTO filas para la proporción y los
+#                  estadísticos de orden, analítica desde MINIMO_ANALITICO para
+#                  media y proporción, Monte Carlo en el resto
+#
+# Sin réplicas, el resultado guarda la distribución resumida (histograma y
+# cuantiles, como el almacenamiento 'resumen') y la distribución exacta
+# completa en extras['soporte'] y extras['probabilidades'].
+
+ESTRATEGIAS = ('auto', 'monte_carlo', 'exacta', 'analitica')
+
+# Filas hasta las que 'auto' usa la distribución exacta (y máximo de valores
+# distintos para pedirla a mano: la conjunta de dos posiciones es m x m)
+MAXIMO_EXACTO = 1000
+
+# Filas desde las que 'auto' usa la aproximación normal para media y proporción
+MINIMO_ANALITICO = 100000
+
+# Puntos máximos de la retícula de la suma (media exacta)
+MAXIMO_RETICULA = 1 << 22
+
+ESTADISTICOS_RETICULA = ('media', 'proporcion')
+
+# Opciones del motor que no cambian un resultado exacto o analítico
+PARAMETROS_MONTE_CARLO = ('n_bootstrap', 'semilla', 'almacenamiento', 'n_maximo', 'tamano_lote',
+                          'precision_error_estandar', 'precision_ic', 'memoria_maxima', 'compresion')
+
+# Cota de P(réplica < original) en el BCa exacto: z0 finito aunque el valor
+# original esté en un extremo del soporte (como un millón de réplicas)
+PROPORCION_MINIMA = 1e-6
+
+
+def log_combinatorios(n):
+    # log C(n, j) para j = 0..n sin scipy: suma acumulada de log((n - j + 1) / j)
+    j = np.arange(1, n + 1)
+    return np.concatenate([[0.0], np.cumsum(np.log(n - j + 1) - np.log(j))])
+
+
+def cola_binomial(n, probabilidades, k):
+    # P(Binomial(n, p) >= k) para cada p, sumando la función de masa en escala log
+    j = np.arange(k, n + 1)
+    probabilidades = np.asarray(probabilidades, dtype=np.float64)
+    colas = np.ones(len(probabilidades))
+    interiores = (probabilidades > 0) & (probabilidades < 1)
+    p = probabilidades[interiores, np.newaxis]
+    colas[interiores] = np.exp(log_combinatorios(n)[j] + j * np.log(p) + (n - j) * np.log1p(-p)).sum(axis=1)
+    colas[probabilidades <= 0] = float(k <= 0)
+    return np.minimum(colas, 1.0)
+
+
+def agrupar_soporte(soporte, probabilidades):
+    # Suma las probabilidades de valores repetidos; soporte ordenado
+    soporte, inversos = np.unique(soporte, return_inverse=True)
+    probabilidades = np.bincount(inversos.ravel(), weights=np.maximum(probabilidades, 0).ravel(),
+                                 minlength=len(soporte))
+    return soporte, probabilidades / probabilidades.sum()
+
+
+def distribucion_orden(valores, conteos, orden):
+    # `valores` únicos ordenados con sus conteos. El valor en la posición j
+    # (base 0) de una remuestra ordenada es <= v_a si al menos j + 1 de las
+    # n extracciones lo son: P(Binomial(n, F_a) > j), con F_a la proporción
+    # de datos <= v_a. Dos posiciones seguidas (j, j + 1) se interpolan, así
+    # que hace falta su conjunta; sale de
+    #   H(a, b) = P(X_j <= v_a, X_j+1 > v_b) = C(n, j+1) F_a^(j+1) (1 - F_b)^(n-j-1)
+    # (a <= b: exactamente j + 1 extracciones <= v_a y ninguna en (v_a, v_b]).
+    n = int(conteos.sum())
+    posiciones, combinar = orden(n)
+    j = posiciones[0]
+    acumuladas = np.cumsum(conteos) / n
+    marginal = np.diff(cola_binomial(n, acumuladas, j + 1), prepend=0.0)
+    if posiciones[-1] == j:
+        return agrupar_soporte(combinar(valores, valores), marginal)
+
+    r = j + 1
+    with np.errstate(divide='ignore'):
+        log_h = (log_combinatorios(n)[r] + r * np.log(np.concatenate([[0.0], acumuladas]))[:, np.newaxis]
+                 + (n - r) * np.log1p(-acumuladas)[np.newaxis, :])
+    h = np.exp(log_h)
+    # P(X_j = v_a, X_j+1 > v_b) y, restando columnas vecinas, P(X_j = v_a, X_j+1 = v_b)
+    cola = h[1:] - h[:-1]
+    conjunta = np.zeros_like(cola)
+    conjunta[:, 1:] = cola[:, :-1] - cola[:, 1:]
+    conjunta = np.triu(conjunta, 1)
+    diagonal = np.arange(len(valores))
+    conjunta[diagonal, diagonal] = marginal - cola[diagonal, diagonal]
+
+    bajos, altos = np.nonzero(conjunta > 0)
+    return agrupar_soporte(combinar(valores[bajos], valores[altos]), conjunta[bajos, altos])
+
+
+def paso_reticula(valores):
+    # Paso común de los valores únicos ordenados (enteros o con hasta seis
+    # decimales), o None si no hay una retícula razonable
+    if len(valores) == 1 or valores.dtype == np.bool_:
+        return 1
+    diferencias = np.diff(valores)
+    if np.issubdtype(valores.dtype, np.integer):
+        return int(np.gcd.reduce(diferencias.astype(np.int64)))
+    # Tolerancia a la escala del tipo: 13.2 en float32 no es exacto
+    tolerancia = 16 * np.finfo(valores.dtype).eps * np.max(np.abs(valores))
+    for decimales in range(7):
+        escaladas = diferencias * 10 ** decimales
+        enteras = np.round(escaladas)
+        if np.all(np.abs(escaladas - enteras) <= tolerancia * 10 ** decimales):
+            return int(np.gcd.reduce(enteras.astype(np.int64))) / 10 ** decimales
+    return None
+
+
+def puntos_reticula(valores, conteos):
+    # Puntos de la retícula de la suma de n extracciones, o None sin retícula
+    paso = paso_reticula(valores)
+    if paso is None:
+        return None
+    return int(conteos.sum()) * int(round((float(valores[-1]) - float(valores[0])) / paso)) + 1
+
+
+def distribucion_media(valores, conteos):
+    # La suma de n extracciones tiene la distribución de una extracción
+    # convolucionada n veces: una potencia de su FFT
+    n = int(conteos.sum())
+    paso = paso_reticula(valores)
+    minimo = float(valores[0])
+    indices = np.round((valores - minimo) / paso).astype(np.int64)
+    extraccion = np.zeros(indices[-1] + 1)
+    extraccion[indices] = conteos / n
+    puntos = n * indices[-1] + 1
+    tamano_fft = 1 << int(np.ceil(np.log2(puntos)))
+    suma = np.fft.irfft(np.fft.rfft(extraccion, tamano_fft) ** n, tamano_fft)[:puntos]
+    # El redondeo de la FFT deja valores del orden de 1e-17 en las colas
+    suma[suma < 1e-15 * suma.max()] = 0
+    soporte = minimo + paso * np.arange(puntos) / n
+    positivos = suma > 0
+    return soporte[positivos], suma[positivos] / suma[positivos].sum()
+
+
+def elegir_estrategia(nombre, datos, estrategia='auto', esquema='iid', adicionales=()):
+    # `adicionales`: otros estadísticos cuyas réplicas se piden también (solo Monte Carlo)
+    if estrategia not in ESTRATEGIAS:
+        raise ValueError(f"Estrategia desconocida: {estrategia!r} (usa {', '.join(map(repr, ESTRATEGIAS))})")
+    if estrategia == 'monte_carlo':
+        return estrategia
+    especificacion = obtener_estadistico(nombre)
+    n = len(datos)
+    if estrategia == 'auto':
+        if esquema != 'iid' or adicionales or n == 0:
+            return 'monte_carlo'
+        if n <= MAXIMO_EXACTO and ('orden' in especificacion or nombre == 'proporcion'):
+            if nombre != 'proporcion':
+                return 'exacta'
+            valores, conteos = comprimir_datos(datos)
+            puntos = puntos_reticula(valores, conteos)
+            if puntos is not None and puntos <= MAXIMO_RETICULA:
+                return 'exacta'
+        if n >= MINIMO_ANALITICO and nombre in ESTADISTICOS_RETICULA:
+            return 'analitica'
+        return 'monte_carlo'
+
+    if esquema != 'iid':
+        raise ValueError(f"La estrategia {estrategia!r} solo admite el esquema 'iid'")
+    if adicionales:
+        raise ValueError(f"La estrategia {estrategia!r} no da réplicas de {', '.join(adicionales)}")
+    if n == 0:
+        raise ValueError("No hay datos")
+    if estrategia == 'analitica' and nombre not in ESTADISTICOS_RETICULA:
+        raise ValueError(f"Sin aproximación analítica para {nombre!r} (solo media y proporción)")
+    if estrategia == 'exacta':
+        valores, conteos = comprimir_datos(datos)
+        if 'orden' in especificacion:
+            if len(valores) > MAXIMO_EXACTO:
+                raise ValueError(f"Demasiados valores distintos para la distribución exacta: {len(valores)} "
+                                 f"(máximo {MAXIMO_EXACTO})")
+        elif nombre in ESTADISTICOS_RETICULA:
+            puntos = puntos_reticula(valores, conteos)
+            if puntos is None or puntos > MAXIMO_RETICULA:
+                raise ValueError("La media exacta necesita datos en una retícula con "
+                                 f"a lo sumo {MAXIMO_RETICULA} sumas posibles")
+        else:
+            raise ValueError(f"Sin distribución exacta para {nombre!r}")
+    return estrategia
+
+
+def distribucion_bootstrap(datos, nombre, n_bootstrap=1000, estrategia='auto', adicionales=(), **opciones):
+    # Distribución bootstrap de `nombre` según la estrategia y diagnóstico
+    # para el resultado. Con Monte Carlo la distribución son las réplicas
+    # (también las de `adicionales`, en la misma pasada).
+    estrategia = elegir_estrategia(nombre, datos, estrategia, opciones.get('esquema', 'iid'), adicionales)
+    if estrategia == 'monte_carlo':
+        replicas, diagnostico = ejecutar_remuestreo(
+            datos, [nombre, *adicionales], n_bootstrap, **opciones)
+        distribucion = {'estrategia': estrategia, 'replicas': replicas[nombre],
+                        'adicionales': {adicional: replicas[adicional] for adicional in adicionales}}
+        return distribucion, {'n_bootstrap': len(replicas[nombre]), **diagnostico, 'estrategia': estrategia}
+
+    with fase('distribucion', estrategia=estrategia, n=len(datos)):
+        if estrategia == 'analitica':
+            distribucion = {'estrategia': estrategia, 'media': np.mean(datos),
+                            'error_estandar': np.std(datos) / np.sqrt(len(datos))}
+        else:
+            valores, conteos = comprimir_datos(datos)
+            especificacion = obtener_estadistico(nombre)
+            if 'orden' in especificacion:
+                soporte, probabilidades = distribucion_orden(valores, conteos, especificacion['orden'])
+            else:
+                soporte, probabilidades = distribucion_media(valores, conteos)
+            distribucion = {'estrategia': estrategia, 'soporte': soporte, 'probabilidades': probabilidades}
+    return distribucion, {'estrategia': estrategia}
+
+
+def cuantiles_exactos(soporte, probabilidades, niveles):
+    # Inversa de la función de distribución (el menor valor con F >= nivel)
+    acumuladas = np.cumsum(probabilidades)
+    indices = np.searchsorted(acumuladas, np.asarray(niveles) - 1e-12, side='left')
+    return soporte[np.minimum(indices, len(soporte) - 1)]
+
+
+def percentiles_distribucion(distribucion, percentiles):
+    # Como np.percentile(replicas, percentiles) para cualquier estrategia
+    if distribucion['estrategia'] == 'monte_carlo':
+        return np.percentile(distribucion['replicas'], percentiles)
+    niveles = np.asarray(percentiles) / 100
+    if distribucion['estrategia'] == 'exacta':
+        return cuantiles_exactos(distribucion['soporte'], distribucion['probabilidades'], niveles)
+    normal = NormalDist()
+    return distribucion['media'] + distribucion['error_estandar'] * np.array(
+        [normal.inv_cdf(nivel) for nivel in niveles])
+
+
+def bca_distribucion(datos, distribucion, valor_original, estadistico, niveles=(0.025, 0.975), esquema='iid'):
+    # Como calcular_bca; sin réplicas, z0 sale de la distribución exacta (o es
+    # 0 con la normal, centrada en el original) y la aceleración del jackknife
+    if distribucion['estrategia'] == 'monte_carlo':
+        return calcular_bca(datos, distribucion['replicas'], valor_original, estadistico, niveles, esquema)
+    if len(datos) < 3:
+        return percentiles_distribucion(distribucion, 100 * np.asarray(niveles))
+    with fase('bca', n=len(datos)):
+        aceleracion = aceleracion_jackknife(*valores_jackknife(datos, obtener_estadistico(estadistico)))
+        if distribucion['estrategia'] == 'analitica':
+            proporcion = 0.5
+        else:
+            soporte, probabilidades = distribucion['soporte'], distribucion['probabilidades']
+            iguales = np.isclose(soporte, valor_original, rtol=1e-12, atol=0)
+            proporcion = (probabilidades[(soporte < valor_original) & ~iguales].sum() +
+                          0.5 * probabilidades[iguales].sum())
+            proporcion = np.clip(proporcion, PROPORCION_MINIMA, 1 - PROPORCION_MINIMA)
+        ajustados = ajustar_niveles(proporcion, aceleracion, niveles)
+        return percentiles_distribucion(distribucion, 100 * np.asarray(ajustados))
+
+
+def resultado_distribucion(tipo, datos, valor_original, distribucion, intervalos, extras, almacenamiento=None):
+    # Con Monte Carlo, el resultado de siempre; sin réplicas, media, error
+    # estándar, histograma y cuantiles salen de la distribución
+    if distribucion['estrategia'] == 'monte_carlo':
+        return ResultadoBootstrap.desde_replicas(
+            tipo, datos, valor_original, distribucion['replicas'], intervalos, extras, almacenamiento)
+
+    with fase('resumen', almacenamiento=distribucion['estrategia']):
+        if distribucion['estrategia'] == 'exacta':
+            soporte, probabilidades = distribucion['soporte'], distribucion['probabilidades']
+            promedio = probabilidades @ soporte
+            error_estandar = np.sqrt(max(probabilidades @ (soporte - promedio) ** 2, 0.0))
+            histograma = np.histogram(soporte, bins=BINS_RESUMEN, weights=probabilidades)
+            extras = {**extras, 'soporte': soporte, 'probabilidades': probabilidades}
+        else:
+            promedio, error_estandar = distribucion['media'], distribucion['error_estandar']
+            if error_estandar > 0:
+                bordes = promedio + error_estandar * np.linspace(-4, 4, BINS_RESUMEN + 1)
+                normal = NormalDist(promedio, error_estandar)
+                histograma = (np.diff([normal.cdf(borde) for borde in bordes]), bordes)
+            else:
+                histograma = np.histogram([promedio], bins=1, weights=[1.0])
+        resumen_cuantiles = dict(zip(CUANTILES_RESUMEN, percentiles_distribucion(distribucion, CUANTILES_RESUMEN)))
+    return ResultadoBootstrap(tipo, datos, valor_original, None, promedio, error_estandar,
+                              intervalos, histograma, resumen_cuantiles, extras)
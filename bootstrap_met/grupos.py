@@ -0,0 +1,278 @@
+from statistics import NormalDist
+
+import numpy as np
+
+from .estadisticos import interpolar_lineal, obtener_estadistico
+from .motor import calcular_tamano_bloque, dividir_bloques, usar_ejecutor
+
+# Bootstrap por grupos
+
+# Filas mínimas por paquete: los grupos pequeños se agrupan hasta llenarlo
+# para que cada bloque de réplicas sea una sola operación vectorizada
+FILAS_POR_PAQUETE = 4096
+
+# Los núcleos por segmento recorren la matriz de réplicas varias veces:
+# bloques que caben en caché rinden más que el presupuesto general
+MEMORIA_BLOQUE_GRUPOS = 8 * 1024 * 1024
+
+ESTADISTICOS_SUMA = ('media', 'proporcion', 'desviacion')
+
+
+def ordenar_por_grupo(valores, grupos):
+    # Datos contiguos por grupo y ordenados dentro de cada uno: los índices
+    # de un grupo son un rango [inicio, inicio + tamaño) del arreglo ordenado
+    etiquetas, codigos = np.unique(np.asarray(grupos), return_inverse=True)
+    valores = np.asarray(valores)
+    orden = np.lexsort((valores, codigos))
+    tamanos = np.bincount(codigos, minlength=len(etiquetas))
+    inicios = np.concatenate([[0], np.cumsum(tamanos)[:-1]])
+    return etiquetas, valores[orden], inicios, tamanos
+
+
+def empaquetar_grupos(tamanos, filas_por_paquete=FILAS_POR_PAQUETE):
+    # Grupos consecutivos hasta superar `filas_por_paquete`; un grupo grande
+    # forma su propio paquete. Devuelve (primer grupo, último + 1) por paquete.
+    paquetes = []
+    primero = 0
+    acumulado = 0
+    for grupo, tamano in enumerate(tamanos):
+        acumulado += tamano
+        if acumulado >= filas_por_paquete:
+            paquetes.append((primero, grupo + 1))
+            primero = grupo + 1
+            acumulado = 0
+    if primero < len(tamanos):
+        paquetes.append((primero, len(tamanos)))
+    return paquetes
+
+
+def posiciones_orden(nombre, tamanos):
+    # Posiciones (base 0 dentro del grupo) de cada estadístico de orden,
+    # vectorizadas sobre grupos de distinto tamaño, y el gamma de la
+    # interpolación (None para la mediana, que promedia las dos)
+    if nombre == 'mediana':
+        return (tamanos - 1) // 2, tamanos // 2, None
+
+    percentil = float(nombre[len('percentil_'):])
+    indice_virtual = (tamanos - 1) * np.true_divide(percentil, 100)
+    anterior = np.floor(indice_virtual).astype(np.int64)
+    siguiente = np.minimum(anterior + 1, tamanos - 1)
+    return anterior, siguiente, indice_virtual - anterior
+
+
+def combinar_orden(bajo, alto, gamma):
+    # Misma aritmética que mediana_orden y percentil_orden
+    if gamma is None:
+        return (bajo + alto) / 2
+    return interpolar_lineal(bajo, alto, gamma)
+
+
+def validar_estadisticos(estadisticos):
+    if isinstance(estadisticos, str):
+        estadisticos = [estadisticos]
+    for nombre in estadisticos:
+        especificacion = obtener_estadistico(nombre)
+        if nombre not in ESTADISTICOS_SUMA and nombre != 'mediana' and not (
+                nombre.startswith('percentil_') and 'orden' in especificacion):
+            raise ValueError(f"Estadístico no disponible por grupos: {nombre!r}")
+    return list(estadisticos)
+
+
+def sumas_segmentos(valores, inicios):
+    # Suma por segmento a lo largo del último eje
+    return np.add.reduceat(valores, inicios, axis=-1)
+
+
+def estadisticos_originales(estadisticos, datos, inicios, tamanos):
+    medias = sumas_segmentos(datos, inicios) / tamanos
+    originales = {}
+    for nombre in estadisticos:
+        if nombre == 'desviacion':
+            desvios = datos - np.repeat(medias, tamanos)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                originales[nombre] = np.sqrt(sumas_segmentos(desvios ** 2, inicios) / (tamanos - 1))
+        elif nombre in ESTADISTICOS_SUMA:
+            originales[nombre] = medias
+        else:
+            anterior, siguiente, gamma = posiciones_orden(nombre, tamanos)
+            originales[nombre] = combinar_orden(datos[inicios + anterior], datos[inicios + siguiente], gamma)
+    return originales, medias
+
+
+def indices_en_grupos(generador, bajos, tamanos_fila, n_replicas):
+    # Un índice uniforme en [bajo, bajo + tamaño) por columna con un solo
+    # sorteo de floats: más rápido que integers() con límites por columna
+    indices = generador.random((n_replicas, len(bajos)))
+    indices *= tamanos_fila
+    indices = indices.astype(bajos.dtype)
+    indices += bajos
+    return indices
+
+
+def evaluar_segmentos(estadisticos, datos, centrados, indices, columnas, tamanos, medias):
+    # `indices` tiene forma (réplicas, filas del paquete) y cada fila guarda los
+    # segmentos de los grupos uno tras otro; `columnas` es donde empieza cada
+    # uno. Media y desviación salen de sumas por segmento de los datos
+    # centrados en la media de su grupo (sin cancelación). Como los índices de
+    # un grupo caen en su propio rango, ordenar la fila entera ordena cada
+    # segmento en su sitio para los estadísticos de orden.
+    resultados = {}
+    suma = suma_cuadrados = ordenados = None
+    for nombre in estadisticos:
+        if nombre in ESTADISTICOS_SUMA:
+            if suma is None:
+                muestras = centrados[indices]
+                suma = sumas_segmentos(muestras, columnas)
+                if 'desviacion' in estadisticos:
+                    suma_cuadrados = sumas_segmentos(muestras * muestras, columnas)
+                del muestras
+            if nombre == 'desviacion':
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    varianzas = (suma_cuadrados - suma ** 2 / tamanos) / (tamanos - 1)
+                resultados[nombre] = np.sqrt(np.maximum(varianzas, 0))
+            else:
+                resultados[nombre] = medias + suma / tamanos
+            continue
+        if ordenados is None:
+            ordenados = np.sort(indices, axis=1)
+        anterior, siguiente, gamma = posiciones_orden(nombre, tamanos)
+        resultados[nombre] = combinar_orden(datos[ordenados[:, columnas + anterior]],
+                                            datos[ordenados[:, columnas + siguiente]], gamma)
+    return resultados
+
+
+def procesar_paquete(estadisticos, datos, centrados, inicios, tamanos, medias, n_bootstrap,
+                     memoria_maxima, semilla):
+    # Unidad de trabajo: todas las réplicas de un paquete de grupos
+    n_filas = int(tamanos.sum())
+    columnas = np.concatenate([[0], np.cumsum(tamanos)[:-1]])
+    tipo_indice = np.int32 if len(datos) <= np.iinfo(np.int32).max else np.int64
+    bajos = np.repeat(inicios, tamanos).astype(tipo_indice)
+    tamanos_fila = np.repeat(tamanos, tamanos).astype(np.float64)
+
+    replicas = {nombre: np.empty((n_bootstrap, len(tamanos))) for nombre in estadisticos}
+    bloques = dividir_bloques(n_bootstrap, calcular_tamano_bloque(
+        n_filas, n_bootstrap, memoria_maxima, datos.itemsize))
+    for (inicio, fin), semilla_bloque in zip(bloques, semilla.spawn(len(bloques))):
+        indices = indices_en_grupos(np.random.default_rng(semilla_bloque), bajos, tamanos_fila, fin - inicio)
+        bloque = evaluar_segmentos(estadisticos, datos, centrados, indices, columnas, tamanos, medias)
+        for nombre in estadisticos:
+            replicas[nombre][inicio:fin] = bloque[nombre]
+    return replicas
+
+
+def jackknife_grupos(nombre, datos, inicios, tamanos, medias):
+    # Valores "dejando uno fuera" de cada fila dentro de su grupo, en forma
+    # cerrada y sin bucles por grupo (mismas fórmulas que el registro)
+    tamanos_fila = np.repeat(tamanos, tamanos)
+    if nombre in ('media', 'proporcion'):
+        return (np.repeat(sumas_segmentos(datos, inicios), tamanos) - datos) / (tamanos_fila - 1)
+    if nombre == 'desviacion':
+        centrados = datos - np.repeat(medias, tamanos)
+        suma_cuadrados = np.repeat(sumas_segmentos(centrados ** 2, inicios), tamanos)
+        suma_sin_uno = suma_cuadrados - centrados ** 2 * tamanos_fila / (tamanos_fila - 1)
+        return np.sqrt(np.maximum(suma_sin_uno, 0) / (tamanos_fila - 2))
+
+    # Quitar la fila de rango r desplaza en uno las posiciones >= r. Los
+    # grupos de una fila (sin jackknife) se acotan para no salir del segmento.
+    inicios_fila = np.repeat(inicios, tamanos)
+    rangos = np.arange(len(datos)) - inicios_fila
+    anterior, siguiente, gamma = posiciones_orden(nombre, np.maximum(tamanos - 1, 1))
+    valores = [datos[inicios_fila + np.minimum(posicion + (posicion >= rangos), tamanos_fila - 1)]
+               for posicion in (np.repeat(anterior, tamanos), np.repeat(siguiente, tamanos))]
+    return combinar_orden(*valores, None if gamma is None else np.repeat(gamma, tamanos))
+
+
+def percentiles_columnas(ordenadas, niveles):
+    # np.percentile (método 'linear') por columna con un nivel distinto en
+    # cada una; `ordenadas` viene ordenada a lo largo del eje 0
+    indice_virtual = (len(ordenadas) - 1) * niveles
+    anterior = np.floor(indice_virtual).astype(np.int64)
+    siguiente = np.minimum(anterior + 1, len(ordenadas) - 1)
+    columnas = np.arange(ordenadas.shape[1])
+    return interpolar_lineal(ordenadas[anterior, columnas], ordenadas[siguiente, columnas],
+                             indice_virtual - anterior)
+
+
+def niveles_bca(replicas, valores_originales, aceleraciones, niveles):
+    # Mismo ajuste que intervalo_bca, con z0 y aceleración por grupo
+    n_replicas = len(replicas)
+    proporciones = (np.count_nonzero(replicas < valores_originales, axis=0) +
+                    0.5 * np.count_nonzero(replicas == valores_originales, axis=0)) / n_replicas
+    proporciones = np.clip(proporciones, 1 / (n_replicas + 1), n_replicas / (n_replicas + 1))
+    normal = NormalDist()
+    z = [normal.inv_cdf(nivel) for nivel in niveles]
+    ajustados = np.empty((len(niveles), replicas.shape[1]))
+    for grupo, (proporcion, aceleracion) in enumerate(zip(proporciones, aceleraciones)):
+        z0 = normal.inv_cdf(proporcion)
+        ajustados[:, grupo] = [normal.cdf(z0 + (z0 + z_nivel) / (1 - aceleracion * (z0 + z_nivel)))
+                               for z_nivel in z]
+    return ajustados
+
+
+def bootstrap_por_grupos(valores, grupos, estadisticos=('media',), n_bootstrap=1000, confianza=0.95,
+                         bca=True, semilla=None, memoria_maxima=MEMORIA_BLOQUE_GRUPOS,
+                         n_trabajadores=1, ejecutor='hilos', filas_por_paquete=FILAS_POR_PAQUETE):
+    # Remuestrea dentro de cada grupo sin un bucle de Python por grupo y
+    # devuelve un DataFrame con una fila por (grupo, estadístico).
+    # Estadísticos admitidos: media, proporcion, desviacion, mediana y
+    # percentil_<p>. La semilla fija el resultado para un mismo
+    # `filas_por_paquete` y `memoria_maxima`, con cualquier número de trabajadores.
+    import pandas as pd
+
+    estadisticos = validar_estadisticos(estadisticos)
+    if not 0 < confianza < 1:
+        raise ValueError(f"La confianza debe estar entre 0 y 1: {confianza!r}")
+    if len(valores) != len(grupos):
+        raise ValueError("valores y grupos deben tener la misma longitud")
+    valores = np.asarray(valores)
+    if np.issubdtype(valores.dtype, np.floating):
+        validos = ~np.isnan(valores)
+        valores, grupos = valores[validos], np.asarray(grupos)[validos]
+    datos_float = valores.astype(np.float64)
+
+    etiquetas, datos, inicios, tamanos = ordenar_por_grupo(datos_float, grupos)
+    originales, medias = estadisticos_originales(estadisticos, datos, inicios, tamanos)
+    centrados = datos - np.repeat(medias, tamanos)
+
+    paquetes = empaquetar_grupos(tamanos, filas_por_paquete)
+    if not isinstance(semilla, np.random.SeedSequence):
+        semilla = np.random.SeedSequence(semilla)
+    argumentos = []
+    for (primero, ultimo), semilla_paquete in zip(paquetes, semilla.spawn(len(paquetes))):
+        # Cada paquete recibe solo sus filas, con índices relativos
+        desde, hasta = inicios[primero], inicios[ultimo - 1] + tamanos[ultimo - 1]
+        argumentos.append((estadisticos, datos[desde:hasta], centrados[desde:hasta],
+                           inicios[primero:ultimo] - desde, tamanos[primero:ultimo],
+                           medias[primero:ultimo], n_bootstrap, memoria_maxima, semilla_paquete))
+    n_trabajadores = max(1, min(int(n_trabajadores), len(paquetes)))
+    if n_trabajadores == 1:
+        resultados = [procesar_paquete(*argumento) for argumento in argumentos]
+    else:
+        with usar_ejecutor(ejecutor, n_trabajadores) as ejecutor_paquetes:
+            resultados = list(ejecutor_paquetes.map(procesar_paquete, *zip(*argumentos)))
+
+    niveles = np.array([(1 - confianza) / 2, (1 + confianza) / 2])
+    tablas = []
+    for nombre in estadisticos:
+        replicas = np.hstack([resultado[nombre] for resultado in resultados])
+        estimaciones = originales[nombre]
+        ordenadas = np.sort(replicas, axis=0)
+        columnas = {'grupo': etiquetas, 'estadistico': nombre, 'n': tamanos,
+                    'estimacion': estimaciones, 'error_estandar': np.std(replicas, axis=0),
+                    'ic_inferior': percentiles_columnas(ordenadas, niveles[0]),
+                    'ic_superior': percentiles_columnas(ordenadas, niveles[1])}
+        if bca:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                jackknife = jackknife_grupos(nombre, datos, inicios, tamanos, medias)
+                desvios = np.repeat(sumas_segmentos(jackknife, inicios) / tamanos, tamanos) - jackknife
+                denominadores = 6 * sumas_segmentos(desvios ** 2, inicios) ** 1.5
+                aceleraciones = np.where(denominadores == 0, 0.0,
+                                         sumas_segmentos(desvios ** 3, inicios) / denominadores)
+            ajustados = niveles_bca(replicas, estimaciones, aceleraciones, niveles)
+            # Con menos de tres filas no hay aceleración: intervalo percentil
+            ajustados[:, tamanos < 3] = niveles[:, np.newaxis]
+            columnas['ic_bca_inferior'] = percentiles_columnas(ordenadas, ajustados[0])
+            columnas['ic_bca_superior'] = percentiles_columnas(ordenadas, ajustados[1])
+        tablas.append(pd.DataFrame(columnas))
+    return pd.concat(tablas, ignore_index=True)
@@ -0,0 +1,114 @@
+import io
+import os
+
+import numpy as np
+
+# Carga de datos
+
+
+def importar_parquet():
+    # pyarrow solo hace falta para Parquet: sin él, un error que diga qué instalar
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as error:
+        raise ValueError("Los archivos Parquet necesitan pyarrow (pip install pyarrow)") from error
+    return pq
+
+
+def tipo_compacto(valores, permitir_float32=False):
+    # uint8 para indicadores 0/1, int32 para enteros y, si se permite, float32.
+    # int32 solo si también cabe la suma de dos valores (la mediana de dos
+    # posiciones, una diferencia): si no, se conserva el tipo original
+    valores = np.asarray(valores)
+    if len(valores) == 0:
+        return valores.astype(np.float64)
+    if valores.dtype == np.bool_:
+        return valores.astype(np.uint8)
+
+    es_entero = np.issubdtype(valores.dtype, np.integer)
+    if not es_entero and np.issubdtype(valores.dtype, np.floating) and np.isfinite(valores).all():
+        es_entero = bool(np.all(np.trunc(valores) == valores))
+    if es_entero:
+        minimo, maximo = valores.min(), valores.max()
+        if minimo >= 0 and maximo <= 1:
+            return valores.astype(np.uint8)
+        if 2 * max(abs(int(minimo)), abs(int(maximo))) <= np.iinfo(np.int32).max:
+            return valores.astype(np.int32)
+    if permitir_float32 and np.issubdtype(valores.dtype, np.floating):
+        return valores.astype(np.float32)
+    return valores
+
+
+def parsear_valores(texto, permitir_float32=False):
+    # Valores separados por comas o saltos de línea, con el parser C de pandas.
+    # Devuelve (valores, posiciones inválidas base 0); los huecos se ignoran.
+    import pandas as pd
+
+    texto = texto.strip()
+    if not texto:
+        return np.array([], dtype=np.float64), np.array([], dtype=np.int64)
+    tabla = pd.read_csv(io.StringIO(texto.replace(',', '\n')), header=None,
+                        skip_blank_lines=False, skipinitialspace=True, engine='c')
+    columna = tabla.iloc[:, 0]
+
+    if pd.api.types.is_numeric_dtype(columna.dtype):
+        numericos = columna.to_numpy(dtype=np.float64)
+        invalidos = np.array([], dtype=np.int64)
+    else:
+        # Algún token no es numérico: solo en ese caso se paga la conversión
+        numericos = pd.to_numeric(
+            columna, errors='coerce').to_numpy(dtype=np.float64)
+        invalidos = np.flatnonzero(np.isnan(numericos) & columna.notna().to_numpy())
+
+    return tipo_compacto(numericos[~np.isnan(numericos)], permitir_float32), invalidos
+
+
+def leer_tabla(archivo, nombre=None):
+    # CSV, Parquet o NPY desde una ruta o un archivo abierto (p. ej. el de
+    # st.file_uploader). Las rutas .npy se abren con memory-map.
+    import pandas as pd
+
+    if nombre is None:
+        nombre = getattr(archivo, 'name', None) or os.fspath(archivo)
+    extension = os.path.splitext(nombre)[1].lower()
+
+    if extension == '.npy':
+        if isinstance(archivo, (str, os.PathLike)):
+            datos = np.load(archivo, mmap_mode='r')
+        else:
+            datos = np.load(archivo, allow_pickle=False)
+        if datos.ndim == 1:
+            return pd.DataFrame({'valor': datos}, copy=False)
+        return pd.DataFrame(datos.reshape(len(datos), -1), copy=False,
+                            columns=[f'columna_{i}' for i in range(int(np.prod(datos.shape[1:])))])
+    if extension == '.parquet':
+        importar_parquet()
+        return pd.read_parquet(archivo)
+    if extension in ('.csv', '.txt'):
+        try:
+            import pyarrow  # noqa: F401
+            motor = 'pyarrow'
+        except ImportError:
+            motor = 'c'
+        return pd.read_csv(archivo, engine=motor)
+    raise ValueError(f"Formato no soportado: {extension or nombre!r}")
+
+
+def extraer_columna(tabla, columna, permitir_float32=False):
+    # Devuelve (valores, filas inválidas base 0): vacíos y no numéricos
+    import pandas as pd
+
+    serie = tabla[columna]
+    if pd.api.types.is_numeric_dtype(serie.dtype) or pd.api.types.is_bool_dtype(serie.dtype):
+        valores = serie.to_numpy()
+        if np.issubdtype(valores.dtype, np.floating):
+            invalidos = np.flatnonzero(np.isnan(valores))
+            valores = valores[~np.isnan(valores)]
+        else:
+            invalidos = np.array([], dtype=np.int64)
+    else:
+        numericos = pd.to_numeric(
+            serie, errors='coerce').to_numpy(dtype=np.float64)
+        invalidos = np.flatnonzero(np.isnan(numericos))
+        valores = numericos[~np.isnan(numericos)]
+    return tipo_compacto(valores, permitir_float32), invalidos
@@ -0,0 +1,100 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Instrumentación por fases
+#
+#   with fase('remuestreo', n=len(datos)) as registro:
+#       ...
+#       registro['n_bootstrap'] = n_replicas
+#
+# Una fase solo mide si el hilo actual está dentro de `medicion()` (que junta
+# los registros, p. ej. para el panel de la app) o si el registro en logs está
+# activo (activar_registro() o BOOTSTRAP_MET_INSTRUMENTACION=1). Si no, fase()
+# devuelve un objeto nulo compartido: el costo es una llamada y una consulta.
+
+logger = logging.getLogger('bootstrap_met')
+
+REGISTRO_ACTIVO = os.environ.get('BOOTSTRAP_MET_INSTRUMENTACION', '') not in ('', '0')
+
+ESTADO = threading.local()
+
+
+class FaseNula:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        return False
+
+    def __setitem__(self, clave, valor):
+        pass
+
+
+FASE_NULA = FaseNula()
+
+
+class Fase:
+    __slots__ = ('registro', 'registros', 'inicio')
+
+    def __init__(self, nombre, registros, campos):
+        self.registro = {'fase': nombre, **campos}
+        self.registros = registros
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, *excepcion):
+        self.registro['segundos'] = time.perf_counter() - self.inicio
+        if tipo is not None:
+            self.registro['error'] = tipo.__name__
+        if self.registros is not None:
+            self.registros.append(self.registro)
+        if REGISTRO_ACTIVO:
+            logger.info(json.dumps({'evento': 'fase', **self.registro}, default=str),
+                        extra={'registro_fase': self.registro})
+        return False
+
+    def __setitem__(self, clave, valor):
+        self.registro[clave] = valor
+
+
+def fase(nombre, **campos):
+    registros = getattr(ESTADO, 'registros', None)
+    if registros is None and not REGISTRO_ACTIVO:
+        return FASE_NULA
+    return Fase(nombre, registros, campos)
+
+
+@contextmanager
+def medicion(activa=True):
+    # Junta en una lista los registros de las fases de este hilo
+    registros = []
+    if not activa:
+        yield registros
+        return
+    anteriores = getattr(ESTADO, 'registros', None)
+    ESTADO.registros = registros
+    try:
+        yield registros
+    finally:
+        ESTADO.registros = anteriores
+
+
+def agregar_registros(registros):
+    # Suma a la medición en curso registros tomados en otro hilo (p. ej. los
+    # de un trabajo en segundo plano)
+    actuales = getattr(ESTADO, 'registros', None)
+    if actuales is not None:
+        actuales.extend(registros)
+
+
+def activar_registro(activo=True):
+    global REGISTRO_ACTIVO
+    REGISTRO_ACTIVO = activo
@@ -0,0 +1,582 @@
+import os
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+from .bloques import ESQUEMAS_BLOQUES, indices_bloques, resolver_longitud
+from .estadisticos import estadistico_orden_conteos, resolver_estadisticos
+from .instrumentacion import fase
+
+# Motor de remuestreo vectorizado
+
+# Presupuesto de memoria (en bytes) para cada bloque de réplicas
+MEMORIA_MAXIMA_BLOQUE = 256 * 1024 * 1024
+
+# Con pocos valores distintos se remuestrean conteos en lugar de filas
+MAXIMO_VALORES_UNICOS = 1024
+
+# Esquemas de remuestreo: filas independientes, pesos de Dirichlet
+# (bootstrap bayesiano) o bloques de la serie (ver bloques.py)
+ESQUEMAS = ('iid', 'bayesiano', *ESQUEMAS_BLOQUES)
+
+# Comparaciones entre dos muestras: estadístico de la primera frente al de
+# la segunda
+COMPARACIONES = {'diferencia': np.subtract, 'razon': np.divide}
+
+# Réplicas máximas por bloque: el progreso y la cancelación se revisan entre
+# bloques, así que incluso con muestras pequeñas hay varios por ejecución
+REPLICAS_MAXIMAS_BLOQUE = 16384
+
+
+def calcular_tamano_bloque(n, n_bootstrap, memoria_maxima=MEMORIA_MAXIMA_BLOQUE, bytes_por_valor=8):
+    # Por réplica: n índices int64, la muestra remuestreada y ~2 temporales
+    # que crean los estadísticos (copias para ordenar, diferencias, etc.)
+    bytes_por_replica = max(n, 1) * (8 + 3 * bytes_por_valor)
+    tamano = memoria_maxima // bytes_por_replica
+    return int(min(max(tamano, 1), max(n_bootstrap, 1)))
+
+
+def validar_esquema(esquema):
+    if esquema not in ESQUEMAS:
+        raise ValueError(f"Esquema desconocido: {esquema!r} (usa {', '.join(map(repr, ESQUEMAS))})")
+    return esquema
+
+
+def validar_comparacion(comparacion):
+    if comparacion not in COMPARACIONES:
+        raise ValueError(
+            f"Comparación desconocida: {comparacion!r} (usa {', '.join(map(repr, COMPARACIONES))})")
+    return comparacion
+
+
+def comprimir_datos(datos):
+    # (valores únicos ordenados, frecuencias)
+    return np.unique(np.asarray(datos), return_counts=True)
+
+
+def preparar_datos(datos, especificaciones, compresion='auto', esquema='iid', longitud_bloque=None):
+    # Elige entre remuestrear filas ('indices') o conteos por valor único
+    # ('conteos'). Los datos comprimidos llegan como tupla (valores, conteos).
+    # Los esquemas por bloques ('bloques') necesitan la serie en su orden.
+    if esquema == 'bayesiano':
+        return preparar_bayesiano(datos, especificaciones, compresion)
+    if esquema != 'iid':
+        return preparar_serie(datos, especificaciones, esquema, longitud_bloque)
+    admite_conteos = all('conteos' in especificacion or 'orden' in especificacion
+                         for especificacion in especificaciones.values())
+
+    if isinstance(datos, tuple):
+        valores, conteos = np.asarray(datos[0]), np.asarray(datos[1])
+        if admite_conteos and compresion is not False:
+            return {'modo': 'conteos', 'valores': valores, 'conteos': conteos, 'n': int(conteos.sum())}
+        datos = np.repeat(valores, conteos)
+
+    datos = np.asarray(datos)
+    if admite_conteos and compresion is not False and len(datos) > 0:
+        if compresion is True:
+            valores, conteos = comprimir_datos(datos)
+            return {'modo': 'conteos', 'valores': valores, 'conteos': conteos, 'n': len(datos)}
+        if compresion == 'auto':
+            valores, conteos = comprimir_datos(datos)
+            if len(valores) <= MAXIMO_VALORES_UNICOS and 2 * len(valores) <= len(datos):
+                return {'modo': 'conteos', 'valores': valores, 'conteos': conteos, 'n': len(datos)}
+
+    # Los estadísticos de orden trabajan sobre los datos ordenados una sola vez:
+    # remuestrear índices de la muestra ordenada tiene la misma distribución
+    if any('orden' in especificacion for especificacion in especificaciones.values()):
+        datos = np.sort(datos)
+    return {'modo': 'indices', 'datos': datos, 'n': len(datos)}
+
+
+def preparar_bayesiano(datos, especificaciones, compresion):
+    # Pesos de Dirichlet(1, ..., 1) por fila. Sin estadísticos de orden los
+    # datos se pueden comprimir: el peso de un valor que aparece c veces es
+    # la suma de c pesos, que es exactamente Dirichlet(conteos).
+    sin_pesos = [nombre for nombre, especificacion in especificaciones.items()
+                 if 'ponderado' not in especificacion]
+    if sin_pesos:
+        raise ValueError(f"Sin versión ponderada para el bootstrap bayesiano: {', '.join(sin_pesos)}")
+    hay_orden = any('orden' in especificacion for especificacion in especificaciones.values())
+
+    if isinstance(datos, tuple):
+        valores, conteos = np.asarray(datos[0]), np.asarray(datos[1])
+        if not hay_orden and compresion is not False:
+            return {'modo': 'bayesiano', 'valores': valores, 'conteos': conteos, 'n': int(conteos.sum())}
+        datos = np.repeat(valores, conteos)
+
+    datos = np.asarray(datos)
+    if not hay_orden and compresion is not False and len(datos) > 0:
+        valores, conteos = comprimir_datos(datos)
+        if compresion is True or (len(valores) <= MAXIMO_VALORES_UNICOS and 2 * len(valores) <= len(datos)):
+            return {'modo': 'bayesiano', 'valores': valores, 'conteos': conteos, 'n': len(datos)}
+
+    # Los pesos son intercambiables: se generan directamente en el orden de
+    # los datos ordenados, sin permutarlos
+    if hay_orden:
+        datos = np.sort(datos)
+    return {'modo': 'bayesiano', 'valores': datos, 'conteos': None, 'n': len(datos)}
+
+
+def pesos_dirichlet(generador, conteos, k, tamano):
+    # Gammas normalizadas por fila (exponenciales si cada valor cuenta uno)
+    if conteos is None:
+        pesos = generador.standard_exponential((tamano, k))
+    else:
+        pesos = generador.standard_gamma(conteos, size=(tamano, k))
+    pesos /= pesos.sum(axis=1, keepdims=True)
+    return pesos
+
+
+def preparar_serie(datos, especificaciones, esquema, longitud_bloque):
+    if isinstance(datos, tuple):
+        raise ValueError("Los esquemas por bloques necesitan la serie en orden, no datos comprimidos")
+    datos = np.asarray(datos)
+    preparados = {'modo': 'bloques', 'datos': datos, 'rangos': None, 'n': len(datos), 'esquema': esquema,
+                  'longitud': resolver_longitud(datos, esquema, longitud_bloque)}
+    # Con estadísticos de orden se remuestrea igual sobre la serie, pero los
+    # índices se traducen a rangos: los datos quedan ordenados una sola vez
+    # y los núcleos de orden funcionan sin cambios
+    if any('orden' in especificacion for especificacion in especificaciones.values()):
+        permutacion = np.argsort(datos, kind='stable')
+        rangos = np.empty(len(datos), dtype=np.int32 if len(datos) <= np.iinfo(np.int32).max else np.int64)
+        rangos[permutacion] = np.arange(len(datos))
+        preparados['datos'] = datos[permutacion]
+        preparados['rangos'] = rangos
+    return preparados
+
+
+def preparar_comparacion(muestras, especificaciones, comparacion, compresion='auto', esquema='iid',
+                         longitud_bloque=None):
+    # Dos muestras independientes: cada una se prepara por su lado (con su
+    # propia compresión u orden) y las dos se remuestrean en el mismo bloque.
+    # Con esquema 'permutacion' se reparten al azar los datos combinados
+    # entre los dos tamaños: la distribución bajo igualdad de poblaciones.
+    validar_comparacion(comparacion)
+    if len(muestras) != 2:
+        raise ValueError(f"Se necesitan dos muestras, no {len(muestras)}")
+    muestras = [np.asarray(muestra) for muestra in muestras]
+    if any(len(muestra) == 0 for muestra in muestras):
+        raise ValueError("Las dos muestras deben tener datos")
+    if esquema == 'permutacion':
+        conjunta = preparar_datos(np.concatenate(muestras), especificaciones, compresion)
+        return {'modo': 'permutacion', 'comparacion': comparacion, 'conjunta': conjunta,
+                'n_a': len(muestras[0]), 'n': conjunta['n']}
+    preparadas = tuple(preparar_datos(muestra, especificaciones, compresion, validar_esquema(esquema),
+                                      longitud_bloque) for muestra in muestras)
+    return {'modo': 'comparacion', 'comparacion': comparacion, 'muestras': preparadas,
+            'n': sum(preparada['n'] for preparada in preparadas)}
+
+
+def remuestrear_conteos(generador, conteos, n, tamano):
+    # Conteos multinomiales por réplica; con dos valores basta una binomial
+    k = len(conteos)
+    if k == 1:
+        return np.full((tamano, 1), n)
+    if k == 2:
+        segundos = generador.binomial(n, conteos[1] / n, size=tamano)
+        return np.column_stack([n - segundos, segundos])
+    return generador.multinomial(n, conteos / n, size=tamano)
+
+
+def dividir_bloques(n_bootstrap, tamano_bloque):
+    return [(inicio, min(inicio + tamano_bloque, n_bootstrap))
+            for inicio in range(0, n_bootstrap, tamano_bloque)]
+
+
+def comparar_bloques(comparacion, bloque_a, bloque_b):
+    # Una razón con denominador cero da inf/nan en esa réplica, sin avisos
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return {nombre: COMPARACIONES[comparacion](bloque_a[nombre], bloque_b[nombre])
+                for nombre in bloque_a}
+
+
+def evaluar_permutaciones(especificaciones, preparados, generador, tamano):
+    # Estadísticos de las dos partes de `tamano` repartos al azar de los
+    # datos combinados: los primeros n_a forman la primera muestra
+    conjunta = preparados['conjunta']
+    n, n_a = conjunta['n'], preparados['n_a']
+    if conjunta['modo'] == 'conteos':
+        # Repartir sin reemplazo: los conteos de la primera parte son
+        # hipergeométricos multivariados y la segunda se lleva el resto
+        conteos_a = generador.multivariate_hypergeometric(conjunta['conteos'], n_a, size=tamano)
+        return (evaluar_bloque_conteos(especificaciones, conjunta['valores'], conteos_a, n_a),
+                evaluar_bloque_conteos(especificaciones, conjunta['valores'],
+                                       conjunta['conteos'] - conteos_a, n - n_a))
+    # Solo importa qué índices van a cada parte: los n_a con las claves
+    # uniformes más pequeñas forman la primera. argpartition es lineal en n y
+    # unas tres veces más rápido que barajar cada fila. Con datos ordenados
+    # los índices de cada parte siguen sirviendo para los núcleos de orden.
+    repartos = np.argpartition(generador.random((tamano, n)), n_a - 1, axis=1)
+    return (evaluar_bloque_indices(especificaciones, conjunta['datos'], repartos[:, :n_a], n_a),
+            evaluar_bloque_indices(especificaciones, conjunta['datos'], repartos[:, n_a:], n - n_a))
+
+
+def evaluar_bloque(especificaciones, preparados, generador, tamano):
+    # Réplicas de un bloque según el modo de `preparados`
+    n = preparados['n']
+    if preparados['modo'] == 'comparacion':
+        muestra_a, muestra_b = preparados['muestras']
+        return comparar_bloques(preparados['comparacion'],
+                                evaluar_bloque(especificaciones, muestra_a, generador, tamano),
+                                evaluar_bloque(especificaciones, muestra_b, generador, tamano))
+    if preparados['modo'] == 'permutacion':
+        return comparar_bloques(preparados['comparacion'],
+                                *evaluar_permutaciones(especificaciones, preparados, generador, tamano))
+    if preparados['modo'] == 'conteos':
+        conteos = remuestrear_conteos(generador, preparados['conteos'], n, tamano)
+        return evaluar_bloque_conteos(especificaciones, preparados['valores'], conteos, n)
+    if preparados['modo'] == 'bayesiano':
+        pesos = pesos_dirichlet(generador, preparados['conteos'], len(preparados['valores']), tamano)
+        return {nombre: especificacion['ponderado'](preparados['valores'], pesos, n)
+                for nombre, especificacion in especificaciones.items()}
+    if preparados['modo'] == 'bloques':
+        indices = indices_bloques(generador, n, tamano, preparados['esquema'], preparados['longitud'])
+        if preparados['rangos'] is not None:
+            indices = preparados['rangos'][indices]
+        return evaluar_bloque_indices(especificaciones, preparados['datos'], indices, n)
+    tipo_indice = np.int32 if n <= np.iinfo(np.int32).max else np.int64
+    indices = generador.integers(0, n, size=(tamano, n), dtype=tipo_indice)
+    return evaluar_bloque_indices(especificaciones, preparados['datos'], indices, n)
+
+
+def tamano_bloque_preparados(preparados, n_bootstrap, memoria_maxima):
+    if preparados['modo'] == 'comparacion':
+        # Las dos muestras se reparten el presupuesto
+        return min(tamano_bloque_preparados(muestra, n_bootstrap, memoria_maxima // 2)
+                   for muestra in preparados['muestras'])
+    if preparados['modo'] == 'permutacion':
+        # Una fila de índices (o de conteos) por permutación, como el remuestreo
+        return tamano_bloque_preparados(preparados['conjunta'], n_bootstrap, memoria_maxima)
+    if preparados['modo'] in ('conteos', 'bayesiano'):
+        # Bayesiano: pesos, pesos acumulados y un temporal por valor
+        return calcular_tamano_bloque(len(preparados['valores']), n_bootstrap, memoria_maxima)
+    if preparados['modo'] == 'bloques':
+        # Generar los índices por bloques usa unos dos arreglos más por réplica
+        return calcular_tamano_bloque(preparados['n'], n_bootstrap, memoria_maxima // 2,
+                                      preparados['datos'].itemsize)
+    return calcular_tamano_bloque(preparados['n'], n_bootstrap, memoria_maxima, preparados['datos'].itemsize)
+
+
+def procesar_bloques(estadisticos, preparados, bloques, semillas, progreso=None):
+    # Unidad de trabajo de los hilos/procesos. Cada bloque tiene su propio
+    # generador, así que el resultado no depende de qué trabajador lo ejecute.
+    # `progreso` (solo sin paralelismo) recibe cada bloque terminado.
+    especificaciones = resolver_estadisticos(estadisticos)
+    resultados = []
+    for (inicio, fin), semilla in zip(bloques, semillas):
+        bloque = evaluar_bloque(especificaciones, preparados, np.random.default_rng(semilla), fin - inicio)
+        resultados.append(bloque)
+        if progreso is not None:
+            progreso(bloque)
+    return resultados
+
+
+# Pools compartidos por (tipo, trabajadores) entre llamadas: crear hilos o
+# procesos en cada bootstrap cuesta más que muchos cálculos chicos. La clave
+# incluye el PID: un proceso hijo no reutiliza los pools heredados del padre.
+EJECUTORES = {}
+_CANDADO_EJECUTORES = threading.Lock()
+
+# Nombre de los hilos de los pools compartidos
+PREFIJO_HILOS = 'bootstrap_met_bloques'
+
+
+def obtener_ejecutor(ejecutor, n_trabajadores):
+    # Importación diferida: sin paralelismo no se paga concurrent.futures
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+    if ejecutor not in ('hilos', 'procesos'):
+        raise ValueError(f"Ejecutor desconocido: {ejecutor!r} (usa 'hilos' o 'procesos')")
+    clave = (ejecutor, n_trabajadores, os.getpid())
+    with _CANDADO_EJECUTORES:
+        if clave not in EJECUTORES:
+            if ejecutor == 'procesos':
+                EJECUTORES[clave] = ProcessPoolExecutor(max_workers=n_trabajadores)
+            else:
+                EJECUTORES[clave] = ThreadPoolExecutor(max_workers=n_trabajadores,
+                                                       thread_name_prefix=PREFIJO_HILOS)
+        return EJECUTORES[clave]
+
+
+@contextmanager
+def usar_ejecutor(ejecutor, n_trabajadores):
+    # `ejecutor` es 'hilos', 'procesos' o un Executor del llamador (que
+    # también se reutiliza y no se cierra aquí)
+    from concurrent.futures import BrokenExecutor, Executor, ThreadPoolExecutor
+
+    if isinstance(ejecutor, Executor):
+        yield ejecutor
+        return
+    if ejecutor == 'hilos' and threading.current_thread().name.startswith(PREFIJO_HILOS):
+        # Desde un hilo de un pool compartido: esperar a ese mismo pool
+        # podría bloquearlo, así que se usa uno propio
+        with ThreadPoolExecutor(max_workers=n_trabajadores) as propio:
+            yield propio
+        return
+    compartido = obtener_ejecutor(ejecutor, n_trabajadores)
+    try:
+        yield compartido
+    except BrokenExecutor:
+        # Murió un proceso: el pool ya no sirve y el próximo pedido crea otro
+        with _CANDADO_EJECUTORES:
+            EJECUTORES.pop((ejecutor, n_trabajadores, os.getpid()), None)
+        raise
+
+
+def cerrar_ejecutores(esperar=True):
+    with _CANDADO_EJECUTORES:
+        ejecutores = list(EJECUTORES.values())
+        EJECUTORES.clear()
+    for ejecutor in ejecutores:
+        ejecutor.shutdown(wait=esperar, cancel_futures=True)
+
+
+def remuestrear_estadisticos(datos, estadisticos, n_bootstrap=1000, memoria_maxima=MEMORIA_MAXIMA_BLOQUE,
+                             compresion='auto', semilla=None, n_trabajadores=1, ejecutor='hilos',
+                             progreso=None, esquema='iid', longitud_bloque=None, comparacion=None):
+    # `estadisticos` es una lista de nombres del registro (o un dict
+    # nombre -> función) y todos se evalúan sobre el mismo bloque de remuestras.
+    #
+    # Las réplicas se reparten en bloques de tamaño fijo (según
+    # `memoria_maxima`, que se aplica por trabajador) y cada bloque recibe un
+    # hijo de SeedSequence(semilla): con la misma semilla se obtienen las mismas
+    # réplicas con 1 o con 32 trabajadores. Con 'procesos' los estadísticos
+    # deben poder serializarse (nombres del registro o funciones de módulo).
+    # Los pools de 'hilos' y 'procesos' se comparten entre llamadas; también
+    # se puede pasar un Executor propio.
+    #
+    # `progreso(bloque)` se llama en el hilo que invoca con el dict
+    # nombre -> réplicas de cada bloque terminado; si lanza una excepción
+    # (p. ej. para cancelar) los bloques pendientes se descartan.
+    #
+    # `esquema` elige entre remuestreo de filas independientes ('iid'), el
+    # bootstrap bayesiano y los esquemas por bloques de bloques.py;
+    # `longitud_bloque` None o 'auto' la elige con Politis-White.
+    #
+    # Con `comparacion` ('diferencia' o 'razon') `datos` son dos muestras y
+    # las réplicas comparan el estadístico de ambas (ver preparar_comparacion;
+    # ahí `esquema` admite además 'permutacion').
+    preparados = preparar_remuestreo(datos, estadisticos, compresion, esquema, longitud_bloque, comparacion)
+    return remuestrear_preparados(preparados, estadisticos, n_bootstrap, memoria_maxima, semilla,
+                                  n_trabajadores, ejecutor, progreso)
+
+
+def preparar_remuestreo(datos, estadisticos, compresion='auto', esquema='iid', longitud_bloque=None,
+                        comparacion=None):
+    # Compresión, orden y demás preparación de los datos: se hace una vez
+    # aunque se remuestree en varias tandas (modo adaptativo)
+    especificaciones = resolver_estadisticos(estadisticos)
+    if comparacion is None:
+        return preparar_datos(datos, especificaciones, compresion, validar_esquema(esquema), longitud_bloque)
+    return preparar_comparacion(datos, especificaciones, comparacion, compresion, esquema, longitud_bloque)
+
+
+def remuestrear_preparados(preparados, estadisticos, n_bootstrap, memoria_maxima=MEMORIA_MAXIMA_BLOQUE,
+                           semilla=None, n_trabajadores=1, ejecutor='hilos', progreso=None):
+    # Réplicas de datos ya preparados, por bloques y en paralelo (ver
+    # remuestrear_estadisticos)
+    especificaciones = resolver_estadisticos(estadisticos)
+    tamano_bloque = min(tamano_bloque_preparados(preparados, n_bootstrap, memoria_maxima),
+                        REPLICAS_MAXIMAS_BLOQUE)
+
+    bloques = dividir_bloques(n_bootstrap, tamano_bloque)
+    if not isinstance(semilla, np.random.SeedSequence):
+        semilla = np.random.SeedSequence(semilla)
+    semillas = semilla.spawn(len(bloques))
+
+    n_trabajadores = max(1, min(int(n_trabajadores), len(bloques)))
+    if n_trabajadores == 1:
+        resultados = procesar_bloques(estadisticos, preparados, bloques, semillas, progreso)
+    else:
+        # Un lote contiguo de bloques por trabajador: los datos se envían una
+        # sola vez a cada uno. Con `progreso` cada bloque se envía por separado
+        # para informar y poder cancelar bloque a bloque (el resultado no
+        # cambia: cada bloque tiene su semilla).
+        n_lotes = n_trabajadores if progreso is None else len(bloques)
+        lotes = np.array_split(np.arange(len(bloques)), n_lotes)
+        with usar_ejecutor(ejecutor, n_trabajadores) as ejecutor_bloques:
+            futuros = [ejecutor_bloques.submit(procesar_bloques, estadisticos, preparados,
+                                               [bloques[i] for i in lote], [semillas[i] for i in lote])
+                       for lote in lotes]
+            if progreso is not None:
+                from concurrent.futures import as_completed
+
+                try:
+                    for futuro in as_completed(futuros):
+                        for bloque in futuro.result():
+                            progreso(bloque)
+                except BaseException:
+                    for futuro in futuros:
+                        futuro.cancel()
+                    raise
+            resultados = [bloque for futuro in futuros for bloque in futuro.result()]
+
+    replicas = {nombre: np.empty(n_bootstrap) for nombre in especificaciones}
+    for (inicio, fin), bloque in zip(bloques, resultados):
+        for nombre in especificaciones:
+            replicas[nombre][inicio:fin] = bloque[nombre]
+
+    return replicas
+
+
+def evaluar_bloque_conteos(especificaciones, valores, conteos, n):
+    acumulados = None
+    resultados = {}
+    for nombre, especificacion in especificaciones.items():
+        if 'conteos' in especificacion:
+            resultados[nombre] = especificacion['conteos'](valores, conteos, n)
+            continue
+        # Estadísticos de orden: recorrer los conteos acumulados
+        if acumulados is None:
+            acumulados = np.cumsum(conteos, axis=1)
+        posiciones, combinar = especificacion['orden'](n)
+        resultados[nombre] = combinar(
+            *[estadistico_orden_conteos(valores, acumulados, posicion) for posicion in posiciones])
+    return resultados
+
+
+def evaluar_bloque_indices(especificaciones, datos, indices, n):
+    # `datos` llega ordenado si hay estadísticos de orden: una sola partición
+    # de la matriz de índices deja en su sitio todas las posiciones pedidas
+    # y el valor j-ésimo de cada réplica es datos[particion[:, j]].
+    ordenes = {nombre: especificacion['orden'](n)
+               for nombre, especificacion in especificaciones.items() if 'orden' in especificacion}
+    particion = None
+    if ordenes:
+        posiciones = sorted({posicion for posiciones_estadistico, _ in ordenes.values()
+                             for posicion in posiciones_estadistico})
+        particion = np.partition(indices, posiciones, axis=1)
+
+    muestras = None
+    resultados = {}
+    for nombre, especificacion in especificaciones.items():
+        if nombre in ordenes:
+            posiciones_estadistico, combinar = ordenes[nombre]
+            resultados[nombre] = combinar(
+                *[datos[particion[:, posicion]] for posicion in posiciones_estadistico])
+            continue
+        if muestras is None:
+            muestras = datos[indices]
+        resultados[nombre] = especificacion['funcion'](muestras, axis=1)
+    return resultados
+
+
+def evaluar_estadistico(datos, especificacion):
+    # Valor del estadístico sobre la muestra original (cruda o comprimida)
+    if isinstance(datos, tuple):
+        valores, conteos = np.asarray(datos[0]), np.asarray(datos[1])
+        if 'conteos' in especificacion or 'orden' in especificacion:
+            return evaluar_bloque_conteos({'valor': especificacion}, valores, conteos[np.newaxis, :],
+                                          int(conteos.sum()))['valor'][0]
+        datos = np.repeat(valores, conteos)
+    return especificacion['funcion'](np.asarray(datos), axis=0)
+
+
+# Número de réplicas adaptativo
+
+# Metas por defecto, relativas al error estándar bootstrap: error Monte Carlo
+# del propio error estándar y de los extremos del IC 95%
+PRECISION_ERROR_ESTANDAR = 0.025
+PRECISION_IC = 0.1
+
+
+def error_monte_carlo(replicas, cuantiles=(0.025, 0.975)):
+    # Error Monte Carlo del error estándar (vía curtosis de las réplicas) y
+    # de los cuantiles del IC (varianza asintótica q(1-q)/B dividida por la
+    # densidad, estimada con diferencias entre cuantiles vecinos)
+    n_replicas = len(replicas)
+    error_estandar = np.std(replicas)
+    if error_estandar == 0 or n_replicas < 2:
+        return 0.0, np.zeros(len(cuantiles))
+
+    desvios = replicas - np.mean(replicas)
+    curtosis = np.mean(desvios ** 4) / error_estandar ** 4
+    error_mc_error_estandar = error_estandar * \
+        np.sqrt(max(curtosis - 1, 0) / (4 * n_replicas))
+
+    errores_ic = []
+    for q in cuantiles:
+        h = min(q, 1 - q) / 2
+        bajo, alto = np.quantile(replicas, [q - h, q + h])
+        if alto == bajo:
+            errores_ic.append(0.0)
+            continue
+        densidad = 2 * h / (alto - bajo)
+        errores_ic.append(np.sqrt(q * (1 - q) / n_replicas) / densidad)
+    return error_mc_error_estandar, np.array(errores_ic)
+
+
+def remuestrear_adaptativo(datos, estadisticos, n_maximo=100000, tamano_lote=500,
+                           precision_error_estandar=PRECISION_ERROR_ESTANDAR,
+                           precision_ic=PRECISION_IC, semilla=None, memoria_maxima=MEMORIA_MAXIMA_BLOQUE,
+                           n_trabajadores=1, ejecutor='hilos', progreso=None, **opciones):
+    # Añade tandas de réplicas hasta que, para todos los estadísticos, el error
+    # Monte Carlo del error estándar y de los extremos del IC 95% queda por
+    # debajo de la fracción pedida del error estándar (o se llega a n_maximo).
+    # Los datos se preparan una sola vez; la primera tanda es de `tamano_lote`
+    # réplicas y cada una siguiente duplica el total, así que hay pocas
+    # revisiones y las tandas grandes se reparten entre los trabajadores.
+    especificaciones = resolver_estadisticos(estadisticos)
+    if not isinstance(semilla, np.random.SeedSequence):
+        semilla = np.random.SeedSequence(semilla)
+    preparados = preparar_remuestreo(datos, estadisticos, **opciones)
+
+    lotes = {nombre: [] for nombre in especificaciones}
+    n_replicas = 0
+    convergio = False
+    while n_replicas < n_maximo:
+        tamano = min(max(tamano_lote, n_replicas), n_maximo - n_replicas)
+        replicas_lote = remuestrear_preparados(preparados, estadisticos, tamano, memoria_maxima,
+                                               semilla.spawn(1)[0], n_trabajadores, ejecutor, progreso)
+        for nombre in especificaciones:
+            lotes[nombre].append(replicas_lote[nombre])
+        n_replicas += tamano
+
+        replicas = {nombre: np.concatenate(lotes[nombre]) for nombre in especificaciones}
+        # Las réplicas no finitas (una razón con denominador cero) se
+        # descartan al armar el resultado: tampoco cuentan para la precisión
+        finitas = {nombre: valores[np.isfinite(valores)] for nombre, valores in replicas.items()}
+        errores = {nombre: error_monte_carlo(finitas[nombre]) for nombre in especificaciones}
+        convergio = all(
+            error_ee <= precision_error_estandar * np.std(finitas[nombre])
+            and np.all(errores_ic <= precision_ic * np.std(finitas[nombre]))
+            for nombre, (error_ee, errores_ic) in errores.items())
+        if convergio:
+            break
+
+    diagnostico = {
+        'n_bootstrap': n_replicas,
+        'convergio': convergio,
+        'error_mc_error_estandar': {nombre: error_ee for nombre, (error_ee, _) in errores.items()},
+        'error_mc_ic_95': {nombre: errores_ic for nombre, (_, errores_ic) in errores.items()}
+    }
+    return replicas, diagnostico
+
+
+def ejecutar_remuestreo(datos, estadisticos, n_bootstrap=1000, **opciones):
+    # n_bootstrap='auto' elige el número de réplicas; el diagnóstico se añade
+    # al resultado de cada estimador
+    # (los estadísticos se evalúan dentro de cada bloque: la fase incluye ambos).
+    # Con un esquema por bloques la longitud se elige una sola vez (también
+    # en el modo adaptativo) y se informa en el diagnóstico.
+    if opciones.get('comparacion') is not None:
+        n = sum(len(muestra) for muestra in datos)
+    else:
+        n = int(np.sum(datos[1])) if isinstance(datos, tuple) else len(datos)
+    with fase('remuestreo', n=n) as registro:
+        remuestreo = {}
+        esquema = validar_esquema(opciones.get('esquema', 'iid'))
+        if esquema in ESQUEMAS_BLOQUES and not isinstance(datos, tuple):
+            opciones['longitud_bloque'] = resolver_longitud(
+                datos, esquema, opciones.get('longitud_bloque'))
+            remuestreo = {'esquema': esquema, 'longitud_bloque': opciones['longitud_bloque']}
+            registro['longitud_bloque'] = opciones['longitud_bloque']
+        elif esquema != 'iid':
+            remuestreo = {'esquema': esquema}
+        if n_bootstrap == 'auto':
+            replicas, diagnostico = remuestrear_adaptativo(datos, estadisticos, **opciones)
+            registro['n_bootstrap'] = diagnostico['n_bootstrap']
+            return replicas, {**diagnostico, **remuestreo}
+        registro['n_bootstrap'] = n_bootstrap
+        return remuestrear_estadisticos(datos, estadisticos, n_bootstrap, **opciones), remuestreo
@@ -0,0 +1,127 @@
+import numpy as np
+
+from .instrumentacion import fase
+
+# Resultados
+
+# Cómo se guardan las réplicas: 'completo' (float64), 'float32' o 'resumen'
+# (solo histograma de BINS_RESUMEN barras y CUANTILES_RESUMEN)
+ALMACENAMIENTO_REPLICAS = 'completo'
+BINS_RESUMEN = 100
+CUANTILES_RESUMEN = (0.5, 1, 2.5, 5, 10, 25, 50, 75, 90, 95, 97.5, 99, 99.5)
+
+# Nombres históricos de cada estimador -> atributo genérico del resultado
+CLAVES_RESULTADO = {
+    'media': {'media_original': 'valor_original', 'medias_bootstrap': 'replicas',
+              'media_bootstrap_promedio': 'promedio', 'error_estandar': 'error_estandar'},
+    'mediana': {'mediana_original': 'valor_original', 'medianas_bootstrap': 'replicas',
+                'mediana_bootstrap_promedio': 'promedio', 'error_estandar_mediana': 'error_estandar'},
+    'desviacion': {'desviacion_original': 'valor_original', 'desviaciones_bootstrap': 'replicas',
+                   'desviacion_bootstrap_promedio': 'promedio',
+                   'error_estandar_desviacion': 'error_estandar'},
+    'proporcion': {'proporcion_original': 'valor_original', 'proporciones_bootstrap': 'replicas',
+                   'proporcion_bootstrap_promedio': 'promedio',
+                   'error_estandar_proporcion': 'error_estandar'},
+    'percentil': {'percentil_original': 'valor_original', 'percentiles_bootstrap': 'replicas',
+                  'percentil_bootstrap_promedio': 'promedio',
+                  'error_estandar_percentil': 'error_estandar'},
+    None: {}
+}
+
+
+class ResultadoBootstrap:
+    # Resultado compacto: referencia los datos de entrada (no los copia) y
+    # guarda las réplicas según `almacenamiento`. Se lee igual que los dict
+    # anteriores (resultado['media_original']) o por atributo
+    # (resultado.media_original, resultado.valor_original).
+    __slots__ = ('tipo', 'datos_originales', 'valor_original', 'replicas', 'promedio',
+                 'error_estandar', 'intervalos', 'histograma', 'resumen_cuantiles', 'extras')
+
+    def __init__(self, tipo, datos_originales, valor_original, replicas, promedio, error_estandar,
+                 intervalos=None, histograma=None, resumen_cuantiles=None, extras=None):
+        self.tipo = tipo
+        self.datos_originales = datos_originales
+        self.valor_original = valor_original
+        self.replicas = replicas
+        self.promedio = promedio
+        self.error_estandar = error_estandar
+        self.intervalos = intervalos or {}
+        self.histograma = histograma
+        self.resumen_cuantiles = resumen_cuantiles
+        self.extras = extras or {}
+
+    @classmethod
+    def desde_replicas(cls, tipo, datos_originales, valor_original, replicas, intervalos=None,
+                       extras=None, almacenamiento=None):
+        # Los resúmenes se calculan con las réplicas completas en float64
+        almacenamiento = almacenamiento or ALMACENAMIENTO_REPLICAS
+        with fase('resumen', almacenamiento=almacenamiento):
+            promedio = np.mean(replicas)
+            error_estandar = np.std(replicas)
+            histograma = resumen_cuantiles = None
+            if almacenamiento == 'float32':
+                replicas = replicas.astype(np.float32)
+            elif almacenamiento == 'resumen':
+                conteos, bordes = np.histogram(replicas, bins=BINS_RESUMEN)
+                histograma = (conteos.astype(np.int32), bordes)
+                resumen_cuantiles = dict(
+                    zip(CUANTILES_RESUMEN, np.percentile(replicas, CUANTILES_RESUMEN)))
+                replicas = None
+            elif almacenamiento != 'completo':
+                raise ValueError(
+                    f"Almacenamiento desconocido: {almacenamiento!r} (usa 'completo', 'float32' o 'resumen')")
+        return cls(tipo, datos_originales, valor_original, replicas, promedio, error_estandar,
+                   intervalos, histograma, resumen_cuantiles, extras)
+
+    def _resolver(self, clave):
+        atributo = CLAVES_RESULTADO[self.tipo].get(clave, clave)
+        if atributo in ResultadoBootstrap.__slots__:
+            return getattr(self, atributo)
+        if atributo in self.intervalos:
+            return self.intervalos[atributo]
+        if atributo in self.extras:
+            return self.extras[atributo]
+        raise KeyError(clave)
+
+    def __getitem__(self, clave):
+        return self._resolver(clave)
+
+    def __getattr__(self, nombre):
+        # Solo se llama para nombres que no son slots: claves históricas.
+        # Un slot sin asignar (p. ej. al deserializar) no debe recursar.
+        if nombre.startswith('_') or nombre in ResultadoBootstrap.__slots__:
+            raise AttributeError(nombre)
+        try:
+            return self._resolver(nombre)
+        except KeyError:
+            raise AttributeError(nombre) from None
+
+    def __contains__(self, clave):
+        try:
+            self._resolver(clave)
+        except KeyError:
+            return False
+        return True
+
+    def get(self, clave, defecto=None):
+        try:
+            return self._resolver(clave)
+        except KeyError:
+            return defecto
+
+    def keys(self):
+        return ['datos_originales', *CLAVES_RESULTADO[self.tipo], *self.intervalos, *self.extras]
+
+    def nbytes(self):
+        # Las comparaciones de dos muestras guardan una tupla con ambas
+        datos = self.datos_originales if isinstance(self.datos_originales, tuple) else (self.datos_originales,)
+        arreglos = [*datos, self.replicas, *self.intervalos.values(), *self.extras.values()]
+        if self.histograma is not None:
+            arreglos.extend(self.histograma)
+        # Los arreglos mapeados desde el almacén en disco no ocupan memoria del proceso
+        return sum(arreglo.nbytes for arreglo in arreglos
+                   if isinstance(arreglo, np.ndarray) and not isinstance(arreglo, np.memmap))
+
+    def __repr__(self):
+        return (f"ResultadoBootstrap(tipo={self.tipo!r}, valor_original={self.valor_original!r}, "
+                f"error_estandar={self.error_estandar!r}, n_bootstrap={self.extras.get('n_bootstrap')!r})")
@@ -0,0 +1,285 @@
+import os
+
+import numpy as np
+
+from .motor import MEMORIA_MAXIMA_BLOQUE
+from .resultados import ResultadoBootstrap
+
+# Bootstrap en streaming (pesos Poisson)
+
+# Precisión relativa de los sketches de cuantiles (estilo DDSketch). Debe ser
+# menor que el error estándar relativo que se quiere medir: con n grande el
+# de una mediana es pequeño. Cada década del rango de los datos ocupa
+# log(10) / log((1 + p) / (1 - p)) cubetas: unas 1150 con p = 0.001.
+PRECISION_SKETCH = 0.001
+
+# Cubetas máximas por signo y réplica. Si el rango de los datos necesita
+# más, se unen las cubetas vecinas de a pares en todo el sketch (como
+# UDDSketch): gamma pasa a gamma², la precisión relativa se duplica y todos
+# los cuantiles siguen con error acotado, solo que mayor. Con p = 0.001
+# alcanzan para casi dos décadas; datos que van de 1e-6 a 10 terminan con
+# p = 0.004 (la precisión final se informa en el diagnóstico). La memoria del
+# sketch es (B + 1) x 2 x MAXIMO_CUBETAS_SKETCH x 8 bytes como máximo: unos
+# 330 MB con B = 10000.
+MAXIMO_CUBETAS_SKETCH = 2048
+
+
+def reducir_indices(indices, colapsos):
+    # Cubeta de cada índice tras `colapsos` uniones de pares: ceil(i / 2^colapsos)
+    return -(-indices // (1 << colapsos))
+
+
+class SketchCuantiles:
+    # Histogramas logarítmicos de pesos, uno por réplica (filas). Dos sketches
+    # con la misma precisión inicial se fusionan sumando cubetas, y la memoria
+    # depende del rango dinámico de los datos (hasta `maximo_cubetas` por
+    # signo), no del número de filas: O(réplicas x cubetas).
+
+    def __init__(self, n_replicas, precision_relativa=PRECISION_SKETCH, valor_minimo=1e-9,
+                 maximo_cubetas=MAXIMO_CUBETAS_SKETCH):
+        if maximo_cubetas < 2:
+            raise ValueError(f"maximo_cubetas debe ser al menos 2: {maximo_cubetas!r}")
+        self.n_replicas = n_replicas
+        self.maximo_cubetas = maximo_cubetas
+        self.gamma_inicial = (1 + precision_relativa) / (1 - precision_relativa)
+        self.colapsos = 0
+        self.gamma = self.gamma_inicial
+        self.log_gamma = np.log(self.gamma)
+        self.precision_relativa = precision_relativa
+        self.valor_minimo = valor_minimo
+        self.ceros = np.zeros(n_replicas)
+        # signo -> (desplazamiento de la primera cubeta, matriz réplicas x cubetas)
+        self.cubetas = {1: (0, np.zeros((n_replicas, 0))),
+                        -1: (0, np.zeros((n_replicas, 0)))}
+
+    def _colapsar(self):
+        # Une cada par de cubetas vecinas en los dos signos
+        for signo, (desplazamiento, matriz) in self.cubetas.items():
+            if matriz.shape[1] == 0:
+                continue
+            indices = reducir_indices(desplazamiento + np.arange(matriz.shape[1]), 1)
+            unicos, inicios = np.unique(indices, return_index=True)
+            self.cubetas[signo] = (int(unicos[0]), np.add.reduceat(matriz, inicios, axis=1))
+        self.colapsos += 1
+        self.gamma = self.gamma ** 2
+        self.log_gamma = 2 * self.log_gamma
+        self.precision_relativa = (self.gamma - 1) / (self.gamma + 1)
+
+    def _sumar(self, signo, indices, sumas):
+        # Suma `sumas` (filas x réplicas) en las cubetas `indices` (crecientes,
+        # en la resolución actual), colapsando antes si el rango no cabe
+        while True:
+            desplazamiento, matriz = self.cubetas[signo]
+            inicio, fin = int(indices[0]), int(indices[-1]) + 1
+            if matriz.shape[1]:
+                inicio, fin = min(inicio, desplazamiento), max(fin, desplazamiento + matriz.shape[1])
+            if fin - inicio <= self.maximo_cubetas:
+                break
+            self._colapsar()
+            indices = reducir_indices(indices, 1)
+
+        if inicio != desplazamiento or fin != desplazamiento + matriz.shape[1]:
+            ampliada = np.zeros((self.n_replicas, fin - inicio))
+            ampliada[:, desplazamiento - inicio:desplazamiento - inicio + matriz.shape[1]] = matriz
+            desplazamiento, matriz = inicio, ampliada
+            self.cubetas[signo] = (desplazamiento, matriz)
+        unicos, inicios = np.unique(indices, return_index=True)
+        matriz[:, unicos - desplazamiento] += np.add.reduceat(sumas, inicios, axis=0).T
+
+    def agregar(self, valores, pesos):
+        # `pesos` tiene forma (filas, réplicas)
+        magnitudes = np.abs(valores)
+        son_cero = magnitudes < self.valor_minimo
+        if son_cero.any():
+            self.ceros += pesos[son_cero].sum(axis=0)
+
+        for signo in (1, -1):
+            seleccion = ~son_cero & ((valores > 0) if signo ==
+                                     1 else (valores < 0))
+            if not seleccion.any():
+                continue
+            indices = np.ceil(np.log(magnitudes[seleccion]) /
+                              self.log_gamma).astype(np.int64)
+            orden = np.argsort(indices, kind='stable')
+            self._sumar(signo, indices[orden], pesos[seleccion][orden])
+
+    def fusionar(self, otro):
+        if otro.gamma_inicial != self.gamma_inicial or otro.n_replicas != self.n_replicas:
+            raise ValueError(
+                "Solo se fusionan sketches con la misma precisión y réplicas")
+        while self.colapsos < otro.colapsos:
+            self._colapsar()
+        self.ceros += otro.ceros
+        for signo in (1, -1):
+            desplazamiento_otro, matriz_otra = otro.cubetas[signo]
+            if matriz_otra.shape[1] == 0:
+                continue
+            indices = reducir_indices(desplazamiento_otro + np.arange(matriz_otra.shape[1]),
+                                      self.colapsos - otro.colapsos)
+            self._sumar(signo, indices, matriz_otra.T)
+        return self
+
+    def cuantil(self, q):
+        # Recorre negativos (de mayor a menor magnitud), ceros y positivos
+        desplazamiento_neg, negativos = self.cubetas[-1]
+        desplazamiento_pos, positivos = self.cubetas[1]
+        representantes = np.concatenate([
+            -self._representante(desplazamiento_neg +
+                                 np.arange(negativos.shape[1]))[::-1],
+            [0.0],
+            self._representante(desplazamiento_pos +
+                                np.arange(positivos.shape[1]))
+        ])
+        pesos = np.hstack(
+            [negativos[:, ::-1], self.ceros[:, np.newaxis], positivos])
+        acumulados = np.cumsum(pesos, axis=1)
+        rango = q * (acumulados[:, -1] - 1)
+        posicion = np.count_nonzero(acumulados <= rango[:, np.newaxis], axis=1)
+        return representantes[np.minimum(posicion, len(representantes) - 1)]
+
+    def _representante(self, indices):
+        return 2 * self.gamma ** indices / (self.gamma + 1)
+
+
+def fragmentos_de_iterable(iterable, tamano_fragmento):
+    # Acepta un iterable de arreglos (se reenvían tal cual) o de escalares
+    # (se agrupan en fragmentos de `tamano_fragmento`)
+    pendientes = []
+    for elemento in iterable:
+        if np.ndim(elemento) > 0:
+            if pendientes:
+                yield np.asarray(pendientes, dtype=np.float64)
+                pendientes = []
+            yield np.asarray(elemento, dtype=np.float64).ravel()
+            continue
+        pendientes.append(elemento)
+        if len(pendientes) >= tamano_fragmento:
+            yield np.asarray(pendientes, dtype=np.float64)
+            pendientes = []
+    if pendientes:
+        yield np.asarray(pendientes, dtype=np.float64)
+
+
+def leer_fragmentos(fuente, tamano_fragmento, columna=None):
+    # Fuentes admitidas: ruta .npy (memory-map), .parquet, .csv/.txt, o
+    # cualquier iterable/generador de valores o de arreglos
+    if not isinstance(fuente, (str, os.PathLike)):
+        yield from fragmentos_de_iterable(fuente, tamano_fragmento)
+        return
+
+    ruta = os.fspath(fuente)
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension == '.npy':
+        datos = np.load(ruta, mmap_mode='r')
+        if datos.ndim > 1:
+            datos = datos[:, columna or 0]
+        for inicio in range(0, len(datos), tamano_fragmento):
+            yield np.asarray(datos[inicio:inicio + tamano_fragmento], dtype=np.float64)
+    elif extension == '.parquet':
+        from .ingesta import importar_parquet
+
+        archivo = importar_parquet().ParquetFile(ruta)
+        columnas = [columna] if columna is not None else [
+            archivo.schema_arrow.names[0]]
+        for lote in archivo.iter_batches(batch_size=tamano_fragmento, columns=columnas):
+            yield lote.column(0).to_numpy(zero_copy_only=False).astype(np.float64)
+    else:
+        import pandas as pd
+
+        encabezado = 'infer' if columna is not None else None
+        lector = pd.read_csv(ruta, header=encabezado, usecols=[columna if columna is not None else 0],
+                             chunksize=tamano_fragmento, engine='c')
+        for fragmento in lector:
+            yield fragmento.iloc[:, 0].to_numpy(dtype=np.float64)
+
+
+def bootstrap_streaming(fuente, estadisticos=('media',), n_bootstrap=1000, tamano_fragmento=None,
+                        memoria_maxima=MEMORIA_MAXIMA_BLOQUE, semilla=None, columna=None,
+                        precision_relativa=PRECISION_SKETCH, almacenamiento=None,
+                        maximo_cubetas=MAXIMO_CUBETAS_SKETCH):
+    # Cada fila recibe un peso Poisson(1) independiente en cada réplica y solo
+    # se guardan estadísticos suficientes ponderados: memoria O(B), no O(n),
+    # salvo los sketches de mediana y percentiles, O(B x cubetas) (ver
+    # MAXIMO_CUBETAS_SKETCH).
+    # Media, proporción y desviación son exactas para esos pesos; mediana y
+    # percentiles salen de sketches con error relativo `precision_relativa`
+    # (o el mayor que quede tras colapsar cubetas: 'precision_sketch' en el
+    # diagnóstico).
+    if isinstance(estadisticos, str):
+        estadisticos = [estadisticos]
+    cuantiles = {}
+    for nombre in estadisticos:
+        if nombre == 'mediana':
+            cuantiles[nombre] = 0.5
+        elif nombre.startswith('percentil_'):
+            cuantiles[nombre] = float(nombre[len('percentil_'):]) / 100
+        elif nombre not in ('media', 'proporcion', 'desviacion'):
+            raise ValueError(
+                f"Estadístico no disponible en streaming: {nombre!r}")
+
+    if tamano_fragmento is None:
+        # Pesos enteros y su copia en float64 por cada fila del fragmento
+        tamano_fragmento = max(
+            1, memoria_maxima // ((n_bootstrap + 1) * 8 * 2))
+
+    generador = np.random.default_rng(semilla)
+    # La columna 0 tiene peso 1 en todas las filas: es la muestra original
+    suma_pesos = np.zeros(n_bootstrap + 1)
+    suma = np.zeros(n_bootstrap + 1)
+    suma_cuadrados = np.zeros(n_bootstrap + 1)
+    referencia = None
+    sketch = SketchCuantiles(
+        n_bootstrap + 1, precision_relativa, maximo_cubetas=maximo_cubetas) if cuantiles else None
+    n_filas = 0
+
+    for fragmento in leer_fragmentos(fuente, tamano_fragmento, columna):
+        fragmento = fragmento[~np.isnan(fragmento)]
+        if len(fragmento) == 0:
+            continue
+        for inicio in range(0, len(fragmento), tamano_fragmento):
+            valores = fragmento[inicio:inicio + tamano_fragmento]
+            pesos = np.empty((len(valores), n_bootstrap + 1))
+            pesos[:, 0] = 1
+            pesos[:, 1:] = generador.poisson(
+                1.0, size=(len(valores), n_bootstrap))
+
+            # Centrar en un valor de referencia evita cancelación en Σw·x²
+            if referencia is None:
+                referencia = float(valores[0])
+            centrados = valores - referencia
+            suma_pesos += pesos.sum(axis=0)
+            suma += centrados @ pesos
+            suma_cuadrados += (centrados ** 2) @ pesos
+            if sketch is not None:
+                sketch.agregar(valores, pesos)
+            n_filas += len(valores)
+
+    if n_filas == 0:
+        raise ValueError("La fuente no contiene valores")
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        medias = referencia + suma / suma_pesos
+        varianzas = (suma_cuadrados - suma ** 2 /
+                     suma_pesos) / (suma_pesos - 1)
+    valores_estadisticos = {'media': medias, 'proporcion': medias,
+                            'desviacion': np.sqrt(np.maximum(varianzas, 0))}
+
+    diagnostico = {'n_bootstrap': n_bootstrap, 'n_filas': n_filas}
+    if sketch is not None:
+        diagnostico['precision_sketch'] = sketch.precision_relativa
+    resultados = {}
+    for nombre in estadisticos:
+        if nombre in cuantiles:
+            valores_nombre = sketch.cuantil(cuantiles[nombre])
+        else:
+            valores_nombre = valores_estadisticos[nombre]
+        replicas = valores_nombre[1:]
+        # Una réplica con suma de pesos 0 (o 1 para la desviación) no define
+        # el estadístico: se descarta del resumen
+        replicas = replicas[np.isfinite(replicas)]
+        resultados[nombre] = ResultadoBootstrap.desde_replicas(
+            None, None, valores_nombre[0], replicas,
+            {'ic_95': np.percentile(replicas, [2.5, 97.5])},
+            dict(diagnostico), almacenamiento)
+
+    return resultados
@@ -0,0 +1,169 @@
+import os
+import threading
+
+import numpy as np
+
+from .cache import bootstrap_con_cache, clave_cache, normalizar_datos
+from .instrumentacion import medicion
+
+# Ejecución en segundo plano
+#
+#   gestor = GestorTrabajos()
+#   trabajo = gestor.enviar(bootstrap_media_alturas, datos, n_bootstrap=100000)
+#   trabajo.progreso()             # fracción de réplicas terminadas
+#   trabajo.replicas_parciales()   # réplicas de los bloques ya terminados
+#   trabajo.cancelar()
+#
+# Cada trabajo corre en un hilo del gestor y el motor le avisa cada bloque
+# terminado; ahí se revisa si se pidió cancelar, así que la cancelación llega
+# a lo sumo un bloque después. Un gestor compartido (p. ej. un recurso de
+# Streamlit) deja libres los hilos que atienden a los usuarios.
+#
+# Pedidos idénticos (misma clave de caché) mientras un trabajo sigue en curso
+# reciben ese mismo trabajo: con muchos usuarios a la vez el costo crece con
+# los cálculos distintos, no con los usuarios. Cada uno cancela su
+# suscripción; el cálculo se detiene cuando nadie más lo espera.
+
+# Trabajos que corren a la vez; el resto espera en la cola del gestor
+TRABAJOS_SIMULTANEOS = max(2, (os.cpu_count() or 1) // 2)
+
+
+class TrabajoCancelado(Exception):
+    pass
+
+
+class Trabajo:
+    # Estados: 'pendiente' -> 'ejecutando' -> 'terminado' | 'cancelado' | 'error'
+
+    def __init__(self, funcion, datos, cache=None, **parametros):
+        self.funcion = funcion
+        self.datos = datos
+        self.cache = cache
+        self.parametros = parametros
+        n_bootstrap = parametros.get('n_bootstrap', 1000)
+        self.total = parametros.get('n_maximo', 100000) if n_bootstrap == 'auto' else n_bootstrap
+        # Las comparaciones de dos muestras suman las permutaciones del contraste
+        self.total += parametros.get('n_permutaciones', 0)
+        self.estado = 'pendiente'
+        self.resultado = None
+        self.error = None
+        self.futuro = None
+        self.suscriptores = 1
+        # Fases medidas en el hilo del trabajo (ver instrumentacion.agregar_registros)
+        self.fases = []
+        self._terminadas = 0
+        self._bloques = []
+        self._cancelar = threading.Event()
+        self._candado = threading.Lock()
+
+    def informar_bloque(self, bloque):
+        # Lo llama el motor con cada bloque terminado (nombre -> réplicas);
+        # se guardan las del primer estadístico para los resultados parciales
+        # (los bloques de permutaciones solo cuentan para el avance)
+        if self._cancelar.is_set():
+            raise TrabajoCancelado()
+        nombre, replicas = next(iter(bloque.items()))
+        with self._candado:
+            if nombre != 'permutaciones':
+                self._bloques.append(replicas)
+            self._terminadas += len(replicas)
+
+    def ejecutar(self):
+        if self._cancelar.is_set():
+            self.estado = 'cancelado'
+            return None
+        self.estado = 'ejecutando'
+        try:
+            with medicion() as self.fases:
+                resultado = bootstrap_con_cache(self.funcion, self.datos, self.cache,
+                                                progreso=self.informar_bloque, **self.parametros)
+        except TrabajoCancelado:
+            self.estado = 'cancelado'
+        except Exception as error:
+            self.error = error
+            self.estado = 'error'
+        else:
+            # El resultado se asigna antes que el estado: quien vea
+            # 'terminado' ya lo encuentra
+            self.resultado = resultado
+            self.estado = 'terminado'
+        finally:
+            with self._candado:
+                self._bloques = []
+        return self.resultado
+
+    def suscribir(self):
+        # Falso si el trabajo ya terminó o se canceló: hay que lanzar otro
+        with self._candado:
+            if self.terminado or self._cancelar.is_set():
+                return False
+            self.suscriptores += 1
+            return True
+
+    def cancelar(self):
+        with self._candado:
+            self.suscriptores -= 1
+            if self.suscriptores > 0:
+                return
+            self._cancelar.set()
+        if self.futuro is not None and self.futuro.cancel():
+            self.estado = 'cancelado'
+
+    @property
+    def terminado(self):
+        return self.estado in ('terminado', 'cancelado', 'error')
+
+    def replicas_terminadas(self):
+        with self._candado:
+            return self._terminadas
+
+    def progreso(self):
+        if self.estado == 'terminado':
+            return 1.0
+        return min(self.replicas_terminadas() / max(self.total, 1), 1.0)
+
+    def replicas_parciales(self):
+        with self._candado:
+            bloques = list(self._bloques)
+        if not bloques:
+            return np.empty(0)
+        return np.concatenate(bloques)
+
+
+class GestorTrabajos:
+    # Cola de trabajos con un número fijo de hilos, segura entre sesiones
+
+    def __init__(self, max_trabajos=TRABAJOS_SIMULTANEOS):
+        from concurrent.futures import ThreadPoolExecutor
+
+        self._ejecutor = ThreadPoolExecutor(
+            max_workers=max_trabajos, thread_name_prefix='bootstrap_met')
+        self._en_curso = {}
+        self._candado = threading.Lock()
+
+    def enviar(self, funcion, datos, cache=None, **parametros):
+        # Mismos argumentos que bootstrap_con_cache; devuelve el Trabajo sin
+        # esperar (uno ya en curso si hay otro idéntico)
+        datos = normalizar_datos(datos)
+        clave = (clave_cache(funcion, datos, parametros), id(cache))
+        with self._candado:
+            trabajo = self._en_curso.get(clave)
+            if trabajo is not None and trabajo.suscribir():
+                return trabajo
+            trabajo = Trabajo(funcion, datos, cache, **parametros)
+            self._en_curso[clave] = trabajo
+            trabajo.futuro = self._ejecutor.submit(trabajo.ejecutar)
+        trabajo.futuro.add_done_callback(lambda _: self._olvidar(clave, trabajo))
+        return trabajo
+
+    def _olvidar(self, clave, trabajo):
+        with self._candado:
+            if self._en_curso.get(clave) is trabajo:
+                del self._en_curso[clave]
+
+    def en_curso(self):
+        with self._candado:
+            return len(self._en_curso)
+
+    def cerrar(self, esperar=True):
+        self._ejecutor.shutdown(wait=esperar, cancel_futures=True)
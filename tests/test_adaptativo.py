@@ -0,0 +1,55 @@
+import numpy as np
+
+import bootstrap_met as bm
+from bootstrap_met import motor
+
+DATOS = np.random.default_rng(0).lognormal(10, 0.6, 5000)
+
+
+def test_se_detiene_al_converger():
+    replicas, diagnostico = bm.remuestrear_adaptativo(DATOS, ['media', 'mediana'], semilla=1)
+    assert diagnostico['convergio']
+    # Tandas de 500, 500, 1000, 2000...: el total es 500 * 2^k
+    assert diagnostico['n_bootstrap'] in [500 * 2 ** k for k in range(8)]
+    assert diagnostico['n_bootstrap'] < 100000
+    for nombre in ('media', 'mediana'):
+        assert len(replicas[nombre]) == diagnostico['n_bootstrap']
+        error_estandar = np.std(replicas[nombre])
+        assert diagnostico['error_mc_error_estandar'][nombre] <= bm.PRECISION_ERROR_ESTANDAR * error_estandar
+        assert np.all(diagnostico['error_mc_ic_95'][nombre] <= bm.PRECISION_IC * error_estandar)
+
+
+def test_sin_convergencia_llega_a_n_maximo():
+    replicas, diagnostico = bm.remuestrear_adaptativo(DATOS, ['media'], n_maximo=3000, precision_ic=1e-6,
+                                                      semilla=1)
+    assert not diagnostico['convergio']
+    assert diagnostico['n_bootstrap'] == 3000 and len(replicas['media']) == 3000
+
+
+def test_metas_mas_exigentes_piden_mas_replicas():
+    _, laxo = bm.remuestrear_adaptativo(DATOS, ['media'], precision_error_estandar=0.1, precision_ic=0.3,
+                                        semilla=1)
+    _, exigente = bm.remuestrear_adaptativo(DATOS, ['media'], precision_error_estandar=0.02,
+                                            precision_ic=0.05, semilla=1)
+    assert laxo['n_bootstrap'] < exigente['n_bootstrap']
+
+
+def test_prepara_una_vez_y_reparte_entre_trabajadores(monkeypatch):
+    llamadas = []
+    preparar = motor.preparar_datos
+    monkeypatch.setattr(motor, 'preparar_datos', lambda *argumentos: llamadas.append(1) or preparar(*argumentos))
+    # Memoria chica: las tandas grandes tienen varios bloques que repartir
+    opciones = {'semilla': 1, 'precision_ic': 0.05, 'memoria_maxima': 1_000_000}
+    uno, diagnostico = bm.remuestrear_adaptativo(DATOS, ['media', 'mediana'], **opciones)
+    assert len(llamadas) == 1 and diagnostico['n_bootstrap'] > 1000
+
+    varios, _ = bm.remuestrear_adaptativo(DATOS, ['media', 'mediana'], n_trabajadores=4, **opciones)
+    for nombre in uno:
+        np.testing.assert_array_equal(uno[nombre], varios[nombre])
+
+
+def test_estimador_con_n_bootstrap_auto():
+    resultado = bm.bootstrap_media_alturas(DATOS, n_bootstrap='auto', n_maximo=20000, semilla=1,
+                                           estrategia='monte_carlo')
+    assert resultado.convergio
+    assert resultado.n_bootstrap == len(resultado.replicas) <= 20000
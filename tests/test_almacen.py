@@ -0,0 +1,172 @@
+import functools
+import json
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+import bootstrap_met as bm
+from bootstrap_met.almacen import ARCHIVO_INDICE, SEGUNDOS_HUERFANOS, AlmacenDisco, clave_archivo
+from bootstrap_met.cache import CacheResultados, bootstrap_con_cache
+
+DATOS = np.arange(1000, dtype=np.float64)
+SALARIOS = np.round(np.random.default_rng(0).lognormal(10, 0.6, 15))
+
+
+@functools.lru_cache
+def resultado(semilla):
+    # Unos 170 kB en disco (20000 réplicas float64)
+    return bm.bootstrap_media_alturas(DATOS, n_bootstrap=20000, semilla=semilla, estrategia='monte_carlo')
+
+
+def comprobar_indice(ruta):
+    # El índice del almacén coincide con el directorio: sin huérfanos, cada
+    # archivo pertenece a una entrada publicada y los bytes son los reales
+    with open(os.path.join(ruta, ARCHIVO_INDICE), encoding='utf-8') as archivo:
+        indice = json.load(archivo)
+    archivos = {nombre for nombre in os.listdir(ruta) if not nombre.startswith('.')}
+    referenciados = {f'{nombre}.json' for nombre in indice['entradas']}
+    referenciados.update(archivo for entrada in indice['entradas'].values() for archivo in entrada['archivos'])
+    assert archivos == referenciados
+    assert indice['bytes'] == sum(os.path.getsize(os.path.join(ruta, archivo)) for archivo in archivos)
+    return indice
+
+
+def iguales(a, b):
+    if isinstance(a, bm.ResultadoBootstrap):
+        return all(iguales(getattr(a, atributo), getattr(b, atributo))
+                   for atributo in bm.ResultadoBootstrap.__slots__)
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(iguales(a[clave], b[clave]) for clave in a)
+    if isinstance(a, (tuple, list)):
+        return type(a) is type(b) and len(a) == len(b) and all(map(iguales, a, b))
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return np.asarray(a).dtype == np.asarray(b).dtype and np.array_equal(a, b, equal_nan=True)
+    return a == b or (a != a and b != b)
+
+
+def test_almacen_ida_y_vuelta(tmp_path):
+    datos = np.random.default_rng(7).normal(170, 8, 5000)
+    pedidos = [(bm.bootstrap_media_alturas, datos, {'n_bootstrap': 20000, 'semilla': 1,
+                                                    'estrategia': 'monte_carlo'}),
+               (bm.bootstrap_mediana_salarios, SALARIOS, {'n_bootstrap': 1000, 'semilla': 1}),
+               (bm.bootstrap_estadisticos, datos, {'estadisticos': ('media', 'mediana'), 'n_bootstrap': 2000,
+                                                   'semilla': 1}),
+               (bm.bootstrap_dos_muestras, (datos[:100], datos[100:300]), {'n_bootstrap': 2000,
+                                                                          'n_permutaciones': 1000, 'semilla': 1}),
+               (bm.bootstrap_media_alturas, datos, {'n_bootstrap': 'auto', 'n_maximo': 5000, 'semilla': 1,
+                                                    'estrategia': 'monte_carlo', 'almacenamiento': 'resumen'})]
+    cache = CacheResultados(almacen=AlmacenDisco(tmp_path))
+    originales = [bootstrap_con_cache(funcion, datos, cache, **parametros) for funcion, datos, parametros in pedidos]
+
+    # Otra caché sobre el mismo directorio: todo sale del disco
+    cache = CacheResultados(almacen=AlmacenDisco(tmp_path))
+    for original, (funcion, datos, parametros) in zip(originales, pedidos):
+        assert iguales(original, bootstrap_con_cache(funcion, datos, cache, **parametros))
+    assert cache.estadisticas()['aciertos_disco'] == len(pedidos)
+
+
+def escribir_almacen(argumentos):
+    ruta, proceso = argumentos
+    almacen = AlmacenDisco(ruta, tamano_maximo=400_000)
+    for j in range(10):
+        almacen.guardar(('clave', j % 4), resultado(j % 4))
+        leido = almacen.cargar(('clave', (j + proceso) % 4))
+        if leido is not None and not np.array_equal(leido.replicas, resultado((j + proceso) % 4).replicas):
+            return False
+    return True
+
+
+def test_almacen_escrituras_concurrentes(tmp_path):
+    # Calculados antes de crear los procesos: los heredan ya hechos
+    for semilla in range(4):
+        resultado(semilla)
+    with multiprocessing.get_context('fork').Pool(4) as procesos:
+        assert all(procesos.map(escribir_almacen, [(str(tmp_path), proceso) for proceso in range(4)]))
+
+    comprobar_indice(tmp_path)
+    assert AlmacenDisco(tmp_path).estadisticas()['bytes'] <= 400_000
+
+
+def test_desaloja_las_usadas_hace_mas_tiempo(tmp_path):
+    almacen = AlmacenDisco(tmp_path, tamano_maximo=600_000)
+    for semilla in range(3):
+        assert almacen.guardar(semilla, resultado(semilla))
+    # Leer la 0 la vuelve la más reciente: la siguiente en salir es la 1
+    assert almacen.cargar(0) is not None
+    almacen.guardar(3, resultado(3))
+    assert [almacen.cargar(semilla) is not None for semilla in range(4)] == [True, False, True, True]
+    indice = comprobar_indice(tmp_path)
+    assert list(indice['entradas']) == [clave_archivo(semilla) for semilla in (0, 2, 3)]
+
+    # Reemplazar una entrada no la cuenta dos veces
+    almacen.guardar(2, resultado(2))
+    assert comprobar_indice(tmp_path)['bytes'] == indice['bytes']
+    almacen.ajustar_tamano_maximo(200_000)
+    assert almacen.estadisticas()['entradas'] == 1 and almacen.cargar(2) is not None
+    almacen.limpiar()
+    assert os.listdir(tmp_path) == ['.candado']
+    assert almacen.estadisticas() == {'entradas': 0, 'bytes': 0, 'tamano_maximo': 200_000}
+
+
+def test_guardar_no_recorre_el_directorio(tmp_path, monkeypatch):
+    almacen = AlmacenDisco(tmp_path)
+    almacen.guardar(0, resultado(0))
+
+    def recorrer(*argumentos):
+        raise AssertionError("guardar recorrió el directorio")
+
+    monkeypatch.setattr(os, 'scandir', recorrer)
+    for semilla in range(1, 4):
+        assert almacen.guardar(semilla, resultado(semilla))
+        assert almacen.cargar(semilla) is not None
+    monkeypatch.undo()
+    assert comprobar_indice(tmp_path)['bytes'] == almacen.estadisticas()['bytes']
+
+
+def test_reconstruye_el_indice(tmp_path):
+    almacen = AlmacenDisco(tmp_path)
+    for semilla in range(3):
+        almacen.guardar(semilla, resultado(semilla))
+    bytes_totales = almacen.estadisticas()['bytes']
+
+    # Sin índice (p. ej. un directorio de una versión anterior) o con uno
+    # dañado se reconstruye desde las entradas publicadas
+    for contenido in (None, '{"formato": 1, "entr'):
+        ruta_indice = os.path.join(tmp_path, ARCHIVO_INDICE)
+        os.remove(ruta_indice)
+        if contenido is not None:
+            with open(ruta_indice, 'w', encoding='utf-8') as archivo:
+                archivo.write(contenido)
+        assert almacen.estadisticas() == {'entradas': 3, 'bytes': bytes_totales,
+                                          'tamano_maximo': almacen.tamano_maximo}
+        assert np.array_equal(almacen.cargar(1).replicas, resultado(1).replicas)
+        comprobar_indice(tmp_path)
+
+
+def test_borra_huerfanos_viejos(tmp_path):
+    almacen = AlmacenDisco(tmp_path)
+    almacen.guardar(0, resultado(0))
+    # Restos de una escritura interrumpida: uno viejo y uno reciente
+    viejo = time.time() - 2 * SEGUNDOS_HUERFANOS
+    for huerfano in ('viejo-0.npy', 'viejo.abc.tmp', 'reciente-0.npy'):
+        with open(os.path.join(tmp_path, huerfano), 'wb') as archivo:
+            archivo.write(b'x' * 100)
+    os.utime(os.path.join(tmp_path, 'viejo-0.npy'), (viejo, viejo))
+    os.utime(os.path.join(tmp_path, 'viejo.abc.tmp'), (viejo, viejo))
+
+    # El directorio se revisa a lo sumo una vez cada SEGUNDOS_HUERFANOS
+    almacen.guardar(1, resultado(1))
+    assert os.path.exists(os.path.join(tmp_path, 'viejo-0.npy'))
+    ruta_indice = os.path.join(tmp_path, ARCHIVO_INDICE)
+    with open(ruta_indice, encoding='utf-8') as archivo:
+        indice = json.load(archivo)
+    indice['revision'] = viejo
+    with open(ruta_indice, 'w', encoding='utf-8') as archivo:
+        json.dump(indice, archivo)
+    almacen.guardar(2, resultado(2))
+    restantes = set(os.listdir(tmp_path))
+    assert 'reciente-0.npy' in restantes
+    assert not restantes & {'viejo-0.npy', 'viejo.abc.tmp'}
+    assert almacen.estadisticas()['entradas'] == 3
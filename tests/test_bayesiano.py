@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+import bootstrap_met as bm
+from bootstrap_met.estadisticos import obtener_estadistico
+
+DATOS = np.round(np.random.default_rng(9).lognormal(10, 0.6, 2000))
+SALARIOS = np.round(np.random.default_rng(10).lognormal(10, 0.6, 15))
+
+
+@pytest.mark.parametrize('nombre, esperado', [
+    ('media', np.mean), ('proporcion', np.mean), ('mediana', np.median),
+    ('desviacion', lambda datos: np.std(datos, ddof=1)),
+    ('percentil_90', lambda datos: np.percentile(datos, 90)),
+    ('percentil_2.5', lambda datos: np.percentile(datos, 2.5))])
+def test_pesos_iguales_dan_el_estadistico_de_la_muestra(nombre, esperado):
+    for datos in (np.sort(SALARIOS), np.sort(DATOS[:101]), SALARIOS[:1]):
+        if nombre == 'desviacion' and len(datos) == 1:
+            continue
+        pesos = np.full((3, len(datos)), 1 / len(datos))
+        replicas = obtener_estadistico(nombre)['ponderado'](datos, pesos, len(datos))
+        np.testing.assert_allclose(replicas, esperado(datos), rtol=1e-12)
+
+
+def test_semilla_independiente_de_trabajadores():
+    opciones = {'semilla': 42, 'memoria_maxima': 200_000, 'esquema': 'bayesiano'}
+    uno = bm.remuestrear_estadisticos(DATOS, ['media', 'mediana', 'desviacion'], 3000, **opciones)
+    for ejecutor in ('hilos', 'procesos'):
+        varios = bm.remuestrear_estadisticos(DATOS, ['media', 'mediana', 'desviacion'], 3000,
+                                             n_trabajadores=4, ejecutor=ejecutor, **opciones)
+        for nombre in uno:
+            np.testing.assert_array_equal(uno[nombre], varios[nombre])
+
+
+@pytest.mark.parametrize('compresion', [True, False])
+def test_distribucion_de_la_media(compresion):
+    # Con pesos Dirichlet(1, ..., 1) la media ponderada tiene esperanza x̄ y
+    # varianza (varianza poblacional) / (n + 1)
+    datos = np.random.default_rng(11).integers(0, 20, 300).astype(np.float64)
+    replicas = bm.remuestrear_estadisticos(datos, ['media'], 20000, semilla=0, esquema='bayesiano',
+                                           compresion=compresion)['media']
+    desviacion = np.sqrt(np.var(datos) / (len(datos) + 1))
+    assert abs(replicas.mean() - datos.mean()) < 5 * desviacion / np.sqrt(20000)
+    assert abs(replicas.std() / desviacion - 1) < 0.03
+
+
+def test_mediana_sin_saltos_en_muestras_chicas():
+    # El remuestreo de filas solo da valores de la muestra (o puntos medios);
+    # los pesos continuos dan una réplica distinta en cada fila
+    iid = bm.bootstrap_mediana_salarios(SALARIOS, n_bootstrap=5000, semilla=0, estrategia='monte_carlo')
+    bayesiano = bm.bootstrap_mediana_salarios(SALARIOS, n_bootstrap=5000, semilla=0, esquema='bayesiano',
+                                              estrategia='monte_carlo')
+    assert len(np.unique(iid.replicas)) < 50
+    assert len(np.unique(bayesiano.replicas)) > 4900
+    assert SALARIOS.min() <= bayesiano.replicas.min() and bayesiano.replicas.max() <= SALARIOS.max()
+    assert abs(np.median(bayesiano.replicas) - np.median(SALARIOS)) < bayesiano.error_estandar
+
+
+def test_estadistico_sin_version_ponderada():
+    with pytest.raises(ValueError, match='rango'):
+        bm.remuestrear_estadisticos(DATOS, {'rango': np.ptp}, 100, esquema='bayesiano')
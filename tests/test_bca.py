@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+import bootstrap_met as bm
+from bootstrap_met.bca import calcular_bca, jackknife_generico, valores_jackknife
+from bootstrap_met.estadisticos import obtener_estadistico
+from bootstrap_met.motor import comprimir_datos
+
+ORDEN = ('mediana', 'percentil_90', 'percentil_37.5')
+
+
+def generar_datos(n, semilla=0, valores_unicos=None):
+    generador = np.random.default_rng(semilla)
+    if valores_unicos is not None:
+        return generador.integers(0, valores_unicos, n).astype(np.float64)
+    return np.round(generador.lognormal(10, 0.6, n))
+
+
+# Jackknife en forma cerrada contra el genérico
+
+
+@pytest.mark.parametrize('nombre', ['media', 'desviacion', 'proporcion', *ORDEN])
+@pytest.mark.parametrize('valores_unicos', [None, 4])
+def test_jackknife_cerrado_coincide_con_generico(nombre, valores_unicos):
+    datos = generar_datos(40, valores_unicos=valores_unicos)
+    if nombre == 'proporcion':
+        datos = (datos > np.median(datos)).astype(np.float64)
+    especificacion = obtener_estadistico(nombre)
+    referencia = jackknife_generico(datos, especificacion['funcion'])
+
+    valores, pesos = valores_jackknife(datos, especificacion)
+    np.testing.assert_allclose(valores, referencia, rtol=1e-10)
+    np.testing.assert_array_equal(pesos, 1)
+
+    # Comprimidos: un valor por valor único, pesado por sus repeticiones
+    unicos, conteos = comprimir_datos(datos)
+    valores, pesos = valores_jackknife((unicos, conteos), especificacion)
+    posiciones = np.searchsorted(unicos, datos)
+    np.testing.assert_allclose(valores[posiciones], referencia, rtol=1e-10)
+    np.testing.assert_array_equal(pesos, conteos)
+
+
+@pytest.mark.parametrize('nombre', ['media', 'desviacion', 'mediana', 'percentil_90'])
+def test_bca_cerrado_coincide_con_generico(nombre):
+    datos = generar_datos(60, semilla=3)
+    especificacion = obtener_estadistico(nombre)
+    replicas = bm.remuestrear_estadisticos(datos, [nombre], 2000, semilla=0)[nombre]
+    valor_original = especificacion['funcion'](datos)
+    cerrado = calcular_bca(datos, replicas, valor_original, nombre)
+    generico = calcular_bca(datos, replicas, valor_original, {'funcion': especificacion['funcion']})
+    np.testing.assert_allclose(cerrado, generico, rtol=1e-10)
+    comprimido = calcular_bca(comprimir_datos(datos), replicas, valor_original, nombre)
+    np.testing.assert_allclose(comprimido, generico, rtol=1e-10)
+
+
+def test_bca_corrige_el_sesgo_de_un_estadistico_asimetrico():
+    # Con una muestra exponencial el intervalo BCa de la media se corre hacia
+    # la derecha respecto del percentil
+    datos = np.random.default_rng(4).exponential(1.0, 80)
+    resultado = bm.bootstrap_media_alturas(datos, n_bootstrap=4000, semilla=0, estrategia='monte_carlo')
+    percentil, bca = resultado.ic_95, resultado.ic_95_bca
+    assert bca[0] > percentil[0] and bca[1] > percentil[1]
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+import bootstrap_met as bm
+from bootstrap_met.bloques import indices_bloques, longitud_bloque_automatica
+
+
+def serie_ar1(n, phi, semilla=0):
+    generador = np.random.default_rng(semilla)
+    ruido = generador.normal(size=n)
+    serie = np.empty(n)
+    serie[0] = ruido[0] / np.sqrt(1 - phi ** 2)
+    for i in range(1, n):
+        serie[i] = phi * serie[i - 1] + ruido[i]
+    return serie
+
+
+@pytest.mark.parametrize('esquema', bm.ESQUEMAS_BLOQUES)
+@pytest.mark.parametrize('n, longitud', [(1, 1), (10, 3), (97, 10), (20, 20)])
+def test_indices_bloques(esquema, n, longitud):
+    indices = indices_bloques(np.random.default_rng(4), n, 300, esquema, longitud)
+    assert indices.shape == (300, n)
+    assert indices.min() >= 0 and indices.max() < n
+
+    # Dentro de un bloque cada índice sigue al anterior (módulo n si el
+    # esquema es circular)
+    siguientes = (indices[:, :-1] + 1) % n == indices[:, 1:]
+    if esquema == 'estacionario':
+        # Longitud geométrica: alrededor de 1 - 1/longitud de continuaciones
+        if n > 1 and longitud > 1:
+            assert abs(siguientes.mean() - (1 - 1 / longitud)) < 0.05
+        return
+
+    continuaciones = np.arange(1, n) % longitud != 0
+    assert siguientes[:, continuaciones].all()
+    inicios = indices[:, ::longitud]
+    if esquema == 'bloques_moviles':
+        assert inicios.max() <= n - longitud
+        assert (indices[:, 1:][:, continuaciones] == indices[:, :-1][:, continuaciones] + 1).all()
+    elif 1 < longitud < n:
+        # Algún bloque circular da la vuelta al final de la serie
+        assert inicios.max() > n - longitud
+
+
+@pytest.mark.parametrize('esquema', bm.ESQUEMAS_BLOQUES)
+def test_semilla_independiente_de_trabajadores(esquema):
+    serie = serie_ar1(2000, 0.5)
+    opciones = {'semilla': 42, 'memoria_maxima': 200_000, 'esquema': esquema, 'longitud_bloque': 20}
+    uno = bm.remuestrear_estadisticos(serie, ['media', 'mediana'], 3000, n_trabajadores=1, **opciones)
+    varios = bm.remuestrear_estadisticos(serie, ['media', 'mediana'], 3000, n_trabajadores=4, **opciones)
+    for nombre in uno:
+        np.testing.assert_array_equal(uno[nombre], varios[nombre])
+
+
+def test_error_estandar_con_autocorrelacion():
+    # AR(1) con phi = 0.7: el error estándar de la media es unas 2.4 veces
+    # el que supone observaciones independientes
+    n, phi = 5000, 0.7
+    serie = serie_ar1(n, phi, semilla=2)
+    teorico = 1 / ((1 - phi) * np.sqrt(n))
+    iid = bm.bootstrap_media_alturas(serie, n_bootstrap=2000, semilla=0, estrategia='monte_carlo')
+    assert iid.error_estandar < 0.5 * teorico
+    for esquema in bm.ESQUEMAS_BLOQUES:
+        resultado = bm.bootstrap_media_alturas(serie, n_bootstrap=2000, semilla=0, esquema=esquema,
+                                               estrategia='monte_carlo')
+        assert resultado.longitud_bloque > 10
+        assert abs(resultado.error_estandar / teorico - 1) < 0.15
+
+
+def test_longitud_bloque_automatica():
+    generador = np.random.default_rng(3)
+    assert longitud_bloque_automatica(generador.normal(size=5000)) <= 3
+    cortas = longitud_bloque_automatica(serie_ar1(5000, 0.3))
+    largas = longitud_bloque_automatica(serie_ar1(5000, 0.9))
+    assert 1 < cortas < largas <= 3 * np.sqrt(5000)
+    assert longitud_bloque_automatica(np.ones(100)) == 1
+    with pytest.raises(ValueError):
+        bm.remuestrear_estadisticos(serie_ar1(100, 0.5), ['media'], 100, esquema='estacionario',
+                                    longitud_bloque=0)
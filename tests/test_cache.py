@@ -0,0 +1,53 @@
+import numpy as np
+
+import bootstrap_met as bm
+from bootstrap_met.cache import CacheResultados, bootstrap_con_cache, clave_cache, tamano_resultado
+
+DATOS = np.random.default_rng(0).normal(170, 8, 2000)
+
+
+def test_misma_configuracion_sale_de_la_cache():
+    cache = CacheResultados()
+    primero = bootstrap_con_cache(bm.bootstrap_media_alturas, DATOS, cache, n_bootstrap=500, semilla=1,
+                                  estrategia='monte_carlo')
+    # Una copia de los datos y otro número de trabajadores no cambian la clave
+    segundo = bootstrap_con_cache(bm.bootstrap_media_alturas, DATOS.copy(), cache, n_bootstrap=500, semilla=1,
+                                  estrategia='monte_carlo', n_trabajadores=2)
+    assert segundo is primero
+    assert cache.estadisticas()['aciertos'] == 1 and cache.estadisticas()['fallos'] == 1
+
+    otra_semilla = bootstrap_con_cache(bm.bootstrap_media_alturas, DATOS, cache, n_bootstrap=500, semilla=2,
+                                       estrategia='monte_carlo')
+    assert otra_semilla is not primero
+    assert cache.estadisticas()['fallos'] == 2
+
+
+def test_clave_depende_del_contenido_y_los_parametros():
+    parametros = {'n_bootstrap': 500, 'semilla': 1}
+    clave = clave_cache(bm.bootstrap_desviacion_estandar, DATOS, parametros)
+    assert clave == clave_cache(bm.bootstrap_desviacion_estandar, DATOS.copy(), dict(parametros))
+    assert clave != clave_cache(bm.bootstrap_desviacion_estandar, DATOS + 1, parametros)
+    assert clave != clave_cache(bm.bootstrap_desviacion_estandar, DATOS.astype(np.float32), parametros)
+    assert clave != clave_cache(bm.bootstrap_desviacion_estandar, DATOS, {**parametros, 'semilla': 2})
+
+
+def test_desaloja_lo_usado_hace_mas_tiempo():
+    resultados = [bm.bootstrap_media_alturas(DATOS, n_bootstrap=1000, semilla=semilla, estrategia='monte_carlo')
+                  for semilla in range(3)]
+    tamano = max(map(tamano_resultado, resultados))
+    cache = CacheResultados(memoria_maxima=2 * tamano)
+    cache.guardar('a', resultados[0])
+    cache.guardar('b', resultados[1])
+    assert cache.obtener('a') is resultados[0]
+    # 'b' es el menos usado: sale al guardar 'c'
+    cache.guardar('c', resultados[2])
+    assert cache.obtener('b') is None
+    assert cache.obtener('a') is resultados[0] and cache.obtener('c') is resultados[2]
+    assert cache.estadisticas()['bytes'] <= 2 * tamano
+
+    cache.ajustar_memoria_maxima(tamano)
+    assert cache.estadisticas()['entradas'] == 1
+
+    # Un resultado más grande que toda la caché no se guarda
+    cache.guardar('d', bm.bootstrap_media_alturas(DATOS, n_bootstrap=5000, semilla=0, estrategia='monte_carlo'))
+    assert cache.obtener('d') is None
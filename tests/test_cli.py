@@ -0,0 +1,97 @@
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bootstrap_met.cli import main
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def archivo_csv(tmp_path):
+    generador = np.random.default_rng(0)
+    tabla = pd.DataFrame({'departamento': np.repeat(['a', 'b', 'c'], 40),
+                          'salario': np.round(generador.lognormal(10, 0.6, 120)),
+                          'altura': generador.normal(170, 8, 120)})
+    tabla.loc[5, 'altura'] = np.nan
+    ruta = tmp_path / 'datos.csv'
+    tabla.to_csv(ruta, index=False)
+    return ruta
+
+
+def leer_jsonl(ruta):
+    with open(ruta, encoding='utf-8') as archivo:
+        return [json.loads(linea) for linea in archivo]
+
+
+def ordenados(registros):
+    # Sin tiempos, en un orden fijo: con varios trabajadores se escriben al terminar
+    return sorted(({clave: valor for clave, valor in registro.items() if clave != 'segundos'}
+                   for registro in registros), key=lambda registro: json.dumps(registro, sort_keys=True))
+
+
+def test_columnas_por_grupo_a_jsonl(archivo_csv, tmp_path):
+    salida = tmp_path / 'salida.jsonl'
+    codigo = main([str(archivo_csv), '-e', 'media', '-e', 'mediana', '-g', 'departamento', '-B', '500',
+                   '--semilla', '1', '-t', '1', '-o', str(salida)])
+    assert codigo == 0
+    registros = leer_jsonl(salida)
+    # 3 grupos x 2 columnas numéricas x 2 estadísticos
+    assert len(registros) == 12
+    assert {registro['grupo'] for registro in registros} == {'a', 'b', 'c'}
+    for registro in registros:
+        assert registro['ic_inferior'] <= registro['estimacion'] <= registro['ic_superior']
+        assert registro['n_bootstrap'] == 500
+    altura_a = [registro for registro in registros if registro['grupo'] == 'a' and registro['columna'] == 'altura']
+    assert all(registro['n'] == 39 and registro['n_invalidos'] == 1 for registro in altura_a)
+
+
+def test_misma_semilla_con_uno_y_varios_trabajadores(archivo_csv, tmp_path):
+    argumentos = [str(archivo_csv), '-e', 'mediana', '-g', 'departamento', '-B', '300', '--semilla', '7',
+                  '--ejecutor', 'hilos']
+    main([*argumentos, '-t', '1', '-o', str(tmp_path / 'uno.jsonl')])
+    main([*argumentos, '-t', '3', '-o', str(tmp_path / 'varios.jsonl')])
+    assert ordenados(leer_jsonl(tmp_path / 'uno.jsonl')) == ordenados(leer_jsonl(tmp_path / 'varios.jsonl'))
+
+
+def test_reanudar_salta_los_trabajos_escritos(archivo_csv, tmp_path):
+    salida = tmp_path / 'salida.jsonl'
+    argumentos = [str(archivo_csv), '-g', 'departamento', '-B', '200', '--semilla', '1', '-t', '1',
+                  '-o', str(salida)]
+    main([*argumentos, '-c', 'salario'])
+    assert len(leer_jsonl(salida)) == 3
+    main([*argumentos, '-c', 'salario', '-c', 'altura', '--reanudar'])
+    registros = leer_jsonl(salida)
+    assert len(registros) == 6
+    assert len({(registro['columna'], registro['grupo']) for registro in registros}) == 6
+
+
+def test_salida_parquet(archivo_csv, tmp_path):
+    salida = tmp_path / 'salida.parquet'
+    assert main([str(archivo_csv), '-c', 'salario', '-B', '200', '--semilla', '1', '-t', '1',
+                 '-o', str(salida)]) == 0
+    tabla = pd.read_parquet(salida)
+    assert len(tabla) == 1 and tabla['columna'][0] == 'salario' and tabla['n'][0] == 120
+
+
+@pytest.mark.parametrize('argumentos', [['-c', 'inexistente'], ['--confianza', '1.5'], ['-B', '0'],
+                                        ['--reanudar']])
+def test_errores_de_uso(archivo_csv, argumentos):
+    with pytest.raises(SystemExit) as salida:
+        main([str(archivo_csv), *argumentos])
+    assert salida.value.code == 2
+
+
+def test_python_m_con_procesos(archivo_csv):
+    # De punta a punta: intérprete nuevo, pool de procesos y salida estándar
+    proceso = subprocess.run(
+        [sys.executable, '-m', 'bootstrap_met', str(archivo_csv), '-c', 'salario', '-g', 'departamento',
+         '-B', '200', '--semilla', '3', '-t', '2', '--ejecutor', 'procesos'],
+        capture_output=True, text=True, cwd=RAIZ, timeout=120, check=True)
+    registros = [json.loads(linea) for linea in proceso.stdout.splitlines()]
+    assert sorted(registro['grupo'] for registro in registros) == ['a', 'b', 'c']
@@ -0,0 +1,146 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+import bootstrap_met as bm
+from bootstrap_met.cache import CacheResultados, clave_cache, normalizar_datos
+from bootstrap_met.trabajos import GestorTrabajos
+
+DATOS = np.random.default_rng(0).normal(170, 8, 1000)
+
+# Bloques de 10 réplicas: el trabajo largo sigue en curso mientras se prueba
+PARAMETROS = {'n_bootstrap': 200_000, 'semilla': 1, 'estrategia': 'monte_carlo', 'memoria_maxima': 320_000}
+USUARIOS = 8
+
+
+def esperar(condicion, limite=30):
+    inicio = time.monotonic()
+    while not condicion():
+        assert time.monotonic() - inicio < limite
+        time.sleep(0.001)
+
+
+def test_calculo_compartido_entre_hilos():
+    cache = CacheResultados()
+    llamadas = []
+
+    def calcular():
+        llamadas.append(1)
+        # No termina hasta que los demás hilos esperan este cálculo
+        esperar(lambda: cache.compartidos == USUARIOS - 1)
+        return bm.bootstrap_media_alturas(DATOS, n_bootstrap=100, semilla=0, estrategia='monte_carlo')
+
+    with ThreadPoolExecutor(USUARIOS) as hilos:
+        resultados = list(hilos.map(lambda _: cache.obtener_o_calcular('clave', calcular), range(USUARIOS)))
+    assert len(llamadas) == 1
+    assert all(resultado is resultados[0] for resultado in resultados)
+    estadisticas = cache.estadisticas()
+    assert estadisticas['fallos'] == 1 and estadisticas['compartidos'] == USUARIOS - 1
+
+
+def test_calculo_compartido_que_falla_se_reintenta():
+    cache = CacheResultados()
+    llamadas = []
+
+    def calcular():
+        llamadas.append(1)
+        if len(llamadas) == 1:
+            esperar(lambda: cache.compartidos == 1)
+            raise RuntimeError('falla el primero')
+        return 'resultado'
+
+    with ThreadPoolExecutor(2) as hilos:
+        primero = hilos.submit(cache.obtener_o_calcular, 'clave', calcular)
+        esperar(lambda: llamadas)
+        segundo = hilos.submit(cache.obtener_o_calcular, 'clave', calcular)
+        with pytest.raises(RuntimeError):
+            primero.result()
+        # Quien esperaba no recibe el error: calcula de nuevo
+        assert segundo.result() == 'resultado'
+    assert len(llamadas) == 2
+
+
+@pytest.fixture
+def gestor():
+    gestor = GestorTrabajos(max_trabajos=2)
+    yield gestor
+    gestor.cerrar(esperar=False)
+
+
+def test_pedidos_identicos_comparten_trabajo(gestor):
+    cache = CacheResultados()
+    with ThreadPoolExecutor(USUARIOS) as hilos:
+        trabajos = list(hilos.map(lambda _: gestor.enviar(bm.bootstrap_media_alturas, DATOS.copy(), cache,
+                                                          **PARAMETROS), range(USUARIOS)))
+    trabajo = trabajos[0]
+    assert all(otro is trabajo for otro in trabajos)
+    assert gestor.en_curso() == 1 and trabajo.suscriptores == USUARIOS
+
+    # Otra caché u otros parámetros son otro cálculo
+    otro = gestor.enviar(bm.bootstrap_media_alturas, DATOS, CacheResultados(), **PARAMETROS)
+    assert otro is not trabajo
+    otro.cancelar()
+
+    # El cálculo sigue mientras quede alguien esperándolo
+    for _ in range(USUARIOS - 1):
+        trabajo.cancelar()
+    esperar(lambda: trabajo.progreso() > 0)
+    assert not trabajo.terminado
+    trabajo.cancelar()
+    trabajo.futuro.result(timeout=30)
+    assert trabajo.estado == 'cancelado'
+    esperar(lambda: gestor.en_curso() == 0)
+
+    # Un trabajo cancelado no recibe suscriptores nuevos
+    nuevo = gestor.enviar(bm.bootstrap_media_alturas, DATOS, cache, **{**PARAMETROS, 'n_bootstrap': 2000})
+    assert nuevo is not trabajo
+    assert nuevo.futuro.result(timeout=30) is nuevo.resultado
+    assert cache.estadisticas()['fallos'] == 2
+
+
+def test_rafaga_calcula_una_vez_por_pedido_distinto(gestor):
+    cache = CacheResultados()
+    pedidos = [{'n_bootstrap': 2000, 'semilla': usuario % 2, 'estrategia': 'monte_carlo'}
+               for usuario in range(4 * USUARIOS)]
+    with ThreadPoolExecutor(USUARIOS) as hilos:
+        trabajos = list(hilos.map(lambda parametros: gestor.enviar(bm.bootstrap_media_alturas, DATOS, cache,
+                                                                   **parametros), pedidos))
+    resultados = [trabajo.futuro.result(timeout=30) for trabajo in trabajos]
+    assert all(trabajo.estado == 'terminado' for trabajo in trabajos)
+    # Los pedidos que llegan después de terminado salen de la caché
+    assert cache.estadisticas()['fallos'] == 2
+    for parametros, resultado in zip(pedidos, resultados):
+        assert resultado is resultados[parametros['semilla']]
+
+
+class GestorAnotador:
+    # Anota los pedidos en lugar de calcularlos
+
+    def __init__(self):
+        self.pedidos = []
+
+    def enviar(self, funcion, datos, cache=None, **parametros):
+        self.pedidos.append(clave_cache(funcion, normalizar_datos(datos), parametros))
+        return len(self.pedidos)
+
+
+def test_precalcular_ejemplos_envia_cada_calculo_una_vez(monkeypatch):
+    app = pytest.importorskip('bootstrapMetodo')
+    gestor = GestorAnotador()
+    monkeypatch.setattr(app, 'obtener_gestor_trabajos', lambda: gestor)
+    monkeypatch.setattr(app, 'obtener_cache_resultados', lambda: None)
+    # Sin el recurso de Streamlit que lo ejecuta una vez por proceso
+    trabajos = app.precalcular_ejemplos.__wrapped__()
+
+    esperadas = {clave_cache(app.ESTIMADORES_EJEMPLO[clave], normalizar_datos(datos),
+                             {'n_bootstrap': n_bootstrap, 'semilla': app.SEMILLA_DEFECTO,
+                              'almacenamiento': 'completo',
+                              **({'percentil': app.PERCENTIL_DEFECTO} if clave == 'percentil' else {})})
+                 for n_bootstrap in app.N_BOOTSTRAP_PRECALCULADOS for clave, datos in app.DATOS_EJEMPLO.items()}
+    assert len(trabajos) == len(gestor.pedidos) == len(set(gestor.pedidos))
+    assert set(gestor.pedidos) == esperadas
+    # Los ejemplos exactos o analíticos no dependen de n_bootstrap
+    assert len(esperadas) < len(app.N_BOOTSTRAP_PRECALCULADOS) * len(app.DATOS_EJEMPLO)
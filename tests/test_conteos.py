@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+import bootstrap_met as bm
+from bootstrap_met.estadisticos import obtener_estadistico
+from bootstrap_met.motor import comprimir_datos, evaluar_bloque_conteos
+
+# Estadísticos de orden y su referencia en NumPy
+ORDEN = {'mediana': lambda muestras: np.median(muestras, axis=1),
+         'percentil_90': lambda muestras: np.percentile(muestras, 90, axis=1),
+         'percentil_37.5': lambda muestras: np.percentile(muestras, 37.5, axis=1)}
+
+
+@pytest.mark.parametrize('n', [1, 2, 7, 50])
+def test_nucleo_conteos_coincide_con_numpy(n):
+    datos = np.random.default_rng(0).integers(0, 5, n).astype(np.float64)
+    valores, conteos_datos = comprimir_datos(datos)
+    generador = np.random.default_rng(1)
+    conteos = generador.multinomial(n, conteos_datos / n, size=200)
+    muestras = np.stack([np.repeat(valores, fila) for fila in conteos])
+
+    especificaciones = {nombre: obtener_estadistico(nombre) for nombre in ('media', 'desviacion', *ORDEN)}
+    if n == 1:
+        del especificaciones['desviacion']
+    resultados = evaluar_bloque_conteos(especificaciones, valores, conteos, n)
+    for nombre, referencia in ORDEN.items():
+        np.testing.assert_array_equal(resultados[nombre], referencia(muestras))
+    np.testing.assert_allclose(resultados['media'], muestras.mean(axis=1), rtol=1e-12)
+    if n > 1:
+        np.testing.assert_allclose(resultados['desviacion'], muestras.std(axis=1, ddof=1), rtol=1e-9)
+
+
+def test_datos_comprimidos_equivalen_a_los_crudos():
+    # La tupla (valores, conteos) y los datos repetidos comprimidos en el
+    # motor remuestrean lo mismo con la misma semilla
+    datos = np.random.default_rng(2).integers(0, 20, 3000).astype(np.float64)
+    estadisticos = ['media', 'desviacion', 'mediana', 'percentil_90']
+    crudos = bm.remuestrear_estadisticos(datos, estadisticos, 1000, semilla=5, compresion=True)
+    comprimidos = bm.remuestrear_estadisticos(comprimir_datos(datos), estadisticos, 1000, semilla=5)
+    for nombre in estadisticos:
+        np.testing.assert_array_equal(crudos[nombre], comprimidos[nombre])
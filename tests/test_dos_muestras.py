@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+import bootstrap_met as bm
+
+REPETICIONES = 300
+
+
+def test_razon_descarta_denominadores_cero():
+    # Solo 2 de 30 valores de B son distintos de cero: una remuestra sin
+    # ninguno de los dos (probabilidad (28/30)^30, un 12.6%) da razón inf
+    generador = np.random.default_rng(0)
+    a = generador.poisson(3, 30).astype(np.float64)
+    b = np.zeros(30)
+    b[:2] = 5
+    resultado = bm.bootstrap_dos_muestras((a, b), comparacion='razon', n_bootstrap=4000, n_permutaciones=500,
+                                          semilla=0)
+    descartadas = resultado['replicas_descartadas']
+    esperadas = 4000 * (28 / 30) ** 30
+    assert abs(descartadas - esperadas) < 4 * np.sqrt(esperadas)
+    assert len(resultado.replicas) == resultado['n_bootstrap'] == 4000 - descartadas
+    assert np.isfinite(resultado.replicas).all() and np.isfinite(resultado.error_estandar)
+    for intervalo in ('ic_95', 'ic_95_bca'):
+        assert np.isfinite(resultado[intervalo]).all()
+        assert resultado[intervalo][0] < resultado.valor_original < resultado[intervalo][1]
+    assert 0 < resultado['p_valor'] <= 1
+
+    # Con n_bootstrap='auto' la precisión se mide sobre las réplicas finitas
+    adaptativo = bm.bootstrap_dos_muestras((a, b), comparacion='razon', n_bootstrap='auto', n_maximo=20000,
+                                           n_permutaciones=0, semilla=0)
+    assert adaptativo['convergio'] and adaptativo['replicas_descartadas'] > 0
+
+
+def test_razon_con_denominador_cero():
+    a = np.arange(1.0, 11.0)
+    with pytest.raises(ValueError, match='distinto de cero'):
+        bm.bootstrap_dos_muestras((a, np.zeros(10)), comparacion='razon', n_permutaciones=0)
+    diferencia = bm.bootstrap_dos_muestras((a, np.zeros(10)), n_bootstrap=500, n_permutaciones=0, semilla=0)
+    assert diferencia['replicas_descartadas'] == 0 and len(diferencia.replicas) == 500
+
+
+@pytest.mark.parametrize('estadistico, comparacion, verdadero', [
+    ('media', 'diferencia', 0.5), ('mediana', 'razon', 1.5)])
+def test_cobertura_del_intervalo(estadistico, comparacion, verdadero):
+    # Exponenciales con escalas 1.5 y 1: la diferencia de medias es 0.5 y la
+    # razón de medianas, 1.5
+    generador = np.random.default_rng(1)
+    cubiertos = {'ic_95': 0, 'ic_95_bca': 0}
+    for repeticion in range(REPETICIONES):
+        muestras = (generador.exponential(1.5, 60), generador.exponential(1.0, 80))
+        resultado = bm.bootstrap_dos_muestras(muestras, estadistico, comparacion, n_bootstrap=1000,
+                                              n_permutaciones=0, semilla=repeticion)
+        for intervalo in cubiertos:
+            cubiertos[intervalo] += resultado[intervalo][0] <= verdadero <= resultado[intervalo][1]
+    # Error Monte Carlo de la cobertura: sqrt(0.95 * 0.05 / 300), algo más de 0.012
+    for intervalo, cubierto in cubiertos.items():
+        assert 0.89 <= cubierto / REPETICIONES <= 0.99, intervalo
+
+
+@pytest.mark.parametrize('estadistico, comparacion', [('media', 'diferencia'), ('mediana', 'razon')])
+def test_p_valor_calibrado_bajo_la_nula(estadistico, comparacion):
+    generador = np.random.default_rng(2)
+    p_valores = np.array([
+        bm.bootstrap_dos_muestras((generador.exponential(1.0, 25), generador.exponential(1.0, 35)),
+                                  estadistico, comparacion, n_bootstrap=10, n_permutaciones=199,
+                                  semilla=repeticion)['p_valor']
+        for repeticion in range(REPETICIONES)])
+    # Bajo la nula el p-valor es (casi) uniforme: el rechazo al 5% y al 20%
+    # queda cerca del nivel y la media cerca de 1/2
+    assert 0.015 <= np.mean(p_valores <= 0.05) <= 0.09
+    assert 0.14 <= np.mean(p_valores <= 0.2) <= 0.26
+    assert abs(p_valores.mean() - 0.5) < 0.05
+    assert p_valores.min() >= 1 / 200
+
+
+def test_p_valor_bajo_la_alternativa():
+    generador = np.random.default_rng(3)
+    muestras = (generador.normal(1, 1, 50), generador.normal(0, 1, 50))
+    resultado = bm.bootstrap_dos_muestras(muestras, n_bootstrap=500, n_permutaciones=999, semilla=0)
+    assert resultado['p_valor'] == 1 / 1000
+    assert resultado['ic_95'][0] > 0
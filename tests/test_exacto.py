@@ -0,0 +1,88 @@
+import itertools
+from math import comb
+
+import numpy as np
+import pytest
+
+import bootstrap_met as bm
+from bootstrap_met.cache import clave_cache
+from bootstrap_met.estadisticos import obtener_estadistico
+from bootstrap_met.exacto import MINIMO_ANALITICO, distribucion_bootstrap, elegir_estrategia
+
+
+def distribucion_enumerada(datos, funcion):
+    n = len(datos)
+    remuestras = np.array(list(itertools.product(range(n), repeat=n)))
+    soporte, frecuencias = np.unique(np.round(funcion(datos[remuestras], axis=1), 10), return_counts=True)
+    return soporte, frecuencias / frecuencias.sum()
+
+
+@pytest.mark.parametrize('nombre', ['media', 'mediana', 'percentil_90'])
+@pytest.mark.parametrize('datos', [[3, 1, 4, 1, 5], [2.0, 7.0, 1.0, 8.0, 2.0, 8.0], [12.5, 13.25, 14.0, 20.75]])
+def test_distribucion_exacta_coincide_con_enumeracion(nombre, datos):
+    datos = np.asarray(datos)
+    distribucion, diagnostico = distribucion_bootstrap(datos, nombre, estrategia='exacta')
+    assert diagnostico['estrategia'] == 'exacta'
+    soporte, probabilidades = distribucion_enumerada(datos, obtener_estadistico(nombre)['funcion'])
+    np.testing.assert_allclose(distribucion['soporte'], soporte, atol=1e-9)
+    np.testing.assert_allclose(distribucion['probabilidades'], probabilidades, atol=1e-12)
+
+
+def test_proporcion_exacta_es_binomial():
+    datos = (np.random.default_rng(5).random(200) < 0.1).astype(np.uint8)
+    distribucion, _ = distribucion_bootstrap(datos, 'proporcion', estrategia='exacta')
+    n, exitos = len(datos), int(datos.sum())
+    p = exitos / n
+    probabilidades = np.array([comb(n, k) * p ** k * (1 - p) ** (n - k) for k in range(n + 1)])
+    soporte = np.arange(n + 1) / n
+    positivas = np.isin(soporte, distribucion['soporte'])
+    np.testing.assert_allclose(distribucion['probabilidades'], probabilidades[positivas], atol=1e-12)
+
+
+def test_distribucion_exacta_coincide_con_monte_carlo():
+    datos = np.round(np.random.default_rng(6).lognormal(10, 0.6, 300))
+    for nombre in ('mediana', 'percentil_90'):
+        exacta, _ = distribucion_bootstrap(datos, nombre, estrategia='exacta')
+        monte_carlo, _ = distribucion_bootstrap(datos, nombre, 20000, estrategia='monte_carlo', semilla=0)
+        media = exacta['probabilidades'] @ exacta['soporte']
+        desviacion = np.sqrt(exacta['probabilidades'] @ (exacta['soporte'] - media) ** 2)
+        assert abs(monte_carlo['replicas'].mean() - media) < 5 * desviacion / np.sqrt(20000)
+        assert abs(monte_carlo['replicas'].std() / desviacion - 1) < 0.05
+
+
+def test_elegir_estrategia():
+    pequenos = np.round(np.random.default_rng(7).lognormal(10, 0.6, 15))
+    grandes = np.random.default_rng(7).normal(170, 8, MINIMO_ANALITICO)
+    assert elegir_estrategia('mediana', pequenos) == 'exacta'
+    assert elegir_estrategia('percentil_90', pequenos) == 'exacta'
+    assert elegir_estrategia('proporcion', (pequenos > 20000).astype(np.uint8)) == 'exacta'
+    assert elegir_estrategia('media', grandes) == 'analitica'
+    assert elegir_estrategia('media', pequenos) == 'monte_carlo'
+    assert elegir_estrategia('desviacion', grandes) == 'monte_carlo'
+    # Otros esquemas y réplicas adicionales necesitan Monte Carlo
+    assert elegir_estrategia('mediana', pequenos, esquema='bayesiano') == 'monte_carlo'
+    assert elegir_estrategia('mediana', pequenos, adicionales=('media',)) == 'monte_carlo'
+    with pytest.raises(ValueError):
+        elegir_estrategia('mediana', pequenos, 'exacta', esquema='bayesiano')
+    with pytest.raises(ValueError):
+        elegir_estrategia('mediana', pequenos, 'analitica')
+    with pytest.raises(ValueError):
+        elegir_estrategia('mediana', pequenos, 'cerrada')
+
+
+def test_resultado_exacto_sin_replicas():
+    datos = np.round(np.random.default_rng(8).lognormal(10, 0.6, 15))
+    resultado = bm.bootstrap_mediana_salarios(datos, n_bootstrap=5000, semilla=1)
+    distribucion, _ = distribucion_bootstrap(datos, 'mediana', estrategia='exacta')
+    media = distribucion['probabilidades'] @ distribucion['soporte']
+    assert resultado['estrategia'] == 'exacta' and resultado.replicas is None
+    assert resultado.promedio == pytest.approx(media)
+    assert resultado.error_estandar == pytest.approx(
+        np.sqrt(distribucion['probabilidades'] @ (distribucion['soporte'] - media) ** 2))
+    assert resultado.histograma[0].sum() == pytest.approx(1)
+    # Ni n_bootstrap ni la semilla cambian el resultado exacto: misma clave de caché
+    def clave(**parametros):
+        return clave_cache(bm.bootstrap_mediana_salarios, datos, parametros)
+
+    assert clave(n_bootstrap=5000, semilla=1) == clave(n_bootstrap=1000, semilla=2)
+    assert clave(n_bootstrap=5000, estrategia='monte_carlo') != clave(n_bootstrap=1000, estrategia='monte_carlo')
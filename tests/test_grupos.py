@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import bootstrap_met as bm
+
+ESTADISTICOS = ('media', 'desviacion', 'mediana', 'percentil_90')
+
+GENERADOR = np.random.default_rng(0)
+TAMANOS = [1, 2, 5, 40, 300, 2000]
+GRUPOS = np.repeat([f'g{i}' for i in range(len(TAMANOS))], TAMANOS)
+VALORES = np.round(GENERADOR.lognormal(3, 0.5, len(GRUPOS)), 1)
+
+
+def tabla_por_grupos(**opciones):
+    # Filas desordenadas: el agrupamiento no debe depender del orden
+    orden = np.random.default_rng(1).permutation(len(VALORES))
+    return bm.bootstrap_por_grupos(VALORES[orden], GRUPOS[orden], ESTADISTICOS, **opciones)
+
+
+def test_equivale_al_bootstrap_de_cada_grupo():
+    tabla = tabla_por_grupos(n_bootstrap=4000, semilla=0)
+    assert len(tabla) == len(TAMANOS) * len(ESTADISTICOS)
+    for grupo, tamano in zip(np.unique(GRUPOS), TAMANOS):
+        datos = VALORES[GRUPOS == grupo]
+        if tamano < 2:
+            continue
+        individual = bm.bootstrap_estadisticos(datos, ESTADISTICOS, n_bootstrap=4000, semilla=0)
+        for nombre in ESTADISTICOS:
+            fila = tabla[(tabla['grupo'] == grupo) & (tabla['estadistico'] == nombre)].iloc[0]
+            resultado = individual[nombre]
+            assert fila['n'] == tamano
+            np.testing.assert_allclose(fila['estimacion'], resultado.valor_original, rtol=1e-12)
+            # Generadores distintos: las réplicas solo coinciden en distribución
+            error_estandar = resultado.error_estandar
+            assert abs(fila['error_estandar'] - error_estandar) <= 0.1 * error_estandar + 1e-12
+            for columna, intervalo in (('ic', resultado.intervalos['ic_95']),
+                                       ('ic_bca', resultado.intervalos['ic_95_bca'])):
+                assert abs(fila[f'{columna}_inferior'] - intervalo[0]) <= 0.4 * error_estandar + 1e-12
+                assert abs(fila[f'{columna}_superior'] - intervalo[1]) <= 0.4 * error_estandar + 1e-12
+
+
+def test_grupo_de_una_fila():
+    tabla = tabla_por_grupos(n_bootstrap=200, semilla=0)
+    for _, fila in tabla[tabla['grupo'] == 'g0'].iterrows():
+        valor = VALORES[GRUPOS == 'g0'][0]
+        if fila['estadistico'] == 'desviacion':
+            continue
+        np.testing.assert_allclose([fila['estimacion'], fila['ic_inferior'], fila['ic_superior']], valor)
+        assert fila['error_estandar'] < 1e-9 * valor
+
+
+@pytest.mark.parametrize('ejecutor', ['hilos', 'procesos'])
+def test_semilla_independiente_de_trabajadores(ejecutor):
+    opciones = {'n_bootstrap': 500, 'semilla': 3, 'filas_por_paquete': 64}
+    uno = tabla_por_grupos(**opciones)
+    varios = tabla_por_grupos(n_trabajadores=3, ejecutor=ejecutor, **opciones)
+    pd.testing.assert_frame_equal(uno, varios)
+
+
+def test_valida_los_argumentos():
+    with pytest.raises(ValueError):
+        bm.bootstrap_por_grupos(VALORES, GRUPOS[:-1])
+    with pytest.raises(ValueError):
+        bm.bootstrap_por_grupos(VALORES, GRUPOS, confianza=1.2)
@@ -0,0 +1,94 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import bootstrap_met as bm
+from bootstrap_met.ingesta import tipo_compacto
+
+LIMITE = np.iinfo(np.int32).max // 2
+
+
+def test_parsear_valores_con_comas_saltos_y_huecos():
+    valores, invalidos = bm.parsear_valores("1, 2,3\n4\n\n 5 ,6")
+    np.testing.assert_array_equal(valores, [1, 2, 3, 4, 5, 6])
+    assert valores.dtype == np.int32
+    assert len(invalidos) == 0
+
+
+def test_parsear_valores_informa_los_invalidos():
+    valores, invalidos = bm.parsear_valores("1.5, abc, 2.5\n\nx, 4")
+    np.testing.assert_array_equal(valores, [1.5, 2.5, 4])
+    assert valores.dtype == np.float64
+    # Posiciones base 0 entre los tokens, contando los huecos
+    np.testing.assert_array_equal(invalidos, [1, 4])
+
+
+def test_parsear_valores_vacio():
+    valores, invalidos = bm.parsear_valores("  \n ")
+    assert len(valores) == 0 and valores.dtype == np.float64 and len(invalidos) == 0
+
+
+@pytest.mark.parametrize('valores, tipo', [
+    (np.array([True, False, True]), np.uint8),
+    (np.array([0.0, 1.0, 1.0]), np.uint8),
+    (np.array([3, -7, 12], dtype=np.int64), np.int32),
+    (np.array([170.0, 165.0]), np.int32),
+    (np.array([1.5, 2.25]), np.float64),
+    (np.array([], dtype=np.int64), np.float64),
+    # Límite: int32 solo si cabe el doble del mayor valor absoluto
+    (np.array([-LIMITE, LIMITE], dtype=np.int64), np.int32),
+    (np.array([0, LIMITE + 1], dtype=np.int64), np.int64),
+    (np.array([-LIMITE - 1, 0], dtype=np.int64), np.int64),
+    (np.array([1.5e9, 2.0e9]), np.float64),
+])
+def test_tipo_compacto(valores, tipo):
+    compacto = tipo_compacto(valores)
+    assert compacto.dtype == tipo
+    np.testing.assert_array_equal(compacto, valores)
+
+
+def test_tipo_compacto_float32_solo_si_se_permite():
+    valores = np.array([1.25, 2.5])
+    assert tipo_compacto(valores).dtype == np.float64
+    assert tipo_compacto(valores, permitir_float32=True).dtype == np.float32
+    # Los enteros siguen en int32 aunque se permita float32
+    assert tipo_compacto(np.array([10.0, 20.0]), permitir_float32=True).dtype == np.int32
+
+
+def test_mediana_de_identificadores_grandes():
+    # Valores que antes pasaban a int32 y desbordaban al promediar
+    valores, _ = bm.parsear_valores("1500000000, 1600000000, 2000000000, 2100000000")
+    assert valores.dtype != np.int32
+    resultado = bm.bootstrap_mediana_salarios(valores, n_bootstrap=200, semilla=0, estrategia='monte_carlo')
+    assert resultado.valor_original == 1_800_000_000
+    inferior, superior = resultado.ic_95_mediana
+    assert valores.min() <= inferior <= superior <= valores.max()
+
+
+def test_leer_tabla_y_extraer_columna(tmp_path):
+    tabla = pd.DataFrame({'altura': [170.5, np.nan, 165.0], 'texto': ['1', 'x', '3'], 'ok': [True, False, True]})
+    ruta_csv = tmp_path / 'datos.csv'
+    tabla.to_csv(ruta_csv, index=False)
+    ruta_parquet = tmp_path / 'datos.parquet'
+    tabla.to_parquet(ruta_parquet)
+    for leida in (bm.leer_tabla(ruta_csv), bm.leer_tabla(ruta_parquet),
+                  bm.leer_tabla(io.BytesIO(ruta_csv.read_bytes()), nombre='subido.csv')):
+        valores, invalidos = bm.extraer_columna(leida, 'altura')
+        np.testing.assert_array_equal(valores, [170.5, 165.0])
+        np.testing.assert_array_equal(invalidos, [1])
+        valores, invalidos = bm.extraer_columna(leida, 'texto')
+        np.testing.assert_array_equal(valores, [1, 3])
+        np.testing.assert_array_equal(invalidos, [1])
+        valores, _ = bm.extraer_columna(leida, 'ok')
+        assert valores.dtype == np.uint8
+
+    ruta_npy = tmp_path / 'datos.npy'
+    np.save(ruta_npy, np.arange(6.0).reshape(3, 2))
+    leida = bm.leer_tabla(ruta_npy)
+    assert list(leida.columns) == ['columna_0', 'columna_1']
+    np.testing.assert_array_equal(leida['columna_1'], [1, 3, 5])
+
+    with pytest.raises(ValueError, match='Formato no soportado'):
+        bm.leer_tabla(tmp_path / 'datos.xlsx')
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+import bootstrap_met as bm
+from bootstrap_met.estadisticos import obtener_estadistico
+from bootstrap_met.exacto import distribucion_bootstrap
+from bootstrap_met.motor import evaluar_bloque_indices
+
+# Estadísticos de orden y su referencia en NumPy
+ORDEN = {'mediana': lambda muestras: np.median(muestras, axis=1),
+         'percentil_90': lambda muestras: np.percentile(muestras, 90, axis=1),
+         'percentil_37.5': lambda muestras: np.percentile(muestras, 37.5, axis=1)}
+
+
+@pytest.mark.parametrize('n', [1, 2, 7, 50])
+def test_nucleo_indices_coincide_con_numpy(n):
+    # El núcleo de índices recibe los datos ordenados
+    datos = np.sort(np.round(np.random.default_rng(0).lognormal(10, 0.6, n)))
+    indices = np.random.default_rng(2).integers(0, n, size=(200, n))
+    especificaciones = {nombre: obtener_estadistico(nombre) for nombre in ('media', *ORDEN)}
+    resultados = evaluar_bloque_indices(especificaciones, datos, indices, n)
+    for nombre, referencia in ORDEN.items():
+        np.testing.assert_array_equal(resultados[nombre], referencia(datos[indices]))
+    np.testing.assert_allclose(resultados['media'], datos[indices].mean(axis=1), rtol=1e-12)
+
+
+# Enteros de 32 bits cerca del límite: combinar dos posiciones no debe desbordar
+
+
+@pytest.mark.parametrize('valores_unicos', [None, 6])
+def test_orden_int32_grandes_no_desborda(valores_unicos):
+    generador = np.random.default_rng(3)
+    if valores_unicos is None:
+        datos = generador.integers(1_400_000_000, 2_000_000_000, 60).astype(np.int32)
+    else:
+        # Pocos valores únicos: núcleo de conteos
+        datos = generador.choice(np.array([1.5e9, 1.6e9, 1.7e9, 1.8e9, 1.9e9, 2.1e9 - 1]),
+                                 60).astype(np.int32)
+    replicas = bm.remuestrear_estadisticos(datos, list(ORDEN), 500, semilla=0)
+    indices = bm.remuestrear_estadisticos(datos.astype(np.float64), list(ORDEN), 500, semilla=0)
+    for nombre in ORDEN:
+        assert replicas[nombre].min() >= datos.min() and replicas[nombre].max() <= datos.max()
+        np.testing.assert_array_equal(replicas[nombre], indices[nombre])
+
+
+def test_orden_int32_grandes_exacta():
+    datos = np.array([2_000_000_000, 2_100_000_000, 1_900_000_000, 2_140_000_000, 1_950_000_000],
+                     dtype=np.int32)
+    for nombre in ('mediana', 'percentil_90'):
+        distribucion, _ = distribucion_bootstrap(datos, nombre, estrategia='exacta')
+        referencia, _ = distribucion_bootstrap(datos.astype(np.float64), nombre, estrategia='exacta')
+        assert distribucion['soporte'].min() >= datos.min()
+        np.testing.assert_array_equal(distribucion['soporte'], referencia['soporte'])
+        np.testing.assert_allclose(distribucion['probabilidades'], referencia['probabilidades'])
+    resultado = bm.bootstrap_mediana_salarios(datos, estrategia='exacta')
+    assert resultado.valor_original == np.median(datos)
@@ -0,0 +1,57 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+import bootstrap_met as bm
+from bootstrap_met.motor import EJECUTORES
+
+DATOS = np.round(np.random.default_rng(8).lognormal(10, 0.6, 2000))
+
+# Memoria chica para que haya muchos bloques que repartir
+OPCIONES = {'semilla': 42, 'memoria_maxima': 200_000}
+
+
+@pytest.mark.parametrize('ejecutor', ['hilos', 'procesos'])
+def test_semilla_independiente_de_trabajadores(ejecutor):
+    uno = bm.remuestrear_estadisticos(DATOS, ['media', 'mediana'], 3000, n_trabajadores=1, **OPCIONES)
+    varios = bm.remuestrear_estadisticos(DATOS, ['media', 'mediana'], 3000, n_trabajadores=4,
+                                         ejecutor=ejecutor, **OPCIONES)
+    for nombre in uno:
+        np.testing.assert_array_equal(uno[nombre], varios[nombre])
+
+
+def test_pool_compartido_entre_llamadas():
+    bm.cerrar_ejecutores()
+    primero = bm.remuestrear_estadisticos(DATOS, ['media'], 3000, n_trabajadores=3, **OPCIONES)
+    pools = list(EJECUTORES.values())
+    segundo = bm.remuestrear_estadisticos(DATOS, ['media'], 3000, n_trabajadores=3, **OPCIONES)
+    assert len(pools) == 1 and list(EJECUTORES.values()) == pools
+    np.testing.assert_array_equal(primero['media'], segundo['media'])
+    bm.cerrar_ejecutores()
+    assert not EJECUTORES
+
+
+def test_ejecutor_propio_no_se_cierra():
+    uno = bm.remuestrear_estadisticos(DATOS, ['media'], 3000, **OPCIONES)
+    with ThreadPoolExecutor(max_workers=2) as ejecutor:
+        for _ in range(2):
+            propio = bm.remuestrear_estadisticos(DATOS, ['media'], 3000, n_trabajadores=2, ejecutor=ejecutor,
+                                                 **OPCIONES)
+            np.testing.assert_array_equal(uno['media'], propio['media'])
+
+
+def test_llamada_anidada_desde_el_pool_no_se_bloquea():
+    # Un estimador paralelo que corre en un hilo del mismo pool compartido
+    def anidada():
+        return bm.remuestrear_estadisticos(DATOS, ['media'], 3000, n_trabajadores=2, **OPCIONES)['media']
+
+    uno = bm.remuestrear_estadisticos(DATOS, ['media'], 3000, **OPCIONES)['media']
+    futuros = [bm.obtener_ejecutor('hilos', 2).submit(anidada) for _ in range(2)]
+    for futuro in futuros:
+        np.testing.assert_array_equal(futuro.result(timeout=60), uno)
+
+
+def test_ejecutor_desconocido():
+    with pytest.raises(ValueError, match='Ejecutor desconocido'):
+        bm.remuestrear_estadisticos(DATOS, ['media'], 3000, n_trabajadores=2, ejecutor='gpu', **OPCIONES)
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+import bootstrap_met as bm
+
+GENERADOR = np.random.default_rng(11)
+DISTRIBUCIONES = {'simetrica': GENERADOR.normal(170, 8, 50000),
+                  'cola_pesada': GENERADOR.lognormal(0, 2, 50000),
+                  'salarios': GENERADOR.lognormal(10, 1, 50000),
+                  'cruza_cero': GENERADOR.normal(0, 1, 50000)}
+
+
+@pytest.mark.parametrize('distribucion', list(DISTRIBUCIONES))
+def test_cuantiles_streaming_coinciden_con_numpy(distribucion):
+    datos = DISTRIBUCIONES[distribucion]
+    # Fragmentos chicos: el sketch crece y se colapsa a medida que llegan datos
+    resultados = bm.bootstrap_streaming(iter(np.array_split(datos, 20)), ('media', 'mediana', 'percentil_90'),
+                                        200, semilla=0)
+    for nombre, referencia in (('mediana', np.median(datos)), ('percentil_90', np.percentile(datos, 90))):
+        resultado = resultados[nombre]
+        precision = resultado.precision_sketch
+        assert precision < 0.01
+        assert abs(resultado.valor_original - referencia) <= 2 * precision * abs(referencia)
+        inferior, superior = resultado.ic_95
+        assert inferior - 2 * precision * abs(inferior) <= referencia <= superior + 2 * precision * abs(superior)
+        assert resultado.error_estandar > 0
+    np.testing.assert_allclose(resultados['media'].valor_original, np.mean(datos), rtol=1e-12)
+
+
+def test_sketch_acota_las_cubetas_y_colapsa():
+    # Nueve décadas por signo: no caben en 64 cubetas sin colapsar
+    datos = np.exp(np.random.default_rng(1).uniform(-10, 10, 20000)) * np.resize([1, -1], 20000)
+    pesos = np.ones((len(datos), 2))
+    sketch = bm.SketchCuantiles(2, maximo_cubetas=64)
+    sketch.agregar(datos, pesos)
+    assert sketch.colapsos > 0
+    assert all(matriz.shape[1] <= 64 for _, matriz in sketch.cubetas.values())
+    for q in (0.01, 0.3, 0.7, 0.99):
+        referencia = np.quantile(datos, q)
+        assert abs(sketch.cuantil(q)[0] - referencia) <= 2 * sketch.precision_relativa * abs(referencia)
+
+
+def test_fusionar_equivale_a_agregar_todo():
+    datos = np.random.default_rng(2).lognormal(0, 3, 20000)
+    pesos = np.random.default_rng(3).poisson(1.0, (len(datos), 5)).astype(np.float64)
+    completo = bm.SketchCuantiles(5, maximo_cubetas=256)
+    completo.agregar(datos, pesos)
+    # Una mitad con poco rango (sin colapsar) y otra con todo el rango
+    chicos = datos < np.median(datos)
+    primero, segundo = bm.SketchCuantiles(5, maximo_cubetas=256), bm.SketchCuantiles(5, maximo_cubetas=256)
+    primero.agregar(datos[chicos], pesos[chicos])
+    segundo.agregar(datos[~chicos], pesos[~chicos])
+    fusionado = primero.fusionar(segundo)
+    assert fusionado.colapsos == completo.colapsos
+    for q in (0.1, 0.5, 0.9):
+        np.testing.assert_array_equal(fusionado.cuantil(q), completo.cuantil(q))
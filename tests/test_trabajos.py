@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+import bootstrap_met as bm
+from bootstrap_met.cache import CacheResultados
+from bootstrap_met.trabajos import GestorTrabajos, Trabajo
+
+DATOS = np.random.default_rng(0).normal(170, 8, 1000)
+
+# Bloques de 10 réplicas: unos 20 bloques por trabajo de 200
+PARAMETROS = {'n_bootstrap': 200, 'semilla': 1, 'estrategia': 'monte_carlo', 'memoria_maxima': 320_000}
+
+
+def seguir_bloques(trabajo, al_informar):
+    # Llama a `al_informar(trabajo)` después de cada bloque que recibe
+    informar_bloque = trabajo.informar_bloque
+
+    def informar(bloque):
+        informar_bloque(bloque)
+        al_informar(trabajo)
+
+    trabajo.informar_bloque = informar
+
+
+def test_progreso_y_replicas_parciales():
+    trabajo = Trabajo(bm.bootstrap_media_alturas, DATOS, CacheResultados(), **PARAMETROS)
+    avance = []
+    seguir_bloques(trabajo, lambda trabajo: avance.append((trabajo.progreso(), trabajo.replicas_parciales())))
+    assert trabajo.progreso() == 0 and trabajo.estado == 'pendiente'
+    resultado = trabajo.ejecutar()
+
+    assert trabajo.estado == 'terminado' and trabajo.progreso() == 1.0
+    assert len(avance) > 10
+    progresos = [progreso for progreso, _ in avance]
+    assert progresos == sorted(progresos) and progresos[-1] == 1.0
+    # Sin paralelismo los bloques llegan en orden: cada resultado parcial es
+    # un prefijo de las réplicas finales
+    for progreso, parciales in avance:
+        assert len(parciales) == round(progreso * PARAMETROS['n_bootstrap'])
+        np.testing.assert_array_equal(parciales, resultado.replicas[:len(parciales)])
+    assert len(trabajo.replicas_parciales()) == 0
+
+
+def test_cancelar_entre_bloques():
+    trabajo = Trabajo(bm.bootstrap_media_alturas, DATOS, CacheResultados(), **PARAMETROS)
+    seguir_bloques(trabajo, lambda trabajo: len(trabajo.replicas_parciales()) >= 30 and trabajo.cancelar())
+    assert trabajo.ejecutar() is None
+    assert trabajo.estado == 'cancelado' and trabajo.terminado
+    # La cancelación llega en el bloque siguiente
+    assert 30 <= trabajo.replicas_terminadas() < 50
+    assert trabajo.progreso() < 1
+
+
+def test_error_queda_en_el_trabajo():
+    trabajo = Trabajo(bm.bootstrap_media_alturas, DATOS, CacheResultados(), n_bootstrap=100, estrategia='monte_carlo',
+                      opcion_desconocida=1)
+    assert trabajo.ejecutar() is None
+    assert trabajo.estado == 'error' and isinstance(trabajo.error, TypeError)
+
+
+@pytest.fixture
+def gestor():
+    gestor = GestorTrabajos(max_trabajos=1)
+    yield gestor
+    gestor.cerrar(esperar=False)
+
+
+def test_gestor_cancela_trabajo_en_curso(gestor):
+    # Sin cancelar tardaría muchísimo: 20 mil bloques de 10 réplicas
+    trabajo = gestor.enviar(bm.bootstrap_media_alturas, DATOS, CacheResultados(),
+                            **{**PARAMETROS, 'n_bootstrap': 200_000})
+    while trabajo.progreso() == 0:
+        assert not trabajo.terminado
+    trabajo.cancelar()
+    trabajo.futuro.result(timeout=30)
+    assert trabajo.estado == 'cancelado'
+    assert 0 < trabajo.progreso() < 0.5
+    assert gestor.en_curso() == 0
+
+
+def test_gestor_cancela_trabajo_pendiente(gestor):
+    # Con un solo hilo el segundo trabajo espera en la cola
+    primero = gestor.enviar(bm.bootstrap_media_alturas, DATOS, CacheResultados(),
+                            **{**PARAMETROS, 'n_bootstrap': 200_000})
+    segundo = gestor.enviar(bm.bootstrap_media_alturas, DATOS, CacheResultados(), **PARAMETROS)
+    assert segundo.estado == 'pendiente'
+    segundo.cancelar()
+    assert segundo.estado == 'cancelado' and segundo.progreso() == 0
+    primero.cancelar()
+    primero.futuro.result(timeout=30)
+    assert primero.estado == 'cancelado'
+
+    tercero = gestor.enviar(bm.bootstrap_media_alturas, DATOS, CacheResultados(), **PARAMETROS)
+    assert tercero.futuro.result(timeout=30) is tercero.resultado
+    assert tercero.estado == 'terminado' and tercero.progreso() == 1.0